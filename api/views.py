@@ -1,8 +1,12 @@
+from django.conf import settings
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_page
 from rest_framework import generics
 from .models import PredefinedQuery
 from .serializers import PredefinedQuerySerializer
 
 
+@method_decorator(cache_page(settings.ARANGO_API_CACHE_TIMEOUT), name="get")
 class PredefinedQueryList(generics.ListAPIView):
     queryset = PredefinedQuery.objects.all()
     serializer_class = PredefinedQuerySerializer
@@ -0,0 +1,207 @@
+"""
+Admission control for the expensive arango_api endpoints. Each request is
+given a cost from its endpoint's cost model, and runs once that many slots
+of a shared weighted pool are free. Requests wait in a bounded queue, and
+are rejected quickly with Retry-After when the queue is full or the wait
+times out. Limits apply per worker process.
+"""
+
+from functools import wraps
+import math
+import threading
+
+from django.conf import settings
+from django.http import JsonResponse
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Weighted concurrency slots with a bounded, timed wait queue."""
+
+    def __init__(self, capacity, max_queue, queue_timeout, retry_after, endpoints):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.endpoints = endpoints
+        self._condition = threading.Condition()
+        self._in_use = 0
+        self._waiting = 0
+        self._running = {}
+        self._counters = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+        }
+
+    def get_cost(self, endpoint, depth=0, nodes=0, pairs=0):
+        """Returns the number of slots a request needs, between 1 and capacity."""
+        model = self.endpoints.get(endpoint, {})
+        cost = (
+            model.get("base", 1)
+            + model.get("per_depth", 0) * depth
+            + model.get("per_node", 0) * nodes
+            + model.get("per_pair", 0) * pairs
+        )
+        return max(1, min(self.capacity, math.ceil(cost)))
+
+    def _can_run(self, endpoint, cost):
+        max_concurrent = self.endpoints.get(endpoint, {}).get("max_concurrent")
+        if (
+            max_concurrent is not None
+            and self._running.get(endpoint, 0) >= max_concurrent
+        ):
+            return False
+        return self._in_use + cost <= self.capacity
+
+    def acquire(self, endpoint, cost):
+        with self._condition:
+            if not self._can_run(endpoint, cost):
+                if self._waiting >= self.max_queue:
+                    self._counters["rejected_queue_full"] += 1
+                    raise AdmissionRejected(
+                        429, "Too many queued requests", self.retry_after
+                    )
+                self._waiting += 1
+                self._counters["queued"] += 1
+                try:
+                    admitted = self._condition.wait_for(
+                        lambda: self._can_run(endpoint, cost), self.queue_timeout
+                    )
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    self._counters["rejected_timeout"] += 1
+                    raise AdmissionRejected(
+                        503, "Timed out waiting for capacity", self.retry_after
+                    )
+            self._in_use += cost
+            self._running[endpoint] = self._running.get(endpoint, 0) + 1
+            self._counters["admitted"] += 1
+
+    def release(self, endpoint, cost):
+        with self._condition:
+            self._in_use -= cost
+            self._running[endpoint] -= 1
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            return {
+                "capacity": self.capacity,
+                "in_use": self._in_use,
+                "queue_depth": self._waiting,
+                "max_queue": self.max_queue,
+                "running": dict(self._running),
+                **self._counters,
+            }
+
+
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_controller():
+    """Returns the process-wide controller, created from settings on first use."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            config = settings.ARANGO_API_ADMISSION
+            _controller = AdmissionController(
+                config["CAPACITY"],
+                config["MAX_QUEUE"],
+                config["QUEUE_TIMEOUT"],
+                config["RETRY_AFTER"],
+                config["ENDPOINTS"],
+            )
+        return _controller
+
+
+def _request_size(data):
+    """Returns (depth, nodes, pairs) describing the size of a request."""
+    try:
+        depth = int(data.get("depth") or 0)
+    except (TypeError, ValueError):
+        depth = 0
+    node_ids = data.get("node_ids") or []
+    nodes = len(node_ids) if isinstance(node_ids, list) else 0
+    pairs = nodes * (nodes - 1) // 2
+    return depth, nodes, pairs
+
+
+def admission_controlled(endpoint):
+    """
+    View decorator that admits a request to the given endpoint through the
+    controller, or returns a 429 or 503 response with Retry-After. Slots of
+    streaming responses are held until the stream is exhausted or closed.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            controller = get_controller()
+            cost = controller.get_cost(endpoint, *_request_size(request.data))
+            try:
+                controller.acquire(endpoint, cost)
+            except AdmissionRejected as e:
+                response = JsonResponse({"error": e.reason}, status=e.status)
+                response["Retry-After"] = str(e.retry_after)
+                return response
+
+            try:
+                response = view(request, *args, **kwargs)
+            except BaseException:
+                controller.release(endpoint, cost)
+                raise
+
+            if response.streaming:
+                _release_when_done(response, controller, endpoint, cost)
+            else:
+                controller.release(endpoint, cost)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _release_when_done(response, controller, endpoint, cost):
+    """
+    Releases the slot of a streaming response once its content is exhausted
+    or the response is closed, whichever comes first. The server closes the
+    response even if the client disconnected before the stream started.
+    """
+    lock = threading.Lock()
+    held = [True]
+
+    def release():
+        with lock:
+            if not held[0]:
+                return
+            held[0] = False
+        controller.release(endpoint, cost)
+
+    def release_after(content):
+        try:
+            yield from content
+        finally:
+            release()
+
+    close = response.close
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            release()
+
+    response.streaming_content = release_after(response.streaming_content)
+    response.close = close_and_release
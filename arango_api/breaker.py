@@ -0,0 +1,152 @@
+"""
+Circuit breaker around database calls. The outcomes of the most recent
+calls are kept, and when too many of them failed or were slow, the circuit
+opens: calls fail immediately with DatabaseUnavailable instead of waiting
+on a database that is down or restarting, and cached results are served
+stale. After a pause the circuit half-opens and lets one trial call
+through, closing again if it succeeds. Failures are errors other than
+client errors, such as invalid queries, and slow calls are those taking at
+least SLOW_MS. The circuit is shared by all the database calls of a worker
+process.
+"""
+
+from collections import deque
+import threading
+import time
+
+from django.conf import settings
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class DatabaseUnavailable(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Database temporarily unavailable")
+        self.retry_after = retry_after
+
+
+def is_failure(error):
+    """
+    Returns whether error means the database is failing, rather than that
+    the request was invalid. Errors without an HTTP status, such as
+    connection errors and timeouts, are failures.
+    """
+    http_code = getattr(error, "http_code", None)
+    return http_code is None or http_code >= 500
+
+
+class CircuitBreaker:
+    """Failure and slow call rates over a window of calls, with states."""
+
+    def __init__(self, window, min_calls, failure_rate, slow_ms, open_seconds):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_ms = slow_ms
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._counters = {"opened": 0, "rejected": 0}
+
+    def _current_state(self):
+        if self._state == OPEN and time.monotonic() >= (
+            self._opened_at + self.open_seconds
+        ):
+            self._state = HALF_OPEN
+        return self._state
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def allows_calls(self):
+        """Returns whether a call could currently be made."""
+        with self._lock:
+            state = self._current_state()
+            return state == CLOSED or (state == HALF_OPEN and not self._trial_running)
+
+    def before_call(self):
+        """
+        Raises DatabaseUnavailable if the circuit is open, or half-open
+        with its trial call already running. Otherwise the call may proceed,
+        and its outcome must be passed to after_call.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+            if state == CLOSED:
+                return
+            self._counters["rejected"] += 1
+            retry_after = self._opened_at + self.open_seconds - time.monotonic()
+            raise DatabaseUnavailable(max(1, round(retry_after)))
+
+    def after_call(self, duration_ms, error=None):
+        failed = (error is not None and is_failure(error)) or (
+            duration_ms >= self.slow_ms
+        )
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial_running = False
+                if failed:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                return
+            if self._state == OPEN:
+                return
+
+            self._outcomes.append(failed)
+            if (
+                len(self._outcomes) >= self.min_calls
+                and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate
+            ):
+                self._open()
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._counters["opened"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "recent_calls": len(self._outcomes),
+                "recent_failures": sum(self._outcomes),
+                **self._counters,
+            }
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_breaker():
+    """
+    Returns the process-wide circuit breaker, created from settings on first
+    use, or None if it is disabled.
+    """
+    global _breaker
+    config = settings.ARANGO_API_CIRCUIT_BREAKER
+    if not config["ENABLED"]:
+        return None
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                config["WINDOW"],
+                config["MIN_CALLS"],
+                config["FAILURE_RATE"],
+                config["SLOW_MS"],
+                config["OPEN_SECONDS"],
+            )
+        return _breaker
@@ -0,0 +1,137 @@
+"""
+Server-side collection browsing. Each collection gets a sort index of its
+document keys in BrowseBox display order, labeled documents by label and
+then the rest by numeric _key, built once from the keys and labels only
+and kept in the Django cache. Pages are filtered and sliced from the index,
+and only the documents on the page are fetched.
+"""
+
+import json
+
+from django.conf import settings
+
+from arango_api.cache import get_or_set
+
+
+def load_label_fields():
+    """
+    Returns the label attributes of each collection, from the collections
+    map shared with the React client, with "edges" as the default.
+    """
+    with open(settings.ARANGO_API_BROWSE["COLLECTIONS_MAP"]) as fp:
+        collections_map = dict(json.load(fp))
+    return {
+        collection: options.get("individual_labels", [])
+        for collection, options in collections_map.items()
+    }
+
+
+def get_label(doc, label_fields):
+    """Returns the first label attribute doc has, as getLabel does."""
+    for field in label_fields:
+        value = doc.get(field)
+        if value is None:
+            continue
+        if isinstance(value, list):
+            value = value[0] if value else ""
+        return str(value)
+    return ""
+
+
+def _numeric_key(key):
+    try:
+        return (0, int(key), key)
+    except ValueError:
+        return (1, 0, key)
+
+
+def build_sort_index(docs, label_fields):
+    """
+    Returns [_key, lower case label] pairs for docs in display order:
+    labeled documents by label, ignoring case, then the others by _key.
+    """
+    labeled = []
+    unlabeled = []
+    for doc in docs:
+        label = get_label(doc, label_fields)
+        if label:
+            labeled.append((label.casefold(), doc["_key"], label.lower()))
+        else:
+            unlabeled.append(doc["_key"])
+    labeled.sort()
+    unlabeled.sort(key=_numeric_key)
+    return [[key, label] for _, key, label in labeled] + [
+        [key, ""] for key in unlabeled
+    ]
+
+
+def filter_sort_index(index, text):
+    """
+    Returns the index entries whose label or _key contains text, ignoring
+    case. Exact matches come first, then prefix matches, then the rest,
+    each in display order.
+    """
+    text = text.strip().lower()
+    if not text:
+        return index
+
+    exact = []
+    prefix = []
+    contains = []
+    for entry in index:
+        key, label = entry
+        lower_key = key.lower()
+        if label == text or lower_key == text:
+            exact.append(entry)
+        elif label.startswith(text) or lower_key.startswith(text):
+            prefix.append(entry)
+        elif text in label or text in lower_key:
+            contains.append(entry)
+    return exact + prefix + contains
+
+
+def get_sort_index(coll, graph):
+    """Returns the cached sort index of a collection, building it on a miss."""
+    from arango_api import utils
+
+    def build():
+        label_fields = load_label_fields()
+        fields = label_fields.get(coll) or label_fields.get("edges") or ["label"]
+        docs = utils.get_all_by_collection(
+            coll, graph, utils.resolve_fields(list(fields))
+        )
+        return build_sort_index(docs, fields)
+
+    return get_or_set("browse_index", [coll, graph], build)
+
+
+def get_page(coll, graph, text="", offset=0, limit=None, fields=None):
+    """
+    Returns one page of a collection in display order, filtered by text,
+    with the total number of matching documents. Documents are projected to
+    fields if given.
+    """
+    from arango_api import querylog, utils
+
+    config = settings.ARANGO_API_BROWSE
+    limit = min(int(limit or config["PAGE_SIZE"]), config["MAX_PAGE_SIZE"])
+    offset = max(int(offset or 0), 0)
+
+    matches = filter_sort_index(get_sort_index(coll, graph), text or "")
+    keys = [key for key, _ in matches[offset : offset + limit]]
+
+    db = utils.resolve_graph(graph).db
+    bind_vars = {"collection": coll, "keys": keys}
+    if fields:
+        bind_vars["fields"] = fields
+    docs = querylog.execute(
+        db,
+        f"""
+        FOR key IN @keys
+            LET doc = DOCUMENT(CONCAT(@collection, "/", key))
+            FILTER doc != null
+            RETURN {"KEEP(doc, @fields)" if fields else "doc"}
+        """,
+        bind_vars=bind_vars,
+    )
+    return {"total": len(matches), "offset": offset, "limit": limit, "results": docs}
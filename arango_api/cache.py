@@ -0,0 +1,137 @@
+"""
+Caching of arango_api results in the Django cache. Misses are computed
+through coalesce(), so a cold key is queried once however many requests
+arrive for it at the same time. Keys include the current data version, so
+results cached before an ETL reload are never returned after it.
+
+Expired results are kept for a while longer and returned stale, marking the
+response stale, while they are refreshed in the background. Refreshes wait
+while the circuit breaker is open, so stale results keep being served while
+the database is down or restarting.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from arango_api.breaker import get_breaker
+from arango_api.coalesce import coalesce, make_key
+from arango_api.dataversion import get_version, tracker
+
+
+logger = logging.getLogger(__name__)
+
+_stale = contextvars.ContextVar("arango_api_stale", default=None)
+
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+# The data version workers last polled, for processes that don't poll it
+SERVED_VERSION_KEY = "arango_api:served_version"
+
+
+def _cache_key(endpoint, params, version=None):
+    version = version or get_version() or "-"
+    return f"arango_api:{version}:{make_key(endpoint, params)}"
+
+
+def begin_request():
+    """Starts tracking whether the current request is served stale results."""
+    served = {"stale": False}
+    return served, _stale.set(served)
+
+
+def end_request(state):
+    """Returns whether the request was served any stale result."""
+    served, token = state
+    _stale.reset(token)
+    return served["stale"]
+
+
+def _mark_stale():
+    served = _stale.get()
+    if served is not None:
+        served["stale"] = True
+
+
+def _set(key, result, timeout, cache_if):
+    if cache_if is None or cache_if(result):
+        expires = time.time() + timeout
+        cache.set(
+            key, (expires, result), timeout + settings.ARANGO_API_CACHE_STALE_TIMEOUT
+        )
+
+
+def _revalidate(key, endpoint, params, fn, timeout, cache_if):
+    """Refreshes an expired result in a background thread, unless one is."""
+    circuit_breaker = get_breaker()
+    if circuit_breaker is not None and not circuit_breaker.allows_calls():
+        return
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+
+    def run():
+        try:
+            _set(key, coalesce(endpoint, params, fn), timeout, cache_if)
+        except Exception:
+            logger.warning(
+                "Refreshing a stale %s result failed", endpoint, exc_info=True
+            )
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(key)
+
+    threading.Thread(target=run, name="arango-api-revalidate", daemon=True).start()
+
+
+def get_or_set(endpoint, params, fn, timeout=None, cache_if=None):
+    """
+    Returns the cached result for the request identified by endpoint and
+    params, computing and caching it with fn on a miss. Results for which
+    cache_if returns False are returned but not cached. Results expire
+    after timeout seconds, then are returned stale and refreshed for up to
+    ARANGO_API_CACHE_STALE_TIMEOUT seconds more.
+    """
+    if timeout is None:
+        timeout = settings.ARANGO_API_CACHE_TIMEOUT
+    key = _cache_key(endpoint, params)
+    entry = cache.get(key)
+    if entry is not None:
+        expires, result = entry
+        if time.time() >= expires:
+            _mark_stale()
+            _revalidate(key, endpoint, params, fn, timeout, cache_if)
+        return result
+
+    result = coalesce(endpoint, params, fn)
+    _set(key, result, timeout, cache_if)
+    return result
+
+
+def _publish_version(old_version, new_version):
+    cache.set(SERVED_VERSION_KEY, new_version, None)
+
+
+tracker.subscribe(_publish_version)
+
+
+def get_served_version():
+    """
+    Returns the data version the workers last polled, which their cached
+    results are keyed by, or None if no worker has polled it.
+    """
+    return cache.get(SERVED_VERSION_KEY)
+
+
+def invalidate(endpoint, params, version=None):
+    """
+    Removes the cached result for the request, if any, cached for version,
+    by default the current data version.
+    """
+    cache.delete(_cache_key(endpoint, params, version))
@@ -0,0 +1,144 @@
+"""
+Single-flight coalescing of identical concurrent requests. The first caller
+for a key runs the query, and callers arriving while it runs wait for and
+share its result. Within a process this uses an event per key. Across
+processes, when enabled, callers also serialize on a lock file per key and
+reuse the result file written by the previous holder of the lock.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+
+def make_key(endpoint, params):
+    """Returns a key identifying a request by endpoint and normalized params."""
+    normalized = json.dumps([endpoint, params], sort_keys=True, default=str)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def run(self, key, fn):
+        """Runs fn once for all concurrent callers with the same key."""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+class FileSingleFlight:
+    """
+    Cross-process coalescing through a lock file and a result file per key.
+    A caller that obtains the lock after another process wrote a result
+    since the caller started waiting reuses that result instead of running
+    fn. Results must be JSON serializable.
+    """
+
+    def __init__(self, directory, lock_timeout, result_ttl):
+        self.directory = Path(directory)
+        self.lock_timeout = lock_timeout
+        self.result_ttl = result_ttl
+
+    def run(self, key, fn):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        started = time.time()
+        result_path = self.directory / f"{key}.json"
+
+        with open(self.directory / f"{key}.lock", "w") as lock_file:
+            if not self._lock(lock_file, started):
+                # Could not coordinate in time, so run independently
+                return fn()
+            try:
+                try:
+                    if result_path.stat().st_mtime >= started:
+                        with open(result_path) as fp:
+                            return json.load(fp)
+                except (FileNotFoundError, ValueError):
+                    pass
+
+                result = fn()
+                self._write_result(result_path, result)
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _lock(self, lock_file, started):
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.time() - started > self.lock_timeout:
+                    return False
+                time.sleep(0.05)
+
+    def _write_result(self, result_path, result):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as fp:
+            json.dump(result, fp)
+        os.replace(tmp_path, result_path)
+        self._prune()
+
+    def _prune(self):
+        expired = time.time() - self.result_ttl
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json") and entry.stat().st_mtime < expired:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+_single_flight = SingleFlight()
+
+
+def coalesce(endpoint, params, fn):
+    """
+    Runs fn for the request identified by endpoint and params, sharing the
+    result with identical concurrent requests in this process and, when
+    ARANGO_API_COALESCE["CROSS_PROCESS"] is set, in other processes.
+    """
+    key = make_key(endpoint, params)
+    config = settings.ARANGO_API_COALESCE
+    if config["CROSS_PROCESS"]:
+        file_single_flight = FileSingleFlight(
+            config["DIRECTORY"], config["LOCK_TIMEOUT"], config["RESULT_TTL"]
+        )
+        return _single_flight.run(key, lambda: file_single_flight.run(key, fn))
+    return _single_flight.run(key, fn)
@@ -0,0 +1,145 @@
+"""
+Tracking of the version of the data in the graph databases, which the ETL
+rebuilds outside this app. A database's version is a fingerprint of the
+document count and revision of each of its collections. Each worker polls
+the versions in a background thread, and when they change, calls the
+subscribed callbacks, so caches and in-memory indexes can drop or rebuild
+what was computed from the previous data. The cache keys results by the
+current version, and responses carry it in the X-Data-Version header.
+"""
+
+import hashlib
+import logging
+import threading
+
+from django.conf import settings
+
+from arango_api import querylog
+
+
+logger = logging.getLogger(__name__)
+
+
+def compute_fingerprint(db):
+    """Returns a short fingerprint of the counts and revisions of db."""
+    collections = querylog.call(f"collections {db.name}", db.collections)
+    states = []
+    for collection in sorted(collections, key=lambda c: c["name"]):
+        name = collection["name"]
+        if collection["system"]:
+            continue
+        handle = db.collection(name)
+        count = querylog.call(f"collection.count {db.name} {name}", handle.count)
+        revision = querylog.call(
+            f"collection.revision {db.name} {name}", handle.revision
+        )
+        states.append(f"{name}:{count}:{revision}")
+    return hashlib.sha1("\n".join(states).encode("utf-8")).hexdigest()[:12]
+
+
+def compute_versions():
+    """Returns the fingerprint of each registered graph's database."""
+    from arango_api.db import graphs
+
+    return {name: compute_fingerprint(graph.db) for name, graph in graphs.items()}
+
+
+def combine_versions(versions):
+    """Returns the data version of all graphs from their fingerprints."""
+    return "-".join(versions[name] for name in sorted(versions))
+
+
+def compute_version():
+    """
+    Returns the current data version, computed from the databases without
+    publishing it, for processes that don't poll it, such as management
+    commands.
+    """
+    return combine_versions(compute_versions())
+
+
+class DataVersionTracker:
+    """The current data version, and the callbacks to call when it changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._known = threading.Event()
+        self.versions = {}
+        self.version = None
+
+    def subscribe(self, callback):
+        """
+        Registers callback(old_version, new_version), called when the data
+        version changes, including from None when it is first known.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def check(self):
+        """
+        Computes the current versions of the graph databases and publishes
+        a change if there is one. Returns the combined version.
+        """
+        self.update(compute_versions())
+        return self.version
+
+    def wait(self, timeout=None):
+        """
+        Waits up to timeout seconds for the version to be first known, and
+        returns it, or None if it still isn't.
+        """
+        self._known.wait(timeout)
+        return self.version
+
+    def update(self, versions):
+        version = combine_versions(versions)
+        with self._lock:
+            old_version = self.version
+            if version == old_version:
+                return
+            self.versions = versions
+            self.version = version
+            subscribers = list(self._subscribers)
+            self._known.set()
+
+        logger.info("Data version changed from %s to %s", old_version, version)
+        for callback in subscribers:
+            try:
+                callback(old_version, version)
+            except Exception:
+                logger.exception("Data version subscriber %r failed", callback)
+
+
+tracker = DataVersionTracker()
+
+
+def get_version():
+    """Returns the current data version, or None if it isn't known yet."""
+    return tracker.version
+
+
+def start_polling():
+    """
+    Starts polling the data version in a daemon thread if it is enabled in
+    ARANGO_API_DATA_VERSION. Called once the WSGI or ASGI application is
+    ready.
+    """
+    config = settings.ARANGO_API_DATA_VERSION
+    if not config["ENABLED"]:
+        return None
+
+    stopped = threading.Event()
+
+    def poll():
+        while True:
+            try:
+                tracker.check()
+            except Exception:
+                logger.exception("Data version check failed")
+            if stopped.wait(config["INTERVAL"]):
+                return
+
+    thread = threading.Thread(target=poll, name="arango-api-data-version", daemon=True)
+    thread.start()
+    return thread
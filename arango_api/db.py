@@ -1,6 +1,8 @@
 import environ
 
 from arango import ArangoClient
+from arango.http import DefaultHTTPClient
+from django.conf import settings
 
 
 # Load db info from .env file
@@ -9,18 +11,74 @@ environ.Env.read_env()
 
 # Retrieve ArangoDB credentials from the environment
 ARANGO_DB_HOST = env("ARANGO_DB_HOST")
-ARANGO_DB_NAME_ONTOLOGIES = env("ARANGO_DB_NAME_ONTOLOGIES")
-ARANGO_DB_NAME_PHENOTYPES = env("ARANGO_DB_NAME_PHENOTYPES")
 ARANGO_DB_USER = env("ARANGO_DB_USER")
 ARANGO_DB_PASSWORD = env("ARANGO_DB_PASSWORD")
-GRAPH_NAME_ONTOLOGIES = env("GRAPH_NAME_ONTOLOGIES")
-GRAPH_NAME_PHENOTYPES = env("GRAPH_NAME_PHENOTYPES")
-
-# Configure the connection
-client = ArangoClient(ARANGO_DB_HOST)
-db_ontologies = client.db(
-    ARANGO_DB_NAME_ONTOLOGIES, username=ARANGO_DB_USER, password=ARANGO_DB_PASSWORD
-)
-db_phenotypes = client.db(
-    ARANGO_DB_NAME_PHENOTYPES, username=ARANGO_DB_USER, password=ARANGO_DB_PASSWORD
-)
+
+
+class UnknownGraph(ValueError):
+    pass
+
+
+class Graph:
+    """
+    A graph served by the API: its ArangoDB database handle, with its own
+    connection pool, and the name of the named graph in that database.
+    """
+
+    def __init__(self, name, db, graph_name):
+        self.name = name
+        self.db = db
+        self.graph_name = graph_name
+
+    def __repr__(self):
+        return f"<Graph {self.name}: {self.db.name}/{self.graph_name}>"
+
+
+def connect(name, config):
+    """Returns the Graph named name, connected as configured."""
+    env_name = name.upper()
+    hosts = config.get("HOSTS") or ARANGO_DB_HOST
+    if isinstance(hosts, str):
+        hosts = [host.strip() for host in hosts.split(",")]
+    client = ArangoClient(
+        hosts=hosts,
+        host_resolver="roundrobin",
+        http_client=DefaultHTTPClient(
+            request_timeout=config["TIMEOUT"],
+            pool_connections=len(hosts),
+            pool_maxsize=config["POOL_SIZE"],
+        ),
+    )
+    db = client.db(
+        config.get("DATABASE") or env(f"ARANGO_DB_NAME_{env_name}"),
+        username=ARANGO_DB_USER,
+        password=ARANGO_DB_PASSWORD,
+    )
+    graph_name = config.get("GRAPH") or env(f"GRAPH_NAME_{env_name}")
+    return Graph(name, db, graph_name)
+
+
+# Graphs by name, each with its own connection pool
+graphs = {
+    name: connect(name, config) for name, config in settings.ARANGO_API_GRAPHS.items()
+}
+
+
+def resolve_graph(name=None):
+    """
+    Returns the Graph named name, ignoring case, or the default graph if name
+    is empty. Raises UnknownGraph for other names.
+    """
+    if not name:
+        name = settings.ARANGO_API_DEFAULT_GRAPH
+    try:
+        return graphs[name.lower()]
+    except (AttributeError, KeyError):
+        raise UnknownGraph(f"Unknown graph: {name}") from None
+
+
+# Handles of the two original graphs, used by queries specific to them
+db_ontologies = graphs["ontologies"].db
+db_phenotypes = graphs["phenotypes"].db
+GRAPH_NAME_ONTOLOGIES = graphs["ontologies"].graph_name
+GRAPH_NAME_PHENOTYPES = graphs["phenotypes"].graph_name
@@ -0,0 +1,67 @@
+"""
+Compact summaries of the subgraph a client already holds, used by the
+graph expand endpoint to return only what the client does not have.
+"""
+
+import base64
+
+
+FNV_PRIME = 16777619
+FNV_OFFSET_BASIS = 2166136261
+# Offset basis of the second hash used for double hashing
+FNV_OFFSET_BASIS_2 = 0x5BD1E995
+
+
+def fnv1a_32(value, offset_basis=FNV_OFFSET_BASIS):
+    """32-bit FNV-1a hash of the UTF-8 encoding of a string."""
+    h = offset_basis
+    for byte in value.encode("utf-8"):
+        h ^= byte
+        h = (h * FNV_PRIME) & 0xFFFFFFFF
+    return h
+
+
+class BloomFilter:
+    """
+    Bloom filter over node and edge ids. Bit i of the filter is bit
+    (i % 8) of byte (i // 8). The k bit positions of an id are
+    (h1 + j * h2) % m for j in 0..k-1, where h1 and h2 are 32-bit FNV-1a
+    hashes of the id using offset bases FNV_OFFSET_BASIS and
+    FNV_OFFSET_BASIS_2, and m is the number of bits.
+    """
+
+    def __init__(self, bits, hashes):
+        if not bits or hashes < 1:
+            raise ValueError("A bloom filter needs at least one bit and one hash")
+        self.bits = bytearray(bits)
+        self.hashes = hashes
+        self.size = len(self.bits) * 8
+
+    def _positions(self, value):
+        h1 = fnv1a_32(value)
+        h2 = fnv1a_32(value, FNV_OFFSET_BASIS_2)
+        return ((h1 + j * h2) % self.size for j in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position // 8] & (1 << (position % 8))
+            for position in self._positions(value)
+        )
+
+    @classmethod
+    def from_json(cls, data):
+        """Creates a filter from {"bits": <base64>, "hashes": <k>}."""
+        try:
+            return cls(base64.b64decode(data["bits"]), int(data["hashes"]))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid known_digest: {e}")
+
+    def to_json(self):
+        return {
+            "bits": base64.b64encode(bytes(self.bits)).decode("ascii"),
+            "hashes": self.hashes,
+        }
@@ -0,0 +1,259 @@
+"""
+Query-plan summaries for the AQL built in arango_api.utils, used to catch
+plan regressions (new full collection scans, lost indexes, cost jumps)
+before they reach production.
+"""
+
+import json
+from collections import Counter
+from pathlib import Path
+
+from arango_api import querylog, utils
+from arango_api.db import (
+    db_ontologies,
+    GRAPH_NAME_ONTOLOGIES,
+    db_phenotypes,
+)
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / "tests" / "query_plans.json"
+
+# Default regression thresholds
+COST_TOLERANCE = 1.5
+LARGE_COLLECTION_COUNT = 1000
+
+
+def get_query_cases():
+    """
+    Returns (name, db, query, bind_vars) for every query template in
+    arango_api.utils, instantiated with sample arguments that resolve
+    against the test fixture database.
+    """
+    cases = [
+        (
+            "get_graph",
+            db_ontologies,
+            *utils.build_graph_query(
+                ["CL/0000061"], 2, "ANY", ["CL", "GO", "UBERON"], 100, "ontologies"
+            ),
+        ),
+        (
+            "get_graph.fields",
+            db_ontologies,
+            *utils.build_graph_query(
+                ["CL/0000061"],
+                2,
+                "ANY",
+                ["CL", "GO", "UBERON"],
+                100,
+                "ontologies",
+                utils.resolve_fields("minimal"),
+            ),
+        ),
+        (
+            "get_graph.set_operation",
+            db_ontologies,
+            *utils.build_graph_set_operation_query(
+                ["CL/0000061", "CL/0000151"],
+                2,
+                "ANY",
+                ["CL", "GO", "UBERON"],
+                100,
+                "ontologies",
+                "Intersection",
+            ),
+        ),
+        (
+            "get_graph.batch",
+            db_ontologies,
+            *utils.build_graph_batch_query(
+                ["CL/0000061", "CL/0000151"],
+                2,
+                "ANY",
+                ["CL", "GO", "UBERON"],
+                100,
+                "ontologies",
+            ),
+        ),
+        (
+            "expand_graph",
+            db_ontologies,
+            *utils.build_graph_expand_query(
+                ["CL/0000061"],
+                1,
+                "ANY",
+                ["CL", "GO", "UBERON"],
+                100,
+                "ontologies",
+                ["CL/0000061", "CL/0000151"],
+            ),
+        ),
+        (
+            "get_shortest_paths",
+            db_ontologies,
+            *utils.build_shortest_path_query("CL/0000061", "CL/0000151", "ANY"),
+        ),
+        (
+            "get_shortest_paths.max_paths",
+            db_ontologies,
+            *utils.build_shortest_path_query(
+                "CL/0000061", "CL/0000151", "ANY", max_paths=3
+            ),
+        ),
+        ("search_by_term", db_ontologies, *utils.build_search_query("at1")),
+        (
+            "search_by_term.facets",
+            db_ontologies,
+            *utils.build_search_query("at1", collections=["CL"], facets=True),
+        ),
+        (
+            "get_ontologies_sunburst.root",
+            db_ontologies,
+            *utils.build_sunburst_root_query(
+                "CL/0000000", GRAPH_NAME_ONTOLOGIES, "subClassOf"
+            ),
+        ),
+        (
+            "get_ontologies_sunburst.children",
+            db_ontologies,
+            *utils.build_sunburst_children_query(
+                "CL/0000000", GRAPH_NAME_ONTOLOGIES, "subClassOf"
+            ),
+        ),
+        (
+            "get_phenotypes_sunburst",
+            db_phenotypes,
+            *utils.build_phenotypes_sunburst_query(),
+        ),
+        (
+            "get_phenotypes_sunburst.slice",
+            db_phenotypes,
+            *utils.build_phenotypes_sunburst_slice_query("UBERON/0002048"),
+        ),
+    ]
+    return cases
+
+
+def _iter_plan_nodes(nodes):
+    """Yields plan nodes, descending into subquery plans."""
+    for node in nodes:
+        yield node
+        subquery = node.get("subquery")
+        if subquery:
+            yield from _iter_plan_nodes(subquery.get("nodes", []))
+
+
+def _iter_node_indexes(node):
+    """Yields index descriptions from a plan node, whatever their nesting."""
+    indexes = node.get("indexes")
+    if isinstance(indexes, list):
+        yield from indexes
+    elif isinstance(indexes, dict):
+        # Traversal nodes split indexes into "base" and per-depth "levels"
+        yield from indexes.get("base", [])
+        for level_indexes in indexes.get("levels", {}).values():
+            yield from level_indexes
+
+
+def summarize_plan(plan, db):
+    """
+    Reduces an explain plan to the parts that are compared between runs:
+    estimated cost, plan node type counts, indexes used, and the collections
+    that are enumerated in full along with their document counts.
+    """
+    node_types = Counter()
+    indexes = set()
+    collection_scans = {}
+
+    for node in _iter_plan_nodes(plan.get("nodes", [])):
+        node_types[node["type"]] += 1
+
+        if node["type"] == "EnumerateCollectionNode":
+            name = node["collection"]
+            collection_scans[name] = querylog.call(
+                f"collection.count {db.name} {name}", db.collection(name).count
+            )
+
+        for index in _iter_node_indexes(node):
+            collection = index.get("collection") or node.get("collection", "")
+            fields = ",".join(index.get("fields", []))
+            indexes.add(f"{collection}:{index.get('type')}:{fields}")
+
+    return {
+        "estimated_cost": plan.get("estimatedCost", 0),
+        "node_types": dict(sorted(node_types.items())),
+        "indexes": sorted(indexes),
+        "collection_scans": dict(sorted(collection_scans.items())),
+    }
+
+
+def collect_plans():
+    """Explains every query case, keyed by case name."""
+    plans = {}
+    for name, db, query, bind_vars in get_query_cases():
+        try:
+            plan = querylog.call(
+                f"aql.explain {db.name}", db.aql.explain, query, bind_vars=bind_vars
+            )
+            plans[name] = summarize_plan(plan, db)
+        except Exception as e:
+            plans[name] = {"error": str(e)}
+    return plans
+
+
+def compare_plans(
+    baseline,
+    current,
+    cost_tolerance=COST_TOLERANCE,
+    large_collection_count=LARGE_COLLECTION_COUNT,
+):
+    """
+    Returns a list of regression messages for current plans against the
+    baseline. An empty list means no regressions.
+    """
+    regressions = []
+
+    for name, expected in baseline.items():
+        actual = current.get(name)
+        if actual is None:
+            regressions.append(f"{name}: query case missing")
+            continue
+        if "error" in actual:
+            if "error" not in expected:
+                regressions.append(f"{name}: explain failed: {actual['error']}")
+            continue
+        if "error" in expected:
+            continue
+
+        for collection, count in actual["collection_scans"].items():
+            if (
+                collection not in expected["collection_scans"]
+                and count >= large_collection_count
+            ):
+                regressions.append(
+                    f"{name}: new full scan of {collection} ({count} documents)"
+                )
+
+        for index in expected["indexes"]:
+            if index not in actual["indexes"]:
+                regressions.append(f"{name}: index no longer used: {index}")
+
+        expected_cost = expected["estimated_cost"]
+        actual_cost = actual["estimated_cost"]
+        if expected_cost and actual_cost > expected_cost * cost_tolerance:
+            regressions.append(
+                f"{name}: estimated cost rose from {expected_cost} to {actual_cost}"
+            )
+
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as fp:
+        return json.load(fp)
+
+
+def write_baseline(plans, path=BASELINE_PATH):
+    with open(path, "w") as fp:
+        json.dump(plans, fp, indent=2, sort_keys=True)
+        fp.write("\n")
@@ -0,0 +1,228 @@
+"""
+Subgraph export. The get_graph traversal is run level by level with
+iter_graph_levels, and each level is written out as soon as it is
+computed, as GraphML, or as an Arrow IPC stream or Parquet file of the
+node or edge table. Only the ids of nodes already written are kept, so
+memory is bounded by the largest level rather than the whole subgraph.
+Arrow and Parquet need pyarrow, which is optional.
+"""
+
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+# Content type and file extension of each format
+FORMATS = {
+    "graphml": ("application/graphml+xml", "graphml"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+TABLES = ["nodes", "edges"]
+
+# Columns of each table and their Arrow types
+COLUMNS = {
+    "nodes": {
+        "id": "string",
+        "key": "string",
+        "collection": "string",
+        "label": "string",
+        "depth": "int32",
+    },
+    "edges": {
+        "id": "string",
+        "source": "string",
+        "target": "string",
+        "collection": "string",
+        "label": "string",
+        "depth": "int32",
+    },
+}
+
+
+def is_available(export_format):
+    return export_format == "graphml" or pyarrow is not None
+
+
+def _label(doc):
+    label = doc.get("label")
+    if isinstance(label, list):
+        label = label[0] if label else None
+    return None if label is None else str(label)
+
+
+def iter_rows(levels):
+    """
+    Yields (nodes, edges) row lists for each level record of
+    iter_graph_levels, without the nodes already yielded. Raises
+    RuntimeError if the traversal fails.
+    """
+    node_ids = set()
+    for record in levels:
+        if record["type"] == "error":
+            raise RuntimeError(f"Graph traversal failed: {record['error']}")
+        if record["type"] != "level":
+            continue
+        depth = record["depth"]
+        nodes = []
+        for group in record["nodes"].values():
+            for item in group:
+                doc = item["node"]
+                if doc["_id"] in node_ids:
+                    continue
+                node_ids.add(doc["_id"])
+                nodes.append(
+                    {
+                        "id": doc["_id"],
+                        "key": doc["_key"],
+                        "collection": doc["_id"].split("/", 1)[0],
+                        "label": _label(doc),
+                        "depth": depth,
+                    }
+                )
+        edges = [
+            {
+                "id": link["_id"],
+                "source": link["_from"],
+                "target": link["_to"],
+                "collection": link["_id"].split("/", 1)[0],
+                "label": _label(link),
+                "depth": depth,
+            }
+            for link in record["links"]
+        ]
+        yield nodes, edges
+
+
+def _graphml_data(key, value):
+    if value is None:
+        return ""
+    return f"<data key={quoteattr(key)}>{escape(str(value))}</data>"
+
+
+def iter_graphml(levels):
+    """Yields a GraphML document of the subgraph, a level at a time."""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+    yield '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+    for table, element in [("nodes", "node"), ("edges", "edge")]:
+        for column, arrow_type in COLUMNS[table].items():
+            if column in ("id", "source", "target"):
+                continue
+            graphml_type = "int" if arrow_type == "int32" else "string"
+            yield (
+                f'<key id="{element}_{column}" for="{element}" '
+                f'attr.name="{column}" attr.type="{graphml_type}"/>\n'
+            )
+    yield '<graph edgedefault="directed">\n'
+
+    for nodes, edges in iter_rows(levels):
+        lines = []
+        for node in nodes:
+            data = "".join(
+                _graphml_data(f"node_{column}", node[column])
+                for column in ("key", "collection", "label", "depth")
+            )
+            lines.append(f"<node id={quoteattr(node['id'])}>{data}</node>\n")
+        for edge in edges:
+            data = "".join(
+                _graphml_data(f"edge_{column}", edge[column])
+                for column in ("collection", "label", "depth")
+            )
+            lines.append(
+                f"<edge id={quoteattr(edge['id'])} "
+                f"source={quoteattr(edge['source'])} "
+                f"target={quoteattr(edge['target'])}>{data}</edge>\n"
+            )
+        yield "".join(lines)
+
+    yield "</graph>\n</graphml>\n"
+
+
+class _ChunkSink:
+    """
+    A write-only file collecting what the Arrow writers write, to be taken
+    and sent as chunks. The position keeps counting across chunks, as the
+    Parquet footer records offsets.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self):
+        content = b"".join(self._chunks)
+        self._chunks = []
+        return content
+
+
+def _schema(table):
+    return pyarrow.schema(
+        [
+            (column, getattr(pyarrow, arrow_type)())
+            for column, arrow_type in COLUMNS[table].items()
+        ]
+    )
+
+
+def iter_arrow(levels, table, export_format):
+    """
+    Yields the node or edge table of the subgraph as an Arrow IPC stream or
+    a Parquet file, written in record batches of at most
+    ARANGO_API_EXPORT["BATCH_ROWS"] rows.
+    """
+    batch_rows = settings.ARANGO_API_EXPORT["BATCH_ROWS"]
+    schema = _schema(table)
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+
+    rows = []
+    for nodes, edges in iter_rows(levels):
+        rows.extend(nodes if table == "nodes" else edges)
+        while len(rows) >= batch_rows:
+            batch, rows = rows[:batch_rows], rows[batch_rows:]
+            writer.write_batch(pyarrow.RecordBatch.from_pylist(batch, schema))
+            yield sink.take()
+    if rows:
+        writer.write_batch(pyarrow.RecordBatch.from_pylist(rows, schema))
+    writer.close()
+    yield sink.take()
+
+
+def iter_export(levels, export_format, table="nodes"):
+    """Yields the subgraph traversed by levels in export_format."""
+    if export_format == "graphml":
+        return iter_graphml(levels)
+    return iter_arrow(levels, table, export_format)
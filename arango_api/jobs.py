@@ -0,0 +1,225 @@
+"""
+Background jobs for computations too long for a request, such as the full
+phenotype sunburst, get_all, large AQL queries, and shortest paths between
+many nodes. A job is submitted with its kind and parameters, runs in this
+worker's thread pool, and writes its JSON result to a file, downloaded
+once the job succeeded. Job state is kept in the Job model, so any worker
+can report it. Jobs and their results are deleted RESULT_TTL seconds after
+they finish, and results over MAX_RESULT_BYTES fail the job.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from arango_api import querylog, utils
+from arango_api.db import resolve_graph
+from arango_api.models import Job
+from arango_api.rendering import dumps
+
+
+logger = logging.getLogger(__name__)
+
+
+class TooManyJobs(Exception):
+    pass
+
+
+# Job functions by kind, called with the job parameters and a function to
+# report the fraction done, and returning the result
+JOB_KINDS = {}
+
+
+def job_kind(name):
+    def decorator(fn):
+        JOB_KINDS[name] = fn
+        return fn
+
+    return decorator
+
+
+@job_kind("get_all")
+def run_get_all(params, progress):
+    return utils.get_all(params.get("graph"), raise_errors=True)
+
+
+@job_kind("run_aql_query")
+def run_aql_query(params, progress):
+    query = params.get("query")
+    if not query:
+        raise ValueError("No query provided")
+    rows = querylog.execute(resolve_graph(params.get("graph")).db, query)
+    return rows[0] if rows else []
+
+
+@job_kind("get_shortest_paths")
+def run_get_shortest_paths(params, progress):
+    return utils.get_shortest_paths(
+        params.get("node_ids") or [],
+        params.get("edge_direction"),
+        params.get("max_paths"),
+        params.get("graph"),
+        progress,
+        raise_errors=True,
+    )
+
+
+@job_kind("phenotypes_sunburst")
+def run_phenotypes_sunburst(params, progress):
+    response = utils.get_phenotypes_sunburst(
+        params.get("parent_id"), bool(params.get("lazy", False))
+    )
+    if response.status_code != 200:
+        raise RuntimeError(response.data.get("error", "Sunburst query failed"))
+    return response.data
+
+
+def result_path(job_id):
+    return Path(settings.ARANGO_API_JOBS["DIRECTORY"]) / f"{job_id}.json"
+
+
+def describe(job):
+    """Returns the state of job as reported by the job endpoints."""
+    description = {
+        "id": str(job.id),
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "error": job.error or None,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at and job.started_at.isoformat(),
+        "finished_at": job.finished_at and job.finished_at.isoformat(),
+        "result_size": job.result_size,
+        "result_url": None,
+    }
+    if job.status == Job.Status.SUCCEEDED:
+        description["result_url"] = reverse("get_job_result", kwargs={"job_id": job.id})
+    return description
+
+
+def prune():
+    """
+    Deletes jobs that finished more than RESULT_TTL seconds ago with their
+    results, and fails jobs left unfinished for more than MAX_RUNTIME
+    seconds, for example by a restarted worker.
+    """
+    config = settings.ARANGO_API_JOBS
+    now = timezone.now()
+    expired = Job.objects.filter(
+        finished_at__lt=now - timedelta(seconds=config["RESULT_TTL"])
+    )
+    for job_id in expired.values_list("id", flat=True):
+        result_path(job_id).unlink(missing_ok=True)
+    expired.delete()
+
+    Job.objects.filter(
+        status__in=[Job.Status.QUEUED, Job.Status.RUNNING],
+        created_at__lt=now - timedelta(seconds=config["MAX_RUNTIME"]),
+    ).update(status=Job.Status.FAILED, error="Interrupted", finished_at=now)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Returns this worker's job thread pool, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ARANGO_API_JOBS["WORKERS"],
+                thread_name_prefix="arango-api-job",
+            )
+        return _executor
+
+
+def submit(kind, params):
+    """
+    Creates a job and queues it to run in the background. Raises ValueError
+    for an unknown kind or graph, and TooManyJobs when MAX_PENDING jobs are
+    already queued or running.
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    resolve_graph(params.get("graph"))
+
+    prune()
+    pending = Job.objects.filter(
+        status__in=[Job.Status.QUEUED, Job.Status.RUNNING]
+    ).count()
+    if pending >= settings.ARANGO_API_JOBS["MAX_PENDING"]:
+        raise TooManyJobs("Too many pending jobs")
+
+    job = Job.objects.create(kind=kind, params=params)
+    get_executor().submit(_run_in_background, job.id)
+    return job
+
+
+def _progress_reporter(job_id, interval=1.0):
+    """Returns a function saving the fraction done, at most every interval."""
+    last_saved = 0.0
+
+    def report(fraction):
+        nonlocal last_saved
+        now = time.monotonic()
+        if now - last_saved >= interval:
+            last_saved = now
+            Job.objects.filter(id=job_id).update(progress=round(fraction, 3))
+
+    return report
+
+
+def _write_result(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as fp:
+        fp.write(content)
+    os.replace(tmp_path, path)
+
+
+def run(job_id):
+    """Runs a queued job, saving its result or error."""
+    try:
+        Job.objects.filter(id=job_id).update(
+            status=Job.Status.RUNNING, started_at=timezone.now()
+        )
+        job = Job.objects.get(id=job_id)
+        result = JOB_KINDS[job.kind](job.params, _progress_reporter(job_id))
+
+        content = dumps(result)
+        max_bytes = settings.ARANGO_API_JOBS["MAX_RESULT_BYTES"]
+        if len(content) > max_bytes:
+            raise ValueError(
+                f"Result of {len(content)} bytes is over the limit of {max_bytes}"
+            )
+        _write_result(result_path(job_id), content)
+        Job.objects.filter(id=job_id).update(
+            status=Job.Status.SUCCEEDED,
+            progress=1.0,
+            result_size=len(content),
+            finished_at=timezone.now(),
+        )
+    except Exception as e:
+        logger.exception("Job %s failed", job_id)
+        Job.objects.filter(id=job_id).update(
+            status=Job.Status.FAILED, error=str(e), finished_at=timezone.now()
+        )
+
+
+def _run_in_background(job_id):
+    try:
+        run(job_id)
+    finally:
+        # Close the pool thread's database connection
+        connection.close()
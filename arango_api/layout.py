@@ -0,0 +1,162 @@
+"""
+Server-side initial layout of get_graph results, so the browser's force
+simulation starts from settled positions and only needs a short refinement
+pass. Positions are computed with a vectorized Fruchterman-Reingold force
+layout: exact repulsion between all pairs of nodes, in blocks of rows to
+bound memory, for graphs of up to EXACT_MAX_NODES nodes, and repulsion from
+a random sample of nodes, scaled up, for larger graphs. Layouts are cached
+by a signature of the subgraph's nodes and links, so users viewing the same
+subgraph share them. NumPy is optional; without it no layout is computed.
+"""
+
+import hashlib
+import logging
+import math
+
+from django.conf import settings
+
+from arango_api.cache import get_or_set
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    logger.warning("NumPy not installed, graph layouts won't be computed")
+
+# Rows of the pairwise repulsion computed at once
+BLOCK_SIZE = 512
+
+
+def is_available():
+    return np is not None
+
+
+def _repulsion(pos, rng, exact_max_nodes, sample_size):
+    n = len(pos)
+    x, y = pos[:, 0], pos[:, 1]
+    disp = np.empty_like(pos)
+    sampled = n > exact_max_nodes
+    for start in range(0, n, BLOCK_SIZE):
+        stop = min(start + BLOCK_SIZE, n)
+        if sampled:
+            others = rng.integers(0, n, size=(stop - start, sample_size))
+            dx = x[start:stop, None] - x[others]
+            dy = y[start:stop, None] - y[others]
+        else:
+            dx = x[start:stop, None] - x[None, :]
+            dy = y[start:stop, None] - y[None, :]
+        inverse = dx * dx
+        inverse += dy * dy
+        np.maximum(inverse, 1e-9, out=inverse)
+        np.reciprocal(inverse, out=inverse)
+        disp[start:stop, 0] = (dx * inverse).sum(axis=1)
+        disp[start:stop, 1] = (dy * inverse).sum(axis=1)
+    if sampled:
+        disp *= (n - 1) / sample_size
+    return disp
+
+
+def force_layout(n, edges, iterations, exact_max_nodes, sample_size, seed=0):
+    """
+    Returns an (n, 2) array of positions for nodes 0 to n - 1 linked by
+    edges, a sequence of (source, target) index pairs, centered on the
+    origin and scaled to a mean edge length of 1.
+    """
+    rng = np.random.default_rng(seed)
+    if n < 2:
+        return np.zeros((n, 2))
+
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    source, target = edges[:, 0], edges[:, 1]
+    pos = rng.uniform(-0.5, 0.5, size=(n, 2)) * np.sqrt(n)
+    temperature = np.sqrt(n) / 10
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        disp = _repulsion(pos, rng, exact_max_nodes, sample_size)
+
+        # Attraction along edges, proportional to the squared length
+        delta = pos[source] - pos[target]
+        pull = delta * np.linalg.norm(delta, axis=1, keepdims=True)
+        np.subtract.at(disp, source, pull)
+        np.add.at(disp, target, pull)
+
+        # Gravity keeps disconnected components together
+        disp -= pos * (1 / np.sqrt(n))
+
+        # Move each node at most the current temperature
+        length = np.maximum(np.linalg.norm(disp, axis=1, keepdims=True), 1e-9)
+        pos += disp / length * np.minimum(length, temperature)
+        temperature -= cooling
+
+    pos -= pos.mean(axis=0)
+    if len(edges):
+        # Forces settle at edges longer than 1 in dense graphs, so rescale
+        pos /= np.linalg.norm(pos[source] - pos[target], axis=1).mean()
+    return pos
+
+
+def get_node_ids(results):
+    """Returns the distinct node ids of a get_graph result."""
+    node_ids = {}
+    for group in results["nodes"].values():
+        for item in group:
+            if item.get("node"):
+                node_ids[item["node"]["_id"]] = None
+    return list(node_ids)
+
+
+def get_signature(node_ids, links):
+    """Returns a signature identifying a subgraph by its nodes and links."""
+    digest = hashlib.sha1()
+    for node_id in sorted(node_ids):
+        digest.update(f"{node_id}\n".encode("utf-8"))
+    digest.update(b"\n")
+    for source, target in sorted((link["_from"], link["_to"]) for link in links):
+        digest.update(f"{source} {target}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def get_layout(results):
+    """
+    Returns the cached layout of a get_graph result, as x and y per node id,
+    with edges of about ARANGO_API_LAYOUT["EDGE_LENGTH"]. Returns None if
+    NumPy isn't installed or the graph has fewer than MIN_NODES or more than
+    MAX_NODES nodes. Larger graphs take longer to untangle, so the number of
+    iterations grows with the square root of the number of nodes.
+    """
+    config = settings.ARANGO_API_LAYOUT
+    node_ids = get_node_ids(results)
+    n = len(node_ids)
+    if not config["MIN_NODES"] <= n <= config["MAX_NODES"] or not is_available():
+        return None
+    iterations = math.ceil(config["ITERATIONS"] * math.sqrt(n / config["MIN_NODES"]))
+
+    def compute_layout():
+        positions = {node_id: i for i, node_id in enumerate(node_ids)}
+        edges = [
+            (positions[link["_from"]], positions[link["_to"]])
+            for link in results["links"]
+            if link["_from"] in positions and link["_to"] in positions
+        ]
+        pos = force_layout(
+            n,
+            edges,
+            iterations,
+            config["EXACT_MAX_NODES"],
+            config["SAMPLE_SIZE"],
+        )
+        pos = np.round(pos * config["EDGE_LENGTH"], 1)
+        return {
+            node_id: {"x": float(x), "y": float(y)}
+            for node_id, (x, y) in zip(node_ids, pos)
+        }
+
+    return get_or_set(
+        "graph_layout",
+        [get_signature(node_ids, results["links"])],
+        compute_layout,
+        timeout=config["CACHE_TIMEOUT"],
+    )
@@ -0,0 +1,246 @@
+"""
+Transitive closure of subClassOf in the ontologies database, for lineage
+lookups without graph traversals. The build_lineage_index command stores
+the sorted ancestor ids of every node in a file, with the data version it
+was built from, which each worker loads once, deriving sorted descendant
+ids. When the data version differs from the file's, one worker rebuilds
+the file and the others load it. Ancestor and descendant lists are then
+lookups, descendant checks are binary searches, and lowest common ancestors
+are found from the intersection of two ancestor lists.
+"""
+
+from array import array
+from bisect import bisect_left
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+
+from django.conf import settings
+
+from arango_api import querylog
+from arango_api.coalesce import FileSingleFlight
+from arango_api.dataversion import tracker
+
+
+logger = logging.getLogger(__name__)
+
+
+class LineageIndex:
+    """Sorted ancestor and descendant positions of each node id."""
+
+    def __init__(self, ids, ancestors, version=None):
+        self.ids = ids
+        self.version = version
+        self.positions = {node_id: i for i, node_id in enumerate(ids)}
+        self.ancestors = [array("i", sorted(positions)) for positions in ancestors]
+        descendants = [[] for _ in ids]
+        for i, positions in enumerate(self.ancestors):
+            for ancestor in positions:
+                descendants[ancestor].append(i)
+        self.descendants = [array("i", positions) for positions in descendants]
+
+    @classmethod
+    def from_edges(cls, edges, version=None):
+        """
+        Builds the index from (child, parent) id pairs, for data version.
+        Edges closing a cycle are ignored.
+        """
+        ids = sorted({node_id for edge in edges for node_id in edge})
+        positions = {node_id: i for i, node_id in enumerate(ids)}
+        parents = [set() for _ in ids]
+        for child, parent in edges:
+            if child != parent:
+                parents[positions[child]].add(positions[parent])
+
+        ancestors = [None] * len(ids)
+        for start in range(len(ids)):
+            if ancestors[start] is not None:
+                continue
+            # Iterative depth-first search, completing parents first
+            visiting = {start}
+            stack = [(start, iter(list(parents[start])))]
+            while stack:
+                node, pending = stack[-1]
+                parent = next(pending, None)
+                if parent is None:
+                    stack.pop()
+                    visiting.discard(node)
+                    node_ancestors = set()
+                    for p in parents[node]:
+                        if ancestors[p] is not None:
+                            node_ancestors.add(p)
+                            node_ancestors.update(ancestors[p])
+                    ancestors[node] = node_ancestors
+                elif ancestors[parent] is None:
+                    if parent in visiting:
+                        logger.warning("Ignoring subClassOf cycle at %s", ids[parent])
+                        parents[node].discard(parent)
+                        continue
+                    visiting.add(parent)
+                    stack.append((parent, iter(list(parents[parent]))))
+        return cls(ids, ancestors, version)
+
+    def save(self, path):
+        """
+        Writes the index to a temporary file that replaces path when
+        complete, so workers loading it never read a partial index.
+        """
+        path = Path(path)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt") as fp:
+                json.dump(
+                    {
+                        "version": self.version,
+                        "ids": self.ids,
+                        "ancestors": [list(a) for a in self.ancestors],
+                    },
+                    fp,
+                    separators=(",", ":"),
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, "rt") as fp:
+            data = json.load(fp)
+        return cls(data["ids"], data["ancestors"], data.get("version"))
+
+    def _position(self, node_id):
+        try:
+            return self.positions[node_id]
+        except KeyError:
+            raise KeyError(f"Not in the lineage index: {node_id}") from None
+
+    def get_ancestors(self, node_id):
+        """Returns the ids of all ancestors of node_id. Raises KeyError."""
+        return [self.ids[i] for i in self.ancestors[self._position(node_id)]]
+
+    def get_descendants(self, node_id):
+        """Returns the ids of all descendants of node_id. Raises KeyError."""
+        return [self.ids[i] for i in self.descendants[self._position(node_id)]]
+
+    def is_descendant(self, node_id, ancestor_id):
+        """Returns whether node_id is a descendant of ancestor_id."""
+        ancestors = self.ancestors[self._position(node_id)]
+        ancestor = self._position(ancestor_id)
+        i = bisect_left(ancestors, ancestor)
+        return i < len(ancestors) and ancestors[i] == ancestor
+
+    def get_lowest_common_ancestors(self, node_ids):
+        """
+        Returns the common ancestors of node_ids, each node counting as its
+        own ancestor, that are not ancestors of another common ancestor.
+        """
+        common = None
+        for node_id in node_ids:
+            position = self._position(node_id)
+            lineage = set(self.ancestors[position])
+            lineage.add(position)
+            common = lineage if common is None else common & lineage
+        if not common:
+            return []
+        not_lowest = set()
+        for position in common:
+            not_lowest.update(self.ancestors[position])
+        return sorted(self.ids[i] for i in common - not_lowest)
+
+
+def iter_subclass_edges():
+    """Yields (child, parent) for every subClassOf edge in the ontologies."""
+    from arango_api.db import db_ontologies
+
+    collections = querylog.call(
+        f"collections {db_ontologies.name}", db_ontologies.collections
+    )
+    for collection in collections:
+        if collection["type"] != "edge" or collection["name"].startswith("_"):
+            continue
+        rows = querylog.execute(
+            db_ontologies,
+            """
+            FOR edge IN @@collection
+                FILTER edge.label == @label
+                RETURN [edge._from, edge._to]
+            """,
+            bind_vars={
+                "@collection": collection["name"],
+                "label": settings.ARANGO_API_LINEAGE["LABEL"],
+            },
+            stream=True,
+        )
+        for child, parent in rows:
+            yield child, parent
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """
+    Returns this worker's lineage index, loading it on first use. Returns
+    None if the index hasn't been built.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                try:
+                    _index = LineageIndex.load(settings.ARANGO_API_LINEAGE["PATH"])
+                except FileNotFoundError:
+                    logger.warning("Lineage index not built")
+                    return None
+    return _index
+
+
+def build_index(version=None):
+    """Builds the lineage index from the database."""
+    return LineageIndex.from_edges(list(iter_subclass_edges()), version)
+
+
+def rebuild_index(old_version, new_version):
+    """
+    Rebuilds the lineage index file when it was built from other data than
+    new_version, including on a worker's first poll after a reload, and
+    swaps the rebuilt index in once complete so lookups never see a partial
+    index. Workers rebuild one at a time, and a worker finding the file
+    already rebuilt loads it instead. Registered with the data version
+    tracker. Does nothing if the index hasn't been built.
+    """
+    global _index
+    index = get_index()
+    if index is None or index.version == new_version:
+        return
+    config = settings.ARANGO_API_LINEAGE
+    path = config["PATH"]
+
+    def rebuild():
+        try:
+            if LineageIndex.load(path).version == new_version:
+                return new_version
+        except FileNotFoundError:
+            pass
+        logger.info("Rebuilding lineage index for data version %s", new_version)
+        build_index(new_version).save(path)
+        return new_version
+
+    coalesce_config = settings.ARANGO_API_COALESCE
+    FileSingleFlight(
+        coalesce_config["DIRECTORY"],
+        config["REBUILD_TIMEOUT"],
+        coalesce_config["RESULT_TTL"],
+    ).run(f"lineage-{new_version}", rebuild)
+    index = LineageIndex.load(path)
+    with _index_lock:
+        _index = index
+
+
+tracker.subscribe(rebuild_index)
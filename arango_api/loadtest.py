@@ -0,0 +1,157 @@
+"""
+Load testing against a running instance. A request mix is replayed with a
+number of concurrent workers for a fixed duration, and latency percentiles,
+throughput and error rates are reported per endpoint as JSON, so runs can be
+compared across releases.
+
+The mix is either a recorded NDJSON trace, one request per line of the form
+{"name", "method", "path", "data"}, replayed in order, or a synthetic
+profile of weighted request templates. A template with "keystrokes" set
+sends one request per prefix of its search_term, as typing in the search
+bar does.
+"""
+
+from collections import defaultdict
+import json
+import math
+import random
+import threading
+import time
+
+import requests
+
+
+def load_trace(path):
+    with open(path) as fp:
+        return [json.loads(line) for line in fp if line.strip()]
+
+
+def load_profile(path):
+    with open(path) as fp:
+        return json.load(fp)["requests"]
+
+
+def expand_template(template):
+    """Returns the requests sent for one use of a profile template."""
+    if not template.get("keystrokes"):
+        return [template]
+    term = template["data"]["search_term"]
+    min_length = template.get("min_length", 2)
+    return [
+        {**template, "data": {**template["data"], "search_term": term[:length]}}
+        for length in range(min_length, len(term) + 1)
+    ]
+
+
+class TraceSource:
+    """Replays a trace in order, looping, shared by all workers."""
+
+    def __init__(self, trace):
+        self.trace = trace
+        self._lock = threading.Lock()
+        self._index = 0
+
+    def next_requests(self):
+        with self._lock:
+            request = self.trace[self._index % len(self.trace)]
+            self._index += 1
+        return [request]
+
+
+class ProfileSource:
+    """Picks weighted profile templates at random."""
+
+    def __init__(self, templates, seed=None):
+        self.templates = templates
+        self.weights = [template.get("weight", 1) for template in templates]
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next_requests(self):
+        with self._lock:
+            template = self._random.choices(self.templates, self.weights)[0]
+        return expand_template(template)
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, elapsed):
+    """
+    Reduces (name, latency_ms, ok) samples to per-endpoint and total
+    statistics over a run of elapsed seconds.
+    """
+    by_name = defaultdict(list)
+    for sample in samples:
+        by_name[sample[0]].append(sample)
+    by_name["total"] = list(samples)
+
+    report = {}
+    for name, name_samples in by_name.items():
+        latencies = sorted(latency for _, latency, _ in name_samples)
+        errors = sum(1 for _, _, ok in name_samples if not ok)
+        count = len(name_samples)
+        report[name] = {
+            "count": count,
+            "errors": errors,
+            "error_rate": round(errors / count, 4) if count else 0,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0,
+            "mean_ms": round(sum(latencies) / count, 1) if count else None,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": latencies[-1] if latencies else None,
+        }
+    return report
+
+
+def run_load_test(base_url, source, concurrency, duration, timeout=30):
+    """
+    Sends requests from source with concurrency workers for duration
+    seconds and returns the report.
+    """
+    samples = []
+    samples_lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            for request in source.next_requests():
+                url = base_url.rstrip("/") + request["path"]
+                started = time.perf_counter()
+                try:
+                    if request.get("method", "GET").upper() == "POST":
+                        response = session.post(
+                            url, json=request.get("data", {}), timeout=timeout
+                        )
+                    else:
+                        response = session.get(
+                            url, params=request.get("data", {}), timeout=timeout
+                        )
+                    ok = response.status_code < 400
+                except requests.RequestException:
+                    ok = False
+                latency = round((time.perf_counter() - started) * 1000, 1)
+                with samples_lock:
+                    samples.append((request["name"], latency, ok))
+
+    started = time.monotonic()
+    workers = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    return {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "endpoints": summarize(samples, elapsed),
+    }
@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from arango_api import lineage
+from arango_api.dataversion import compute_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the subClassOf closure index of the ontologies database used "
+        "by the lineage endpoints. Workers load it on first use."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=str(settings.ARANGO_API_LINEAGE["PATH"]),
+            help="Path of the index to write",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        # The version lets workers tell when the index needs rebuilding
+        version = None
+        if settings.ARANGO_API_DATA_VERSION["ENABLED"]:
+            version = compute_version()
+        index = lineage.build_index(version)
+        index.save(options["path"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {len(index.ids)} nodes in {options['path']} "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from arango_api import search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the local SQLite FTS5 search index from the document "
+        "collections of both databases."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default=str(settings.ARANGO_API_SEARCH["SQLITE_PATH"]),
+            help="Path of the index to write",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = search_index.write_index(options["path"], search_index.iter_documents())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Indexed {count} documents in {options['path']} "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,66 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from arango_api import explain
+
+
+class Command(BaseCommand):
+    help = (
+        "Explain every AQL query template in arango_api.utils and compare "
+        "the plans against the committed baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--baseline",
+            default=str(explain.BASELINE_PATH),
+            help="Path of the baseline plan summaries",
+        )
+        parser.add_argument(
+            "--update",
+            action="store_true",
+            help="Write the current plan summaries to the baseline",
+        )
+        parser.add_argument(
+            "--cost-tolerance",
+            type=float,
+            default=explain.COST_TOLERANCE,
+            help="Allowed ratio of current to baseline estimated cost",
+        )
+        parser.add_argument(
+            "--large-collection",
+            type=int,
+            default=explain.LARGE_COLLECTION_COUNT,
+            help="Document count at which a new full collection scan fails",
+        )
+
+    def handle(self, *args, **options):
+        plans = explain.collect_plans()
+        self.stdout.write(json.dumps(plans, indent=2, sort_keys=True))
+
+        if options["update"]:
+            explain.write_baseline(plans, options["baseline"])
+            self.stdout.write(
+                self.style.SUCCESS(f"Wrote baseline to {options['baseline']}")
+            )
+            return
+
+        try:
+            baseline = explain.load_baseline(options["baseline"])
+        except FileNotFoundError:
+            raise CommandError(
+                f"No baseline at {options['baseline']}; run with --update first"
+            )
+
+        regressions = explain.compare_plans(
+            baseline,
+            plans,
+            cost_tolerance=options["cost_tolerance"],
+            large_collection_count=options["large_collection"],
+        )
+        for name in sorted(set(plans) - set(baseline)):
+            self.stdout.write(self.style.WARNING(f"{name}: no baseline"))
+        if regressions:
+            raise CommandError("Query plan regressions:\n" + "\n".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No query plan regressions"))
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from arango_api.cache import get_served_version, invalidate
+from arango_api.dataversion import compute_version
+from arango_api.utils import PHENOTYPES_SUNBURST_ROOT_ID
+
+
+class Command(BaseCommand):
+    help = (
+        "Invalidate the cached phenotype sunburst slices of the given organs, "
+        "or of all configured organs, and the responses built from them. "
+        "Needs a cache shared with the server, see CACHES."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "organ_ids", nargs="*", help="Organ ids, for example UBERON/0002048"
+        )
+
+    def handle(self, *args, **options):
+        config = settings.ARANGO_API_PHENOTYPES_SUNBURST
+        organ_ids = options["organ_ids"] or config["ORGAN_IDS"]
+        unknown = sorted(set(organ_ids) - set(config["ORGAN_IDS"]))
+        if unknown:
+            raise CommandError(f"Not configured organs: {', '.join(unknown)}")
+        if isinstance(caches["default"], LocMemCache):
+            raise CommandError(
+                "The local-memory cache is private to each process; set "
+                "ARANGO_API_CACHE_BACKEND to a cache shared with the server"
+            )
+
+        # Results are cached under the data version the workers last polled,
+        # which lags the databases by up to the polling interval
+        versions = [None]
+        if settings.ARANGO_API_DATA_VERSION["ENABLED"]:
+            versions = sorted({get_served_version(), compute_version()} - {None})
+
+        for version in versions:
+            self.invalidate_version(config, organ_ids, version)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Invalidated {len(organ_ids)} organ slices")
+        )
+
+    def invalidate_version(self, config, organ_ids, version):
+        for organ_id in organ_ids:
+            invalidate("phenotypes_sunburst_slice", [organ_id], version)
+            for lazy in [False, True]:
+                invalidate("get_sunburst", [organ_id, "phenotypes", lazy], version)
+        # The full structure and the roots' children embed the slices; the
+        # lazy landing view doesn't
+        invalidate("get_sunburst", [None, "phenotypes", False], version)
+        for parent_id in [*config["ROOT_IDS"], PHENOTYPES_SUNBURST_ROOT_ID]:
+            for lazy in [False, True]:
+                invalidate("get_sunburst", [parent_id, "phenotypes", lazy], version)
@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from arango_api import loadtest
+
+
+DEFAULT_PROFILE = Path(loadtest.__file__).resolve().parent / "loadtest_profile.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a recorded trace or a synthetic request mix against a running "
+        "instance and report latency percentiles, throughput and error rates "
+        "per endpoint as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8000",
+            help="Base URL of the instance under test",
+        )
+        parser.add_argument(
+            "--trace", help="NDJSON trace to replay instead of a synthetic profile"
+        )
+        parser.add_argument(
+            "--profile",
+            default=str(DEFAULT_PROFILE),
+            help="Synthetic profile of weighted request templates",
+        )
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--duration", type=float, default=60, help="Duration in seconds"
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=30, help="Request timeout in seconds"
+        )
+        parser.add_argument(
+            "--seed", type=int, help="Random seed for the synthetic profile"
+        )
+        parser.add_argument("--output", help="File to write the report to")
+
+    def handle(self, *args, **options):
+        if options["trace"]:
+            source = loadtest.TraceSource(loadtest.load_trace(options["trace"]))
+        else:
+            source = loadtest.ProfileSource(
+                loadtest.load_profile(options["profile"]), seed=options["seed"]
+            )
+
+        report = loadtest.run_load_test(
+            options["base_url"],
+            source,
+            options["concurrency"],
+            options["duration"],
+            timeout=options["timeout"],
+        )
+        report["source"] = options["trace"] or options["profile"]
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fp:
+                fp.write(output + "\n")
+        self.stdout.write(output)
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+
+# Test modules making database calls, run against the fixture database
+DATABASE_TESTS = [
+    "arango_api.tests.test_utils",
+    "arango_api.tests.test_views",
+    "arango_api.tests.test_query_plans",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the database-backed tests against the fixture database in record "
+        "mode, writing the replay fixtures that let them run without ArangoDB."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--directory",
+            default=str(settings.ARANGO_API_REPLAY["DIRECTORY"]),
+            help="Directory of the replay fixtures",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep existing fixtures instead of recording a new set",
+        )
+
+    def handle(self, *args, **options):
+        directory = Path(options["directory"])
+        if not options["keep"]:
+            for path in directory.glob("*.json"):
+                path.unlink()
+
+        with override_settings(
+            ARANGO_API_REPLAY={
+                **settings.ARANGO_API_REPLAY,
+                "MODE": "record",
+                "DIRECTORY": directory,
+            }
+        ):
+            call_command("test", *DATABASE_TESTS)
+
+        count = len(list(directory.glob("*.json")))
+        self.stdout.write(
+            self.style.SUCCESS(f"Recorded {count} fixtures in {directory}")
+        )
@@ -0,0 +1,41 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from arango_api import warmup
+
+
+class Command(BaseCommand):
+    help = (
+        "Request every entry of the warm-up manifest, in-process or against "
+        "a running server, and report how long each took."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--manifest", help="Path of the warm-up manifest to use instead"
+        )
+        parser.add_argument(
+            "--base-url",
+            help="Base URL of a running server to request instead of in-process",
+        )
+        parser.add_argument("--concurrency", type=int, help="Concurrent requests")
+        parser.add_argument("--timeout", type=float, help="Overall time limit")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Fail if any entry failed, was skipped, or exceeded its max_ms",
+        )
+
+    def handle(self, *args, **options):
+        report = warmup.run_warmup(
+            warmup.load_manifest(options["manifest"]),
+            base_url=options["base_url"],
+            concurrency=options["concurrency"],
+            timeout=options["timeout"],
+        )
+        self.stdout.write(json.dumps(report, indent=2))
+
+        failed = [record["name"] for record in report if not record["ok"]]
+        if options["check"] and failed:
+            raise CommandError("Warm-up entries failed: " + ", ".join(failed))
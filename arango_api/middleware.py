@@ -0,0 +1,143 @@
+import json
+import threading
+
+from django.conf import settings
+from django.http import FileResponse, JsonResponse
+from django.urls import Resolver404, resolve
+
+from arango_api import cache, dataversion, querylog
+from arango_api.breaker import DatabaseUnavailable
+
+
+class QueryLogMiddleware:
+    """
+    Attributes database calls to the endpoint handling the request, and
+    reports the request's database and response encoding time in a
+    Server-Timing header. Streamed responses are computed and encoded after
+    the header is sent, so their calls are attributed while they are sent,
+    and their timing is logged once the last chunk is sent.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = querylog.begin_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing = querylog.end_request(state)
+        db_timing = f'db;dur={timing.db_ms:.1f};desc="{timing.queries} queries"'
+        if response.streaming and not isinstance(response, FileResponse):
+            response["Server-Timing"] = f'{db_timing}, encode;desc="streamed"'
+            response.streaming_content = self.log_when_sent(
+                response.streaming_content, request, timing
+            )
+        else:
+            response["Server-Timing"] = (
+                f"{db_timing}, encode;dur={timing.encode_ms:.1f}"
+            )
+        return response
+
+    def log_when_sent(self, chunks, request, timing):
+        """Yields chunks within the request, then logs its timing."""
+        match = request.resolver_match
+        endpoint = match.url_name if match else None
+        yield from querylog.iter_in_request(chunks, timing, endpoint)
+        querylog.logger.info(
+            "streamed_response %s",
+            json.dumps(
+                {
+                    "endpoint": endpoint,
+                    "db_ms": round(timing.db_ms, 1),
+                    "queries": timing.queries,
+                    "encode_ms": round(timing.encode_ms, 1),
+                }
+            ),
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        querylog.set_endpoint(request.resolver_match.url_name)
+        return None
+
+
+class TraceRecordMiddleware:
+    """
+    Appends each arango_api request to the NDJSON trace file named by
+    ARANGO_API_LOADTEST_TRACE, in the format replayed by the loadtest
+    command. Does nothing when the setting is empty.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.trace_path = settings.ARANGO_API_LOADTEST_TRACE
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        if self.trace_path and request.path.startswith("/arango_api/"):
+            self.record(request)
+        return self.get_response(request)
+
+    def record(self, request):
+        if request.method == "POST":
+            try:
+                data = json.loads(request.body or b"{}")
+            except ValueError:
+                return
+        else:
+            data = request.GET.dict()
+        try:
+            name = resolve(request.path).url_name
+        except Resolver404:
+            return
+        line = json.dumps(
+            {"name": name, "method": request.method, "path": request.path, "data": data}
+        )
+        with self._lock, open(self.trace_path, "a") as fp:
+            fp.write(line + "\n")
+
+
+class DataVersionMiddleware:
+    """
+    Reports the version of the data a response was computed from in an
+    X-Data-Version header, once the version is known.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        version = dataversion.get_version()
+        response = self.get_response(request)
+        if version is not None:
+            response["X-Data-Version"] = version
+        return response
+
+
+class CircuitBreakerMiddleware:
+    """
+    Marks responses built from stale cached results with Warning and
+    X-Stale headers, and answers requests that failed because the circuit
+    breaker is open with a 503 and Retry-After.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = cache.begin_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            stale = cache.end_request(state)
+        if stale:
+            response["Warning"] = '110 - "Response is Stale"'
+            response["X-Stale"] = "true"
+        return response
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, DatabaseUnavailable):
+            return None
+        response = JsonResponse({"error": str(exception)}, status=503)
+        response["Retry-After"] = str(exception.retry_after)
+        return response
@@ -0,0 +1,294 @@
+"""
+Structured logging of database calls. Every AQL query and collection call
+made by arango_api goes through execute() or call(), which time it and log
+a record with a normalized query fingerprint, the shape of the bind
+variables, the duration, the rows returned and the calling endpoint. Slow
+calls are logged as slow-query records, other calls are sampled, and an
+in-memory aggregate per fingerprint backs the slowest-fingerprints report.
+Calls go through the circuit breaker, except when replaying fixtures.
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+
+from arango_api import breaker, replay
+
+
+logger = logging.getLogger(__name__)
+
+_endpoint = contextvars.ContextVar("arango_api_endpoint", default=None)
+_request_timing = contextvars.ContextVar("arango_api_request_timing", default=None)
+
+_COMMENT_RE = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """Strips comments and literals from AQL and collapses whitespace."""
+    query = _COMMENT_RE.sub(" ", query)
+    query = _STRING_RE.sub("?", query)
+    query = _NUMBER_RE.sub("?", query)
+    return _WHITESPACE_RE.sub(" ", query).strip()
+
+
+def fingerprint(query):
+    """Returns a short stable id for queries of the same shape."""
+    return hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()[:12]
+
+
+def bind_vars_shape(bind_vars):
+    """Describes bind variables by type and size rather than by value."""
+    shape = {}
+    for name, value in (bind_vars or {}).items():
+        if isinstance(value, (list, tuple, dict)):
+            shape[name] = f"{type(value).__name__}[{len(value)}]"
+        else:
+            shape[name] = type(value).__name__
+    return shape
+
+
+class RequestTiming:
+    """
+    Database time and call count, and response encoding time, accumulated
+    for one request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.db_ms = 0.0
+        self.queries = 0
+        self.encode_ms = 0.0
+
+    def add(self, duration_ms):
+        with self._lock:
+            self.db_ms += duration_ms
+            self.queries += 1
+
+    def add_encode(self, duration_ms):
+        with self._lock:
+            self.encode_ms += duration_ms
+
+
+class QueryStats:
+    """Aggregated call counts and durations per fingerprint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def add(self, record, query):
+        with self._lock:
+            stats = self._stats.get(record["fingerprint"])
+            if stats is None:
+                stats = self._stats[record["fingerprint"]] = {
+                    "fingerprint": record["fingerprint"],
+                    "query": query,
+                    "endpoints": set(),
+                    "count": 0,
+                    "errors": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "rows": 0,
+                }
+            stats["count"] += 1
+            stats["errors"] += 1 if "error" in record else 0
+            stats["total_ms"] += record["duration_ms"]
+            stats["max_ms"] = max(stats["max_ms"], record["duration_ms"])
+            stats["rows"] += record["rows"]
+            if record["endpoint"]:
+                stats["endpoints"].add(record["endpoint"])
+
+    def top(self, n):
+        """Returns the n fingerprints with the most total time."""
+        with self._lock:
+            ranked = sorted(
+                self._stats.values(), key=lambda stats: stats["total_ms"], reverse=True
+            )[:n]
+            return [
+                {
+                    **stats,
+                    "endpoints": sorted(stats["endpoints"]),
+                    "total_ms": round(stats["total_ms"], 1),
+                    "mean_ms": round(stats["total_ms"] / stats["count"], 1),
+                }
+                for stats in ranked
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats()
+
+
+def set_endpoint(endpoint):
+    _endpoint.set(endpoint)
+
+
+def begin_request():
+    """Starts accumulating database time for the current request."""
+    timing = RequestTiming()
+    return timing, _request_timing.set(timing), _endpoint.set(None)
+
+
+def get_request_timing():
+    """Returns the current request's timing, or None outside a request."""
+    return _request_timing.get()
+
+
+def add_encode_time(duration_ms):
+    """Adds response encoding time to the current request, if any."""
+    timing = _request_timing.get()
+    if timing is not None:
+        timing.add_encode(duration_ms)
+
+
+def iter_in_request(chunks, timing, endpoint):
+    """
+    Yields chunks, producing each with timing and endpoint current, so
+    database calls made while a streamed response is sent, after
+    end_request, are still attributed to its request.
+    """
+    chunks = iter(chunks)
+    while True:
+        timing_token = _request_timing.set(timing)
+        endpoint_token = _endpoint.set(endpoint)
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            _request_timing.reset(timing_token)
+            _endpoint.reset(endpoint_token)
+        yield chunk
+
+
+def end_request(state):
+    timing, timing_token, endpoint_token = state
+    _request_timing.reset(timing_token)
+    _endpoint.reset(endpoint_token)
+    return timing
+
+
+def _duration_ms(started):
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _count_rows(result):
+    if result is None:
+        return 0
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return 1
+
+
+def _record(query_fingerprint, query, bind_vars, started, result, error=None):
+    config = settings.ARANGO_API_QUERY_LOG
+    duration_ms = _duration_ms(started)
+    endpoint = _endpoint.get()
+    record = {
+        "fingerprint": query_fingerprint,
+        "endpoint": endpoint,
+        "duration_ms": duration_ms,
+        "rows": _count_rows(result),
+        "bind_vars": bind_vars_shape(bind_vars),
+    }
+    if error is not None:
+        record["error"] = str(error)
+
+    timing = _request_timing.get()
+    if timing is not None:
+        timing.add(duration_ms)
+    query_stats.add(record, query)
+
+    slow_ms = config["ENDPOINT_SLOW_MS"].get(endpoint, config["SLOW_MS"])
+    if error is not None:
+        logger.error("query_error %s", json.dumps({**record, "query": query}))
+    elif duration_ms >= slow_ms:
+        if random.random() < config["SLOW_SAMPLE_RATE"]:
+            logger.warning("slow_query %s", json.dumps({**record, "query": query}))
+    elif random.random() < config["SAMPLE_RATE"]:
+        logger.info("query %s", json.dumps(record))
+
+
+def _guarded(fn, *args, **kwargs):
+    """
+    Runs a database call through the circuit breaker, if enabled. Raises
+    DatabaseUnavailable without calling fn while the circuit is open.
+    """
+    circuit_breaker = breaker.get_breaker()
+    if circuit_breaker is None:
+        return fn(*args, **kwargs)
+    circuit_breaker.before_call()
+    started = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        circuit_breaker.after_call(_duration_ms(started), e)
+        raise
+    circuit_breaker.after_call(_duration_ms(started))
+    return result
+
+
+def execute(db, query, bind_vars=None, **kwargs):
+    """
+    Runs an AQL query, logs it, and returns all of its rows as a list. The
+    rows are recorded to or replayed from fixtures in record or replay mode.
+    """
+    normalized = normalize_query(query)
+    query_fingerprint = fingerprint(query)
+    mode = replay.get_mode()
+    started = time.perf_counter()
+    try:
+        if mode == "replay":
+            rows = replay.load(db.name, query, bind_vars)
+        else:
+            rows = _guarded(
+                lambda: list(db.aql.execute(query, bind_vars=bind_vars, **kwargs))
+            )
+    except breaker.DatabaseUnavailable:
+        raise
+    except Exception as e:
+        _record(query_fingerprint, normalized, bind_vars, started, None, e)
+        raise
+    if mode == "record":
+        replay.save(db.name, query, bind_vars, rows, _duration_ms(started))
+    _record(query_fingerprint, normalized, bind_vars, started, rows)
+    return rows
+
+
+def call(operation, fn, *args, **kwargs):
+    """
+    Runs a non-AQL database call, such as a collection read, and logs it
+    with operation (for example "collection.get CL") as its fingerprint.
+    In record or replay mode, operation and the arguments identify the
+    fixture, so operation must name everything fn depends on besides them.
+    """
+    mode = replay.get_mode()
+    params = [list(args), kwargs]
+    started = time.perf_counter()
+    try:
+        if mode == "replay":
+            result = replay.load(None, operation, params)
+        else:
+            result = _guarded(fn, *args, **kwargs)
+    except breaker.DatabaseUnavailable:
+        raise
+    except Exception as e:
+        _record(operation, operation, kwargs or None, started, None, e)
+        raise
+    if mode == "record":
+        replay.save(None, operation, params, result, _duration_ms(started))
+    _record(operation, operation, kwargs or None, started, result)
+    return result
@@ -0,0 +1,102 @@
+"""
+JSON rendering of arango_api responses. Results are encoded straight to
+bytes with orjson when it is installed, and with the standard library
+otherwise, and the encode time is added to the request's timing.
+Large list results can be encoded incrementally in chunks as they are
+sent, and results cached as encoded JSON are sent without re-encoding.
+"""
+
+import json
+import time
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+
+from arango_api import querylog
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(data):
+    """Encodes data as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class RawJSON:
+    """JSON already encoded, for example a cached response body."""
+
+    def __init__(self, content):
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self.content = content
+
+
+def encode(data):
+    """Encodes data, timing it as part of the current request."""
+    if isinstance(data, RawJSON):
+        return data.content
+    started = time.perf_counter()
+    content = dumps(data)
+    querylog.add_encode_time((time.perf_counter() - started) * 1000)
+    return content
+
+
+class FastJsonResponse(HttpResponse):
+    """
+    A JsonResponse that encodes with dumps(), and sends RawJSON data as is.
+    Unlike JsonResponse, any data, not only dicts, may be sent.
+    """
+
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=encode(data), **kwargs)
+
+
+def _iter_list_chunks(items, chunk_size):
+    yield b"["
+    for start in range(0, len(items), chunk_size):
+        chunk = b",".join(dumps(item) for item in items[start : start + chunk_size])
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]"
+
+
+def _timed_chunks(chunks, timing):
+    """
+    Yields chunks, adding the time taken to encode each to timing, as they
+    are encoded after the view has returned.
+    """
+    chunks = iter(chunks)
+    while True:
+        started = time.perf_counter()
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            if timing is not None:
+                timing.add_encode((time.perf_counter() - started) * 1000)
+        yield chunk
+
+
+def json_response(data, status=200):
+    """
+    Returns a response for data, streaming lists of at least
+    ARANGO_API_RENDERING["STREAM_MIN_ITEMS"] items as chunks encoded while
+    they are sent, so the whole body is never held in memory at once.
+    """
+    config = settings.ARANGO_API_RENDERING
+    if isinstance(data, list) and len(data) >= config["STREAM_MIN_ITEMS"]:
+        return StreamingHttpResponse(
+            _timed_chunks(
+                _iter_list_chunks(data, config["CHUNK_ITEMS"]),
+                querylog.get_request_timing(),
+            ),
+            status=status,
+            content_type="application/json",
+        )
+    return FastJsonResponse(data, status=status)
@@ -0,0 +1,84 @@
+"""
+Record and replay of database calls, so everything above the database
+layer can be tested and benchmarked without a running ArangoDB.
+
+In record mode, every call made through querylog.execute() or
+querylog.call() runs against the database as usual and its result is
+written to a fixture file named by a hash of the database, the query or
+operation and its bind variables or arguments. In replay mode, the same
+calls are answered from those fixture files without touching the database,
+optionally after a simulated latency, and a call with no fixture raises
+FixtureMissing.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+import time
+
+from django.conf import settings
+
+
+class FixtureMissing(Exception):
+    def __init__(self, key, description):
+        super().__init__(f"No replay fixture {key} for {description}")
+        self.key = key
+
+
+def get_mode():
+    """Returns "record", "replay", or None when calls go to the database."""
+    return settings.ARANGO_API_REPLAY["MODE"]
+
+
+def make_key(db_name, query, params):
+    """Returns a stable fixture name for a query or operation and its params."""
+    payload = json.dumps(
+        {"db": db_name, "query": query, "params": params},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _fixture_path(key):
+    return Path(settings.ARANGO_API_REPLAY["DIRECTORY"]) / f"{key}.json"
+
+
+def save(db_name, query, params, result, duration_ms):
+    key = make_key(db_name, query, params)
+    path = _fixture_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fixture = {
+        "db": db_name,
+        "query": query,
+        "params": params,
+        "duration_ms": duration_ms,
+        "result": result,
+    }
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as fp:
+        json.dump(fixture, fp, indent=1, sort_keys=True, default=str)
+    tmp_path.replace(path)
+    return key
+
+
+def load(db_name, query, params):
+    """
+    Returns the recorded result for a call, after sleeping for the
+    configured LATENCY_MS, or for the recorded duration if it is
+    "recorded".
+    """
+    key = make_key(db_name, query, params)
+    try:
+        with open(_fixture_path(key)) as fp:
+            fixture = json.load(fp)
+    except FileNotFoundError:
+        raise FixtureMissing(key, f"{db_name}: {query[:80]!r}") from None
+
+    latency_ms = settings.ARANGO_API_REPLAY["LATENCY_MS"]
+    if latency_ms == "recorded":
+        latency_ms = fixture["duration_ms"]
+    if latency_ms:
+        time.sleep(latency_ms / 1000)
+    return fixture["result"]
@@ -0,0 +1,164 @@
+"""
+Local SQLite FTS5 index of document labels, names, symbols, definitions and
+identifiers, used by search_by_term instead of the ArangoSearch view when
+ARANGO_API_SEARCH["BACKEND"] is "sqlite". The index is built by the
+build_search_index command and searched with the trigram tokenizer, which
+matches any substring of at least three characters, ranking exact matches
+first and the rest by bm25. Only _ids are read from the index; the
+documents themselves are fetched from ArangoDB in one query.
+"""
+
+import os
+from pathlib import Path
+import sqlite3
+
+from django.conf import settings
+
+from arango_api import querylog
+
+# Indexed columns and the document fields they are built from
+INDEX_COLUMNS = {
+    "label": ["label", "Label"],
+    "name": ["Name", "Recommended_name", "Trade_names"],
+    "symbol": ["Symbol"],
+    "definition": ["definition"],
+    "identifier": ["_key", "PMID", "PMCID"],
+}
+
+# Fields a search term must equal, ignoring case, to be an exact match
+EXACT_MATCH_FIELDS = ["label", "Label", "Name", "Symbol", "PMID", "_key"]
+
+# Shortest term the trigram tokenizer can match
+MIN_TERM_LENGTH = 3
+
+
+def _field_text(doc, fields):
+    values = []
+    for field in fields:
+        value = doc.get(field)
+        if isinstance(value, list):
+            values.extend(str(item) for item in value)
+        elif value is not None:
+            values.append(str(value))
+    return " ".join(values)
+
+
+def _exact_text(doc):
+    values = [
+        str(doc[field]).lower()
+        for field in EXACT_MATCH_FIELDS
+        if isinstance(doc.get(field), str)
+    ]
+    return "\n" + "\n".join(values) + "\n"
+
+
+def iter_documents():
+    """Yields (graph, doc) with the indexed fields of every document."""
+    from arango_api import utils
+    from arango_api.db import graphs
+
+    fields = sorted(
+        {field for fields in INDEX_COLUMNS.values() for field in fields}
+        | set(EXACT_MATCH_FIELDS)
+        | {"_id"}
+    )
+    for graph in graphs.values():
+        for collection in utils.get_document_collections(graph.name):
+            rows = querylog.execute(
+                graph.db,
+                "FOR doc IN @@collection RETURN KEEP(doc, @fields)",
+                bind_vars={"@collection": collection["name"], "fields": fields},
+                stream=True,
+            )
+            for doc in rows:
+                yield graph.name, doc
+
+
+def write_index(path, documents):
+    """
+    Writes an index of documents, an iterable of (db, doc) pairs where db is
+    the name of a registered graph, to path. The index is written to a
+    temporary file that replaces path when complete, so searches in progress
+    keep using the previous index.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    columns = ", ".join(INDEX_COLUMNS)
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.execute(
+            f"""
+            CREATE VIRTUAL TABLE documents USING fts5(
+                db UNINDEXED, id UNINDEXED, collection UNINDEXED,
+                exact UNINDEXED, {columns},
+                tokenize = 'trigram'
+            )
+            """
+        )
+        rows = (
+            (
+                db,
+                doc["_id"],
+                doc["_id"].split("/", 1)[0],
+                _exact_text(doc),
+                *(_field_text(doc, fields) for fields in INDEX_COLUMNS.values()),
+            )
+            for db, doc in documents
+        )
+        placeholders = ", ".join("?" * (4 + len(INDEX_COLUMNS)))
+        connection.executemany(
+            f"INSERT INTO documents VALUES ({placeholders})",
+            rows,
+        )
+        count = connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        connection.execute("INSERT INTO documents(documents) VALUES ('optimize')")
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, path)
+    return count
+
+
+def is_available(path=None):
+    return Path(path or settings.ARANGO_API_SEARCH["SQLITE_PATH"]).exists()
+
+
+def search(search_term, db, collections=None, limit=None, path=None):
+    """
+    Returns the _ids of documents in db containing search_term, exact
+    matches of a label, name, symbol or identifier first, then by bm25.
+    Returns None if the term is too short for the index, so the caller can
+    fall back to ArangoSearch.
+    """
+    config = settings.ARANGO_API_SEARCH
+    term = (search_term or "").strip()
+    if len(term) < MIN_TERM_LENGTH:
+        return None
+
+    lower_term = term.lower()
+    match = '"' + term.replace('"', '""') + '"'
+    query = """
+        SELECT id FROM documents
+        WHERE documents MATCH ? AND db = ?
+    """
+    params = [match, db]
+    if collections:
+        query += f" AND collection IN ({', '.join('?' * len(collections))})"
+        params.extend(collections)
+    query += """
+        ORDER BY instr(exact, char(10) || ? || char(10)) > 0 DESC, bm25(documents)
+        LIMIT ?
+    """
+    params.append(lower_term)
+    params.append(limit or config["LIMIT"])
+
+    uri = Path(path or config["SQLITE_PATH"]).resolve().as_uri() + "?mode=ro"
+    connection = sqlite3.connect(uri, uri=True)
+    try:
+        return [row[0] for row in connection.execute(query, params)]
+    finally:
+        connection.close()
@@ -0,0 +1,100 @@
+import threading
+from unittest import mock
+
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from arango_api import admission
+from arango_api.admission import AdmissionController, AdmissionRejected
+
+
+class AdmissionControllerTestCase(SimpleTestCase):
+
+    def setUp(self):
+
+        self.controller = AdmissionController(
+            capacity=4,
+            max_queue=1,
+            queue_timeout=0.05,
+            retry_after=2,
+            endpoints={
+                "get_graph": {"base": 1, "per_depth": 1, "per_node": 0.5},
+                "get_all": {"base": 2, "max_concurrent": 1},
+            },
+        )
+
+    def test_get_cost(self):
+
+        self.assertEqual(self.controller.get_cost("get_graph", depth=1, nodes=1), 3)
+        self.assertEqual(self.controller.get_cost("get_graph", depth=5, nodes=10), 4)
+        self.assertEqual(self.controller.get_cost("get_object"), 1)
+
+    def test_acquire_and_release(self):
+
+        self.controller.acquire("get_graph", 3)
+        self.assertEqual(self.controller.stats()["in_use"], 3)
+        self.controller.release("get_graph", 3)
+        self.assertEqual(self.controller.stats()["in_use"], 0)
+        self.assertEqual(self.controller.stats()["admitted"], 1)
+
+    def test_timeout_while_queued(self):
+
+        self.controller.acquire("get_graph", 4)
+        with self.assertRaises(AdmissionRejected) as cm:
+            self.controller.acquire("get_graph", 1)
+        self.assertEqual(cm.exception.status, 503)
+        self.assertEqual(cm.exception.retry_after, 2)
+        self.assertEqual(self.controller.stats()["rejected_timeout"], 1)
+        self.assertEqual(self.controller.stats()["queue_depth"], 0)
+
+    def test_queue_full(self):
+
+        self.controller.acquire("get_graph", 4)
+        self.controller.queue_timeout = 5
+
+        def wait():
+            self.controller.acquire("get_graph", 1)
+            self.controller.release("get_graph", 1)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        while self.controller.stats()["queue_depth"] == 0:
+            pass
+        with self.assertRaises(AdmissionRejected) as cm:
+            self.controller.acquire("get_graph", 1)
+        self.assertEqual(cm.exception.status, 429)
+        self.controller.release("get_graph", 4)
+        waiter.join()
+        self.assertEqual(self.controller.stats()["admitted"], 2)
+
+    def test_max_concurrent(self):
+
+        self.controller.acquire("get_all", 2)
+        with self.assertRaises(AdmissionRejected):
+            self.controller.acquire("get_all", 2)
+        self.controller.acquire("get_graph", 2)
+
+    def test_streaming_slot_released_on_close(self):
+
+        @admission.admission_controlled("get_graph")
+        def view(request):
+            return StreamingHttpResponse(iter([b"{}"]))
+
+        request = RequestFactory().post("/")
+        request.data = {"depth": 1}
+        with mock.patch.object(
+            admission, "get_controller", return_value=self.controller
+        ):
+            response = view(request)
+        self.assertEqual(self.controller.stats()["in_use"], 2)
+        # The client disconnected before the stream started
+        response.close()
+        self.assertEqual(self.controller.stats()["in_use"], 0)
+
+        with mock.patch.object(
+            admission, "get_controller", return_value=self.controller
+        ):
+            response = view(request)
+        self.assertEqual(b"".join(response.streaming_content), b"{}")
+        response.close()
+        self.assertEqual(self.controller.stats()["in_use"], 0)
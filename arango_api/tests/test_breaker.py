@@ -0,0 +1,113 @@
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from arango_api import cache
+from arango_api.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    DatabaseUnavailable,
+)
+
+
+class ServerError(Exception):
+
+    http_code = 503
+
+
+class QueryError(Exception):
+
+    http_code = 400
+
+
+class CircuitBreakerTestCase(SimpleTestCase):
+
+    def setUp(self):
+
+        self.breaker = CircuitBreaker(
+            window=4, min_calls=4, failure_rate=0.5, slow_ms=100, open_seconds=0.05
+        )
+
+    def call(self, duration_ms=1, error=None):
+
+        self.breaker.before_call()
+        self.breaker.after_call(duration_ms, error)
+
+    def test_opens_on_failures_and_slow_calls(self):
+
+        self.call()
+        self.call(error=ServerError())
+        self.call()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.call(duration_ms=500)
+
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(DatabaseUnavailable) as raised:
+            self.breaker.before_call()
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+
+    def test_client_errors_are_not_failures(self):
+
+        for _ in range(4):
+            self.call(error=QueryError())
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_half_open_trial(self):
+
+        for _ in range(4):
+            self.call(error=ServerError())
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+
+        # One trial call at a time, failing reopens the circuit
+        self.breaker.before_call()
+        self.assertFalse(self.breaker.allows_calls())
+        with self.assertRaises(DatabaseUnavailable):
+            self.breaker.before_call()
+        self.breaker.after_call(1, ServerError())
+        self.assertEqual(self.breaker.state, OPEN)
+
+        # A successful trial closes it
+        time.sleep(0.06)
+        self.call()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.breaker.stats()["opened"], 2)
+
+
+@override_settings(
+    ARANGO_API_CACHE_STALE_TIMEOUT=60,
+    ARANGO_API_CIRCUIT_BREAKER={"ENABLED": False},
+)
+class StaleCacheTestCase(SimpleTestCase):
+
+    def test_expired_result_served_stale_and_refreshed(self):
+
+        refreshed = threading.Event()
+        calls = []
+
+        def load():
+            calls.append(None)
+            if len(calls) > 1:
+                refreshed.set()
+                return "second"
+            return "first"
+
+        state = cache.begin_request()
+        self.assertEqual(cache.get_or_set("stale_test", [1], load, timeout=0), "first")
+        self.assertFalse(cache.end_request(state))
+
+        state = cache.begin_request()
+        self.assertEqual(cache.get_or_set("stale_test", [1], load, timeout=0), "first")
+        self.assertTrue(cache.end_request(state))
+
+        self.assertTrue(refreshed.wait(1))
+        for _ in range(100):
+            if cache.get_or_set("stale_test", [1], load, timeout=0) == "second":
+                break
+            time.sleep(0.01)
+        else:
+            self.fail("Stale result not refreshed")
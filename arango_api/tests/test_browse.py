@@ -0,0 +1,68 @@
+from django.test import SimpleTestCase
+
+from arango_api import browse
+
+
+DOCUMENTS = [
+    {"_id": "CL/0000151", "_key": "0000151", "label": "secretory cell"},
+    {"_id": "CL/10", "_key": "10"},
+    {"_id": "CL/0000061", "_key": "0000061", "label": "Cementoblast"},
+    {"_id": "CL/9", "_key": "9"},
+    {"_id": "CL/0002062", "_key": "0002062", "label": ["alveolar cell", "AT1"]},
+]
+
+
+class BrowseTestCase(SimpleTestCase):
+
+    def setUp(self):
+
+        self.index = browse.build_sort_index(DOCUMENTS, ["label"])
+
+    def test_build_sort_index(self):
+
+        self.assertEqual(
+            self.index,
+            [
+                ["0002062", "alveolar cell"],
+                ["0000061", "cementoblast"],
+                ["0000151", "secretory cell"],
+                ["9", ""],
+                ["10", ""],
+            ],
+        )
+
+    def test_filter_sort_index(self):
+
+        self.assertEqual(
+            [key for key, _ in browse.filter_sort_index(self.index, "CELL")],
+            ["0002062", "0000151"],
+        )
+        self.assertEqual(
+            [key for key, _ in browse.filter_sort_index(self.index, "se")],
+            ["0000151"],
+        )
+        self.assertEqual(
+            [key for key, _ in browse.filter_sort_index(self.index, "0000")],
+            ["0000061", "0000151"],
+        )
+        self.assertEqual(browse.filter_sort_index(self.index, " "), self.index)
+
+    def test_exact_match_first(self):
+
+        index = browse.build_sort_index(
+            [
+                {"_key": "1", "label": "B cell"},
+                {"_key": "2", "label": "cell"},
+            ],
+            ["label"],
+        )
+        self.assertEqual(
+            [key for key, _ in browse.filter_sort_index(index, "cell")], ["2", "1"]
+        )
+
+    def test_get_label(self):
+
+        self.assertEqual(browse.get_label({"Name": "x", "_key": "1"}, ["Name"]), "x")
+        self.assertEqual(
+            browse.get_label({"_key": "1"}, ["Recommended_name", "label"]), ""
+        )
@@ -0,0 +1,77 @@
+import tempfile
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from arango_api.coalesce import FileSingleFlight, SingleFlight, make_key
+
+
+class CoalesceTestCase(SimpleTestCase):
+
+    def test_make_key(self):
+
+        self.assertEqual(
+            make_key("get_sunburst", {"parent_id": None, "graph": "phenotypes"}),
+            make_key("get_sunburst", {"graph": "phenotypes", "parent_id": None}),
+        )
+        self.assertNotEqual(
+            make_key("get_sunburst", {"parent_id": "CL/0000000"}),
+            make_key("get_graph", {"parent_id": "CL/0000000"}),
+        )
+
+    def test_single_flight_shares_result(self):
+
+        single_flight = SingleFlight()
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def query():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return {"nodes": {}, "links": []}
+
+        results = []
+        leader = threading.Thread(
+            target=lambda: results.append(single_flight.run("key", query))
+        )
+        leader.start()
+        started.wait()
+        followers = [
+            threading.Thread(
+                target=lambda: results.append(single_flight.run("key", query))
+            )
+            for _ in range(5)
+        ]
+        for follower in followers:
+            follower.start()
+        # Give the followers time to join the call in flight
+        time.sleep(0.2)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"nodes": {}, "links": []}] * 6)
+
+    def test_single_flight_shares_error(self):
+
+        single_flight = SingleFlight()
+
+        def query():
+            raise ValueError("Unknown set operation: Complement")
+
+        with self.assertRaises(ValueError):
+            single_flight.run("key", query)
+        # The failed call is not cached
+        self.assertEqual(single_flight.run("key", lambda: 1), 1)
+
+    def test_file_single_flight_reuses_fresh_result(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+            single_flight = FileSingleFlight(directory, 5, 60)
+            self.assertEqual(single_flight.run("key", lambda: [1, 2]), [1, 2])
+            # A result written before this call started is not reused
+            self.assertEqual(single_flight.run("key", lambda: [3]), [3])
@@ -0,0 +1,123 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from arango_api import cache, dataversion
+from arango_api.dataversion import DataVersionTracker, compute_fingerprint
+
+
+class FakeCollection:
+
+    def __init__(self, count, revision):
+
+        self._count = count
+        self._revision = revision
+
+    def count(self):
+
+        return self._count
+
+    def revision(self):
+
+        return self._revision
+
+
+class FakeDatabase:
+
+    name = "fake"
+
+    def __init__(self, collections):
+
+        self._collections = collections
+
+    def collections(self):
+
+        return [
+            {"name": "_graphs", "system": True},
+            *({"name": name, "system": False} for name in self._collections),
+        ]
+
+    def collection(self, name):
+
+        return FakeCollection(*self._collections[name])
+
+
+class DataVersionTestCase(SimpleTestCase):
+
+    def setUp(self):
+
+        # Calls to the fake databases don't depend on the real one's health
+        patcher = mock.patch("arango_api.breaker.get_breaker", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fingerprint_changes_with_counts_and_revisions(self):
+
+        fingerprint = compute_fingerprint(FakeDatabase({"CL": (10, "_a")}))
+
+        self.assertEqual(
+            compute_fingerprint(FakeDatabase({"CL": (10, "_a")})), fingerprint
+        )
+        self.assertNotEqual(
+            compute_fingerprint(FakeDatabase({"CL": (11, "_a")})), fingerprint
+        )
+        self.assertNotEqual(
+            compute_fingerprint(FakeDatabase({"CL": (10, "_b")})), fingerprint
+        )
+
+    def test_subscribers_called_on_change_only(self):
+
+        tracker = DataVersionTracker()
+        changes = []
+        tracker.subscribe(lambda old, new: changes.append((old, new)))
+
+        tracker.update({"ontologies": "a", "phenotypes": "b"})
+        tracker.update({"ontologies": "a", "phenotypes": "b"})
+        tracker.update({"ontologies": "a", "phenotypes": "c"})
+
+        self.assertEqual(changes, [(None, "a-b"), ("a-b", "a-c")])
+        self.assertEqual(tracker.version, "a-c")
+
+    def test_failing_subscriber_does_not_stop_others(self):
+
+        tracker = DataVersionTracker()
+        changes = []
+
+        def fail(old, new):
+            raise RuntimeError
+
+        tracker.subscribe(fail)
+        tracker.subscribe(lambda old, new: changes.append(new))
+
+        with self.assertLogs("arango_api.dataversion", "ERROR"):
+            tracker.update({"ontologies": "a"})
+        self.assertEqual(changes, ["a"])
+
+    def test_wait(self):
+
+        tracker = DataVersionTracker()
+        self.assertIsNone(tracker.wait(0))
+        threading.Timer(0.01, tracker.update, [{"ontologies": "a"}]).start()
+        self.assertEqual(tracker.wait(5), "a")
+
+    def test_invalidate_version(self):
+
+        # A process that doesn't poll invalidates the version it computed
+        with mock.patch.object(dataversion.tracker, "version", "v1"):
+            cache.get_or_set("endpoint", ["a"], lambda: 1)
+        cache.invalidate("endpoint", ["a"], "v2")
+        with mock.patch.object(dataversion.tracker, "version", "v1"):
+            self.assertEqual(cache.get_or_set("endpoint", ["a"], lambda: 2), 1)
+        cache.invalidate("endpoint", ["a"], "v1")
+        with mock.patch.object(dataversion.tracker, "version", "v1"):
+            self.assertEqual(cache.get_or_set("endpoint", ["a"], lambda: 3), 3)
+
+    def test_served_version(self):
+
+        tracker = dataversion.tracker
+        with mock.patch.object(tracker, "version", None), mock.patch.object(
+            tracker, "versions", {}
+        ):
+            tracker.update({"ontologies": "v3"})
+            self.assertEqual(cache.get_served_version(), "v3")
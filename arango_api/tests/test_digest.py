@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase
+
+from arango_api.digest import BloomFilter, fnv1a_32
+
+
+class DigestTestCase(SimpleTestCase):
+
+    def test_fnv1a_32(self):
+
+        self.assertEqual(fnv1a_32(""), 0x811C9DC5)
+        self.assertEqual(fnv1a_32("a"), 0xE40C292C)
+
+    def test_bloom_filter_contains_added_ids(self):
+
+        bloom = BloomFilter(bytes(128), 4)
+        for key in range(50):
+            bloom.add(f"CL/{key:07d}")
+        for key in range(50):
+            self.assertIn(f"CL/{key:07d}", bloom)
+        self.assertNotIn("GO/0008150", bloom)
+
+    def test_bloom_filter_json_round_trip(self):
+
+        bloom = BloomFilter(bytes(16), 3)
+        bloom.add("CL/0000061")
+        restored = BloomFilter.from_json(bloom.to_json())
+        self.assertIn("CL/0000061", restored)
+        self.assertEqual(restored.hashes, 3)
+
+    def test_bloom_filter_invalid_json(self):
+
+        with self.assertRaises(ValueError):
+            BloomFilter.from_json({"bits": "not base64!", "hashes": 3})
+        with self.assertRaises(ValueError):
+            BloomFilter.from_json({"hashes": 3})
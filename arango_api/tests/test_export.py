@@ -0,0 +1,131 @@
+import io
+from unittest import skipIf
+from xml.etree import ElementTree
+
+from django.test import SimpleTestCase, override_settings
+
+from arango_api import export
+
+
+GRAPHML = "{http://graphml.graphdrawing.org/xmlns}"
+
+# Level records of a traversal from CL/0000061, as yielded by
+# iter_graph_levels, with the origin reached again at depth 1
+LEVELS = [
+    {
+        "type": "level",
+        "depth": 0,
+        "nodes": {
+            "CL/0000061": [
+                {"node": {"_id": "CL/0000061", "_key": "0000061", "label": "cell"}}
+            ]
+        },
+        "links": [],
+    },
+    {
+        "type": "level",
+        "depth": 1,
+        "nodes": {
+            "CL/0000061": [
+                {"node": {"_id": "CL/0000151", "_key": "0000151", "label": "<b>"}},
+                {"node": {"_id": "UBERON/0002048", "_key": "0002048"}},
+            ]
+        },
+        "links": [
+            {
+                "_id": "CL-CL/1",
+                "_from": "CL/0000061",
+                "_to": "CL/0000151",
+                "label": "subClassOf",
+            },
+            {
+                "_id": "CL-UBERON/2",
+                "_from": "CL/0000061",
+                "_to": "UBERON/0002048",
+                "label": "part of",
+            },
+        ],
+    },
+    {"type": "complete", "stats": {}},
+]
+
+
+class ExportTestCase(SimpleTestCase):
+
+    def test_iter_rows(self):
+
+        # Reaching the origin again at depth 2 yields no new nodes
+        revisit = {
+            "type": "level",
+            "depth": 2,
+            "nodes": LEVELS[0]["nodes"],
+            "links": [],
+        }
+        rows = list(export.iter_rows(LEVELS[:2] + [revisit]))
+
+        self.assertEqual(
+            [[node["id"] for node in nodes] for nodes, _ in rows],
+            [["CL/0000061"], ["CL/0000151", "UBERON/0002048"], []],
+        )
+        self.assertEqual(
+            rows[1][1][0],
+            {
+                "id": "CL-CL/1",
+                "source": "CL/0000061",
+                "target": "CL/0000151",
+                "collection": "CL-CL",
+                "label": "subClassOf",
+                "depth": 1,
+            },
+        )
+
+    def test_traversal_error(self):
+
+        with self.assertRaises(RuntimeError):
+            list(export.iter_rows([LEVELS[0], {"type": "error", "error": "timeout"}]))
+
+    def test_graphml(self):
+
+        root = ElementTree.fromstring("".join(export.iter_graphml(LEVELS)))
+        graph = root.find(f"{GRAPHML}graph")
+
+        nodes = graph.findall(f"{GRAPHML}node")
+        self.assertEqual(
+            [node.get("id") for node in nodes],
+            ["CL/0000061", "CL/0000151", "UBERON/0002048"],
+        )
+        data = {d.get("key"): d.text for d in nodes[1].findall(f"{GRAPHML}data")}
+        self.assertEqual(
+            data,
+            {
+                "node_key": "0000151",
+                "node_collection": "CL",
+                "node_label": "<b>",
+                "node_depth": "1",
+            },
+        )
+        edges = graph.findall(f"{GRAPHML}edge")
+        self.assertEqual(
+            [(edge.get("source"), edge.get("target")) for edge in edges],
+            [("CL/0000061", "CL/0000151"), ("CL/0000061", "UBERON/0002048")],
+        )
+
+    @skipIf(export.pyarrow is None, "pyarrow is not installed")
+    @override_settings(ARANGO_API_EXPORT={"BATCH_ROWS": 2})
+    def test_arrow(self):
+
+        content = b"".join(export.iter_arrow(LEVELS, "nodes", "arrow"))
+        table = export.pyarrow.ipc.open_stream(content).read_all()
+
+        self.assertEqual(table.schema.field("depth").type, export.pyarrow.int32())
+        self.assertEqual(table.column("label").to_pylist(), ["cell", "<b>", None])
+
+    @skipIf(export.pyarrow is None, "pyarrow is not installed")
+    @override_settings(ARANGO_API_EXPORT={"BATCH_ROWS": 1})
+    def test_parquet(self):
+
+        content = b"".join(export.iter_arrow(LEVELS, "edges", "parquet"))
+        table = export.pyarrow.parquet.read_table(io.BytesIO(content))
+
+        self.assertEqual(table.column("label").to_pylist(), ["subClassOf", "part of"])
+        self.assertEqual(table.column("collection").to_pylist(), ["CL-CL", "CL-UBERON"])
@@ -0,0 +1,143 @@
+from datetime import timedelta
+import json
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from arango_api import jobs
+from arango_api.models import Job
+
+
+def count_to(params, progress):
+
+    progress(0.5)
+    return list(range(params["n"]))
+
+
+def fail(params, progress):
+
+    raise RuntimeError("Query failed")
+
+
+class JobsTestCase(TestCase):
+
+    def setUp(self):
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            ARANGO_API_JOBS={**settings.ARANGO_API_JOBS, "DIRECTORY": directory.name}
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        kinds = mock.patch.dict(jobs.JOB_KINDS, {"count_to": count_to, "fail": fail})
+        kinds.start()
+        self.addCleanup(kinds.stop)
+
+        # Jobs are run in the test instead of in the background
+        executor = mock.patch.object(jobs, "get_executor")
+        executor.start()
+        self.addCleanup(executor.stop)
+
+    def test_job_result(self):
+
+        response = self.client.post(
+            reverse("submit_job"),
+            {"kind": "count_to", "params": {"n": 3}},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["id"]
+        self.assertEqual(response.json()["status"], "queued")
+
+        jobs.run(job_id)
+        job = self.client.get(reverse("get_job", kwargs={"job_id": job_id})).json()
+        self.assertEqual(job["status"], "succeeded")
+        self.assertEqual(job["progress"], 1.0)
+        self.assertEqual(job["result_size"], 7)
+
+        response = self.client.get(job["result_url"])
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), [0, 1, 2])
+
+    def test_failed_job(self):
+
+        job = jobs.submit("fail", {})
+        jobs.run(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertEqual(job.error, "Query failed")
+        response = self.client.get(reverse("get_job_result", kwargs={"job_id": job.id}))
+        self.assertEqual(response.status_code, 409)
+
+    def test_query_error(self):
+
+        for kind, params in [
+            ("get_all", {"graph": "ontologies"}),
+            ("get_shortest_paths", {"node_ids": ["CL/0000061", "CL/0000151"]}),
+        ]:
+            job = jobs.submit(kind, params)
+            with mock.patch.object(
+                jobs.utils, "get_document_collections", return_value=[]
+            ), mock.patch.object(
+                jobs.utils.querylog, "execute", side_effect=RuntimeError("AQL error")
+            ), mock.patch.object(
+                jobs.utils,
+                "get_shortest_path_pair",
+                side_effect=RuntimeError("AQL error"),
+            ):
+                jobs.run(job.id)
+
+            job.refresh_from_db()
+            self.assertEqual(job.status, Job.Status.FAILED)
+            self.assertEqual(job.error, "AQL error")
+
+    def test_result_size_limit(self):
+
+        with override_settings(
+            ARANGO_API_JOBS={**settings.ARANGO_API_JOBS, "MAX_RESULT_BYTES": 4}
+        ):
+            job = jobs.submit("count_to", {"n": 3})
+            jobs.run(job.id)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertFalse(jobs.result_path(job.id).exists())
+
+    def test_submit_validation(self):
+
+        response = self.client.post(
+            reverse("submit_job"),
+            {"kind": "unknown", "params": {}},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+        with override_settings(
+            ARANGO_API_JOBS={**settings.ARANGO_API_JOBS, "MAX_PENDING": 1}
+        ):
+            jobs.submit("count_to", {"n": 1})
+            with self.assertRaises(jobs.TooManyJobs):
+                jobs.submit("count_to", {"n": 1})
+
+    def test_prune(self):
+
+        job = jobs.submit("count_to", {"n": 1})
+        jobs.run(job.id)
+        stuck = jobs.submit("count_to", {"n": 1})
+        long_ago = timezone.now() - timedelta(days=30)
+        Job.objects.filter(id=job.id).update(finished_at=long_ago)
+        Job.objects.filter(id=stuck.id).update(created_at=long_ago)
+
+        jobs.prune()
+
+        self.assertFalse(Job.objects.filter(id=job.id).exists())
+        self.assertFalse(jobs.result_path(job.id).exists())
+        stuck.refresh_from_db()
+        self.assertEqual(stuck.status, Job.Status.FAILED)
+        self.assertEqual(stuck.error, "Interrupted")
@@ -0,0 +1,85 @@
+from unittest import mock, skipIf
+
+from django.test import SimpleTestCase, override_settings
+
+from arango_api import layout
+
+
+LAYOUT = {
+    "MIN_NODES": 3,
+    "MAX_NODES": 20,
+    "ITERATIONS": 50,
+    "EXACT_MAX_NODES": 1000,
+    "SAMPLE_SIZE": 8,
+    "EDGE_LENGTH": 100,
+    "CACHE_TIMEOUT": 60,
+}
+
+
+def chain_graph(n):
+    """Returns a get_graph result of a chain of n nodes from CL/0."""
+    return {
+        "nodes": {"CL/0": [{"node": {"_id": f"CL/{i}"}, "path": []} for i in range(n)]},
+        "links": [
+            {"_id": f"CL-CL/{i}", "_from": f"CL/{i}", "_to": f"CL/{i + 1}"}
+            for i in range(n - 1)
+        ],
+    }
+
+
+@skipIf(layout.np is None, "NumPy is not installed")
+@override_settings(ARANGO_API_LAYOUT=LAYOUT)
+class LayoutTestCase(SimpleTestCase):
+
+    def test_signature(self):
+
+        graph = chain_graph(4)
+        node_ids = layout.get_node_ids(graph)
+        signature = layout.get_signature(node_ids, graph["links"])
+
+        self.assertEqual(
+            signature,
+            layout.get_signature(node_ids[::-1], graph["links"][::-1]),
+        )
+        self.assertNotEqual(
+            signature, layout.get_signature(node_ids, graph["links"][:-1])
+        )
+
+    def test_layout(self):
+
+        positions = layout.get_layout(chain_graph(10))
+
+        self.assertEqual(set(positions), {f"CL/{i}" for i in range(10)})
+        np = layout.np
+        pos = np.array([[positions[f"CL/{i}"][k] for k in "xy"] for i in range(10)])
+        linked = np.linalg.norm(pos[1:] - pos[:-1], axis=1).mean()
+        distances = np.linalg.norm(pos[:, None] - pos[None, :], axis=2)
+        self.assertLess(linked, distances.sum() / (10 * 9))
+        self.assertTrue(np.allclose(pos.mean(axis=0), 0, atol=1))
+
+    def test_sampled_repulsion(self):
+
+        pos = layout.force_layout(300, [(i, i + 1) for i in range(299)], 20, 100, 16)
+
+        self.assertEqual(pos.shape, (300, 2))
+        self.assertTrue(layout.np.isfinite(pos).all())
+
+    def test_small_graph(self):
+
+        self.assertIsNone(layout.get_layout(chain_graph(2)))
+
+    def test_large_graph(self):
+
+        self.assertIsNone(layout.get_layout(chain_graph(21)))
+        self.assertEqual(len(layout.get_layout(chain_graph(20))), 20)
+
+
+@override_settings(ARANGO_API_LAYOUT=LAYOUT)
+class NoNumPyTestCase(SimpleTestCase):
+
+    @mock.patch.object(layout, "np", None)
+    def test_no_layout(self):
+
+        with self.assertNoLogs(layout.logger):
+            self.assertIsNone(layout.get_layout(chain_graph(2)))
+            self.assertIsNone(layout.get_layout(chain_graph(10)))
@@ -0,0 +1,145 @@
+from pathlib import Path
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from arango_api import lineage
+from arango_api.lineage import LineageIndex
+
+
+# cell <- {epithelial cell, secretory cell} <- alveolar type 2 cell,
+# and an unrelated GO term
+EDGES = [
+    ("CL/0000066", "CL/0000000"),
+    ("CL/0000151", "CL/0000000"),
+    ("CL/0002063", "CL/0000066"),
+    ("CL/0002063", "CL/0000151"),
+    ("GO/0005575", "GO/0110165"),
+]
+
+
+class LineageIndexTestCase(SimpleTestCase):
+
+    def setUp(self):
+
+        self.index = LineageIndex.from_edges(EDGES)
+
+    def test_ancestors_and_descendants(self):
+
+        self.assertEqual(
+            self.index.get_ancestors("CL/0002063"),
+            ["CL/0000000", "CL/0000066", "CL/0000151"],
+        )
+        self.assertEqual(self.index.get_ancestors("CL/0000000"), [])
+        self.assertEqual(
+            self.index.get_descendants("CL/0000000"),
+            ["CL/0000066", "CL/0000151", "CL/0002063"],
+        )
+        with self.assertRaises(KeyError):
+            self.index.get_ancestors("CL/9999999")
+
+    def test_is_descendant(self):
+
+        self.assertTrue(self.index.is_descendant("CL/0002063", "CL/0000000"))
+        self.assertFalse(self.index.is_descendant("CL/0000000", "CL/0002063"))
+        self.assertFalse(self.index.is_descendant("CL/0002063", "GO/0110165"))
+
+    def test_lowest_common_ancestors(self):
+
+        self.assertEqual(
+            self.index.get_lowest_common_ancestors(["CL/0000066", "CL/0000151"]),
+            ["CL/0000000"],
+        )
+        self.assertEqual(
+            self.index.get_lowest_common_ancestors(["CL/0002063", "CL/0000066"]),
+            ["CL/0000066"],
+        )
+        self.assertEqual(
+            self.index.get_lowest_common_ancestors(["CL/0002063", "GO/0005575"]), []
+        )
+
+    def test_cycle(self):
+
+        index = LineageIndex.from_edges([("A/1", "A/2"), ("A/2", "A/1")])
+        self.assertTrue(index.is_descendant("A/1", "A/2"))
+        self.assertEqual(index.get_ancestors("A/2"), [])
+
+    def test_save_and_load(self):
+
+        index = LineageIndex.from_edges(EDGES, "1")
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "lineage.json.gz"
+            index.save(path)
+            loaded = LineageIndex.load(path)
+        self.assertEqual(loaded.ids, index.ids)
+        self.assertEqual(loaded.version, "1")
+        self.assertEqual(loaded.get_descendants("CL/0000151"), ["CL/0002063"])
+
+    def test_save_replaces_file(self):
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "lineage.json.gz"
+            LineageIndex.from_edges(EDGES[:1], "1").save(path)
+            with mock.patch.object(
+                lineage.json, "dump", side_effect=RuntimeError("disk full")
+            ):
+                with self.assertRaises(RuntimeError):
+                    self.index.save(path)
+            self.assertEqual(LineageIndex.load(path).version, "1")
+            self.assertEqual([p.name for p in Path(directory).iterdir()], [path.name])
+
+
+class RebuildIndexTestCase(SimpleTestCase):
+
+    def setUp(self):
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "lineage.json.gz"
+        LineageIndex.from_edges(EDGES[:1], "1").save(self.path)
+        settings_override = override_settings(
+            ARANGO_API_LINEAGE={
+                "PATH": self.path,
+                "LABEL": "subClassOf",
+                "REBUILD_TIMEOUT": 10,
+            },
+            ARANGO_API_COALESCE={
+                "CROSS_PROCESS": True,
+                "DIRECTORY": Path(directory.name) / "coalesce",
+                "LOCK_TIMEOUT": 10,
+                "RESULT_TTL": 10,
+            },
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        patcher = mock.patch.object(lineage, "_index", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_first_poll_rebuilds_stale_index(self):
+
+        with mock.patch.object(
+            lineage, "iter_subclass_edges", return_value=EDGES
+        ) as edges:
+            lineage.rebuild_index(None, "2")
+            lineage.rebuild_index("2", "2")
+        edges.assert_called_once()
+        self.assertEqual(lineage.get_index().version, "2")
+        self.assertTrue(lineage.get_index().is_descendant("CL/0002063", "CL/0000000"))
+        self.assertEqual(LineageIndex.load(self.path).version, "2")
+
+    def test_current_index_not_rebuilt(self):
+
+        with mock.patch.object(lineage, "iter_subclass_edges") as edges:
+            lineage.rebuild_index(None, "1")
+        edges.assert_not_called()
+
+    def test_rebuilt_file_loaded(self):
+
+        LineageIndex.from_edges(EDGES, "2").save(self.path)
+        lineage._index = LineageIndex.from_edges(EDGES[:1], "1")
+        with mock.patch.object(lineage, "iter_subclass_edges") as edges:
+            lineage.rebuild_index("1", "2")
+        edges.assert_not_called()
+        self.assertEqual(lineage.get_index().version, "2")
@@ -0,0 +1,45 @@
+from django.test import SimpleTestCase
+
+from arango_api import loadtest
+
+
+class LoadTestTestCase(SimpleTestCase):
+
+    def test_percentile(self):
+
+        values = list(range(1, 101))
+        self.assertEqual(loadtest.percentile(values, 50), 50)
+        self.assertEqual(loadtest.percentile(values, 95), 95)
+        self.assertEqual(loadtest.percentile(values, 99), 99)
+        self.assertEqual(loadtest.percentile([7], 99), 7)
+        self.assertIsNone(loadtest.percentile([], 50))
+
+    def test_expand_keystrokes(self):
+
+        template = {
+            "name": "search",
+            "keystrokes": True,
+            "path": "/arango_api/search/",
+            "data": {"search_term": "at1", "db": "ontologies"},
+        }
+        self.assertEqual(
+            [
+                request["data"]["search_term"]
+                for request in loadtest.expand_template(template)
+            ],
+            ["at", "at1"],
+        )
+
+    def test_summarize(self):
+
+        report = loadtest.summarize(
+            [("graph", 10.0, True), ("graph", 30.0, False), ("document", 2.0, True)],
+            2.0,
+        )
+        self.assertEqual(report["graph"]["count"], 2)
+        self.assertEqual(report["graph"]["errors"], 1)
+        self.assertEqual(report["graph"]["error_rate"], 0.5)
+        self.assertEqual(report["graph"]["throughput_rps"], 1.0)
+        self.assertEqual(report["graph"]["p50_ms"], 10.0)
+        self.assertEqual(report["graph"]["max_ms"], 30.0)
+        self.assertEqual(report["total"]["count"], 3)
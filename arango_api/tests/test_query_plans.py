@@ -0,0 +1,108 @@
+import os
+from pathlib import Path
+import subprocess
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+
+from arango_api import explain
+
+
+TESTS_DIR = Path(os.path.abspath(__file__)).parent
+SH_DIR = TESTS_DIR.parent / "sh"
+ARANGO_DB_HOME = os.environ["ARANGO_DB_HOME"]
+
+
+def plan_summary(**kwargs):
+    summary = {
+        "estimated_cost": 10,
+        "node_types": {"SingletonNode": 1, "TraversalNode": 1, "ReturnNode": 1},
+        "indexes": ["CL-CL:edge:_from"],
+        "collection_scans": {},
+    }
+    summary.update(kwargs)
+    return summary
+
+
+class ComparePlansTestCase(SimpleTestCase):
+
+    def test_unchanged_plan(self):
+
+        self.assertEqual(
+            explain.compare_plans({"q": plan_summary()}, {"q": plan_summary()}), []
+        )
+
+    def test_new_scan_of_large_collection(self):
+
+        self.assertEqual(
+            explain.compare_plans(
+                {"q": plan_summary()},
+                {"q": plan_summary(collection_scans={"CL": 3069})},
+            ),
+            ["q: new full scan of CL (3069 documents)"],
+        )
+
+    def test_new_scan_of_small_collection(self):
+
+        self.assertEqual(
+            explain.compare_plans(
+                {"q": plan_summary()},
+                {"q": plan_summary(collection_scans={"publication_ind": 2})},
+            ),
+            [],
+        )
+
+    def test_lost_index(self):
+
+        self.assertEqual(
+            explain.compare_plans(
+                {"q": plan_summary()}, {"q": plan_summary(indexes=[])}
+            ),
+            ["q: index no longer used: CL-CL:edge:_from"],
+        )
+
+    def test_cost_jump(self):
+
+        self.assertEqual(
+            explain.compare_plans(
+                {"q": plan_summary()}, {"q": plan_summary(estimated_cost=100)}
+            ),
+            ["q: estimated cost rose from 10 to 100"],
+        )
+
+    def test_missing_case(self):
+
+        self.assertEqual(
+            explain.compare_plans({"q": plan_summary()}, {}),
+            ["q: query case missing"],
+        )
+
+
+class QueryPlansTestCase(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+
+        if settings.ARANGO_API_REPLAY["MODE"] == "replay":
+            return
+        subprocess.run([str(SH_DIR / "stop-arangodb.sh")])
+        os.environ["ARANGO_DB_HOME"] = str(Path(TESTS_DIR / "arangodb"))
+        subprocess.run([str(SH_DIR / "start-arangodb.sh")])
+
+    def test_no_plan_regressions(self):
+
+        if not explain.BASELINE_PATH.exists():
+            self.fail("No query plan baseline; run manage.py explain_queries --update")
+        baseline = explain.load_baseline()
+        plans = explain.collect_plans()
+        self.assertEqual(explain.compare_plans(baseline, plans), [])
+        self.assertEqual(sorted(set(plans) - set(baseline)), [])
+
+    @classmethod
+    def tearDownClass(cls):
+
+        if settings.ARANGO_API_REPLAY["MODE"] == "replay":
+            return
+        subprocess.run([str(SH_DIR / "stop-arangodb.sh")])
+        os.environ["ARANGO_DB_HOME"] = ARANGO_DB_HOME
+        subprocess.run([str(SH_DIR / "start-arangodb.sh")])
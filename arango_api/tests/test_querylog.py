@@ -0,0 +1,109 @@
+import json
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from arango_api import querylog, views
+from arango_api.middleware import QueryLogMiddleware
+
+
+class QueryLogTestCase(SimpleTestCase):
+
+    def test_normalize_query(self):
+
+        self.assertEqual(
+            querylog.normalize_query(
+                """
+                // Find direct children
+                FOR v IN 1..1 INBOUND @start GRAPH @graph_name
+                    FILTER v.label == "subClassOf" /* label filter */
+                    LIMIT 10
+                    RETURN v
+                """
+            ),
+            "FOR v IN ?..? INBOUND @start GRAPH @graph_name "
+            "FILTER v.label == ? LIMIT ? RETURN v",
+        )
+
+    def test_fingerprint_ignores_literals_and_whitespace(self):
+
+        self.assertEqual(
+            querylog.fingerprint("FOR d IN CL LIMIT 10 RETURN d"),
+            querylog.fingerprint("FOR d IN CL\n    LIMIT 20\n    RETURN d"),
+        )
+        self.assertNotEqual(
+            querylog.fingerprint("FOR d IN CL RETURN d"),
+            querylog.fingerprint("FOR d IN GO RETURN d"),
+        )
+
+    def test_bind_vars_shape(self):
+
+        self.assertEqual(
+            querylog.bind_vars_shape(
+                {"node_ids": ["CL/0000061", "CL/0000151"], "depth": 2, "graph": "g"}
+            ),
+            {"node_ids": "list[2]", "depth": "int", "graph": "str"},
+        )
+
+    def test_query_stats_top(self):
+
+        stats = querylog.QueryStats()
+        for duration_ms in [10.0, 30.0]:
+            stats.add(
+                {
+                    "fingerprint": "slow",
+                    "endpoint": "get_graph",
+                    "duration_ms": duration_ms,
+                    "rows": 1,
+                },
+                "FOR v IN ?..? ANY @id GRAPH @graph_name RETURN v",
+            )
+        stats.add(
+            {"fingerprint": "fast", "endpoint": None, "duration_ms": 1.0, "rows": 0},
+            "collections",
+        )
+
+        top = stats.top(1)
+        self.assertEqual(len(top), 1)
+        self.assertEqual(top[0]["fingerprint"], "slow")
+        self.assertEqual(top[0]["count"], 2)
+        self.assertEqual(top[0]["total_ms"], 40.0)
+        self.assertEqual(top[0]["mean_ms"], 20.0)
+        self.assertEqual(top[0]["max_ms"], 30.0)
+        self.assertEqual(top[0]["endpoints"], ["get_graph"])
+
+    def test_query_stats_top_parameter(self):
+
+        for top, status in [("2", 200), ("abc", 400), ("0", 400)]:
+            request = APIRequestFactory().get("/arango_api/query_stats/", {"top": top})
+            force_authenticate(request, user=User(username="admin", is_staff=True))
+            self.assertEqual(views.get_query_stats(request).status_code, status)
+
+    @mock.patch("arango_api.breaker.get_breaker", mock.Mock(return_value=None))
+    def test_streamed_calls_attributed_to_request(self):
+
+        def chunks():
+            for key in ["0000061", "0000151"]:
+                document = querylog.call(
+                    "collection.get CL", lambda key: {"_key": key}, key
+                )
+                yield json.dumps(document)
+
+        request = APIRequestFactory().post("/arango_api/graph/stream/")
+        request.resolver_match = SimpleNamespace(url_name="get_graph_stream")
+        middleware = QueryLogMiddleware(lambda request: StreamingHttpResponse(chunks()))
+        response = middleware(request)
+        with self.assertLogs(querylog.logger, "INFO") as logs:
+            b"".join(response.streaming_content)
+
+        record = json.loads(logs.records[-1].getMessage().split(" ", 1)[1])
+        self.assertEqual(record["endpoint"], "get_graph_stream")
+        self.assertEqual(record["queries"], 2)
+        stats = {
+            stats["fingerprint"]: stats for stats in querylog.query_stats.top(1000)
+        }
+        self.assertIn("get_graph_stream", stats["collection.get CL"]["endpoints"])
@@ -0,0 +1,59 @@
+import json
+
+from django.test import SimpleTestCase, override_settings
+
+from arango_api import querylog, rendering
+
+
+DATA = {"nodes": {"CL/0000061": [{"node": {"label": "cementoblast"}}]}, "links": []}
+
+
+class RenderingTestCase(SimpleTestCase):
+
+    def test_dumps(self):
+
+        self.assertEqual(json.loads(rendering.dumps(DATA)), DATA)
+        self.assertEqual(json.loads(rendering.dumps(["µ"])), ["µ"])
+
+    def test_encode_time(self):
+
+        state = querylog.begin_request()
+        try:
+            rendering.encode(DATA)
+        finally:
+            timing = querylog.end_request(state)
+        self.assertGreater(timing.encode_ms, 0)
+
+    def test_raw_json(self):
+
+        state = querylog.begin_request()
+        try:
+            content = rendering.encode(rendering.RawJSON('{"a":1}'))
+        finally:
+            timing = querylog.end_request(state)
+        self.assertEqual(content, b'{"a":1}')
+        self.assertEqual(timing.encode_ms, 0)
+
+    @override_settings(ARANGO_API_RENDERING={"STREAM_MIN_ITEMS": 3, "CHUNK_ITEMS": 2})
+    def test_json_response_streams_lists(self):
+
+        items = [{"_key": str(i)} for i in range(5)]
+        response = rendering.json_response(items)
+        self.assertTrue(response.streaming)
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), items)
+
+        response = rendering.json_response(items[:2])
+        self.assertFalse(response.streaming)
+        self.assertEqual(json.loads(response.content), items[:2])
+
+    @override_settings(ARANGO_API_RENDERING={"STREAM_MIN_ITEMS": 3, "CHUNK_ITEMS": 2})
+    def test_streamed_encode_time(self):
+
+        state = querylog.begin_request()
+        try:
+            response = rendering.json_response([DATA] * 5)
+        finally:
+            timing = querylog.end_request(state)
+        self.assertEqual(timing.encode_ms, 0)
+        b"".join(response.streaming_content)
+        self.assertGreater(timing.encode_ms, 0)
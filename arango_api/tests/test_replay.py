@@ -0,0 +1,92 @@
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from arango_api import querylog, replay
+
+
+class FakeAQL:
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def execute(self, query, bind_vars=None, **kwargs):
+        self.queries.append((query, bind_vars))
+        return iter(self.rows)
+
+
+class FakeDatabase:
+
+    def __init__(self, rows):
+        self.name = "Cell-KN-Ontologies"
+        self.aql = FakeAQL(rows)
+
+
+class ReplayTestCase(SimpleTestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        # Calls to the fake databases don't depend on the real one's health
+        patcher = mock.patch("arango_api.breaker.get_breaker", return_value=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def replay_settings(self, mode, latency_ms=None):
+        return override_settings(
+            ARANGO_API_REPLAY={
+                "MODE": mode,
+                "DIRECTORY": self.directory.name,
+                "LATENCY_MS": latency_ms,
+            }
+        )
+
+    def test_record_then_replay_execute(self):
+
+        query = "FOR d IN @@coll FILTER d._id IN @ids RETURN d"
+        bind_vars = {"@coll": "CL", "ids": ["CL/0000061"]}
+        rows = [{"_id": "CL/0000061", "label": "cementoblast"}]
+
+        with self.replay_settings("record"):
+            db = FakeDatabase(rows)
+            self.assertEqual(querylog.execute(db, query, bind_vars=bind_vars), rows)
+            self.assertEqual(len(db.aql.queries), 1)
+
+        with self.replay_settings("replay"):
+            db = FakeDatabase([])
+            self.assertEqual(querylog.execute(db, query, bind_vars=bind_vars), rows)
+            self.assertEqual(db.aql.queries, [])
+
+            with self.assertRaises(replay.FixtureMissing):
+                querylog.execute(db, query, bind_vars={**bind_vars, "ids": []})
+
+    def test_record_then_replay_call(self):
+
+        with self.replay_settings("record"):
+            querylog.call("collection.get CL", lambda key: {"_key": key}, "0000061")
+
+        def unreachable(key):
+            raise AssertionError("called the database in replay mode")
+
+        with self.replay_settings("replay"):
+            self.assertEqual(
+                querylog.call("collection.get CL", unreachable, "0000061"),
+                {"_key": "0000061"},
+            )
+            with self.assertRaises(replay.FixtureMissing):
+                querylog.call("collection.get CL", unreachable, "0000151")
+
+    def test_make_key_ignores_bind_var_order(self):
+
+        self.assertEqual(
+            replay.make_key("db", "RETURN @a + @b", {"a": 1, "b": 2}),
+            replay.make_key("db", "RETURN @a + @b", {"b": 2, "a": 1}),
+        )
+        self.assertNotEqual(
+            replay.make_key("db", "RETURN @a + @b", {"a": 1, "b": 2}),
+            replay.make_key("other", "RETURN @a + @b", {"a": 1, "b": 2}),
+        )
@@ -0,0 +1,63 @@
+from pathlib import Path
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+
+from arango_api import search_index
+
+
+DOCUMENTS = [
+    ("ontologies", {"_id": "CL/0000061", "_key": "0000061", "label": "cementoblast"}),
+    (
+        "ontologies",
+        {
+            "_id": "CL/0002062",
+            "_key": "0002062",
+            "label": "pulmonary alveolar type 1 cell",
+            "definition": "A squamous pulmonary alveolar epithelial cell (AT1).",
+        },
+    ),
+    ("phenotypes", {"_id": "cell_set_ind/hlca-h4pclnit", "label": "AT1"}),
+    ("ontologies", {"_id": "PR/000001", "_key": "000001", "Symbol": "AT1"}),
+]
+
+
+@override_settings(
+    ARANGO_API_SEARCH={"BACKEND": "sqlite", "SQLITE_PATH": None, "LIMIT": 10}
+)
+class SearchIndexTestCase(SimpleTestCase):
+
+    def setUp(self):
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "search.sqlite3"
+        self.assertEqual(search_index.write_index(self.path, DOCUMENTS), 4)
+
+    def search(self, *args, **kwargs):
+        return search_index.search(*args, path=self.path, **kwargs)
+
+    def test_exact_match_first(self):
+
+        self.assertEqual(self.search("at1", "ontologies"), ["PR/000001", "CL/0002062"])
+
+    def test_substring_match(self):
+
+        self.assertEqual(self.search("ementobl", "ontologies"), ["CL/0000061"])
+
+    def test_db_and_collection_filter(self):
+
+        self.assertEqual(
+            self.search("at1", "phenotypes"), ["cell_set_ind/hlca-h4pclnit"]
+        )
+        self.assertEqual(
+            self.search("at1", "ontologies", collections=["CL"]), ["CL/0002062"]
+        )
+
+    def test_short_term(self):
+
+        self.assertIsNone(self.search("at", "ontologies"))
+
+    def test_quotes_in_term(self):
+
+        self.assertEqual(self.search('"at1', "ontologies"), [])
@@ -1,7 +1,9 @@
 import os
 from pathlib import Path
 import subprocess
+from unittest import mock
 
+from django.conf import settings
 from django.test import TestCase
 
 from arango_api import utils
@@ -17,6 +19,8 @@ class UtilsTestCase(TestCase):
     @classmethod
     def setUpClass(cls):
 
+        if settings.ARANGO_API_REPLAY["MODE"] == "replay":
+            return
         subprocess.run([str(SH_DIR / "stop-arangodb.sh")])
         os.environ["ARANGO_DB_HOME"] = str(Path(TESTS_DIR / "arangodb"))
         subprocess.run([str(SH_DIR / "start-arangodb.sh")])
@@ -121,6 +125,185 @@ class UtilsTestCase(TestCase):
     def test_get_graph(self):
         pass
 
+    def test_get_graph_set_operation(self):
+
+        result = utils.get_graph(
+            ["CL/0000061", "CL/0000151"],
+            1,
+            "ANY",
+            ["CL"],
+            100,
+            "ontologies",
+            "Intersection",
+        )
+        node_ids = {
+            item["node"]["_id"]
+            for node_list in result["nodes"].values()
+            for item in node_list
+        }
+        self.assertIn("CL/0000061", node_ids)
+        self.assertIn("CL/0000151", node_ids)
+        for link in result["links"]:
+            self.assertIn(link["_from"], node_ids)
+            self.assertIn(link["_to"], node_ids)
+
+    def test_get_graph_fields(self):
+
+        args = (["CL/0000061"], 1, "ANY", ["CL"], 100, "ontologies")
+        fields = utils.resolve_fields("minimal")
+        expected = utils.get_graph(*args)
+        result = utils.get_graph(*args, fields=fields)
+        self.assertEqual(result["links"], expected["links"])
+        for origin, node_list in expected["nodes"].items():
+            self.assertEqual(
+                [item["node"]["_id"] for item in result["nodes"][origin]],
+                [item["node"]["_id"] for item in node_list],
+            )
+        for node_list in result["nodes"].values():
+            for item in node_list:
+                self.assertTrue(set(item["node"]) <= set(fields))
+                for vertex in item["path"]["vertices"]:
+                    self.assertTrue(set(vertex) <= set(fields))
+
+    def test_get_shortest_paths_symmetric_pairs(self):
+
+        forward = utils.get_shortest_paths(["CL/0000061", "CL/0000151"], "ANY")
+        backward = utils.get_shortest_paths(["CL/0000151", "CL/0000061"], "ANY")
+        self.assertEqual(
+            {item["node"]["_id"] for item in forward["nodes"]["CL/0000151"]},
+            {item["node"]["_id"] for item in backward["nodes"]["CL/0000061"]},
+        )
+        self.assertEqual(
+            {link["_id"] for link in forward["links"]},
+            {link["_id"] for link in backward["links"]},
+        )
+
+    def test_get_shortest_paths_max_paths(self):
+
+        result = utils.get_shortest_paths(
+            ["CL/0000061", "CL/0000151"], "ANY", max_paths=1
+        )
+        node_ids = [item["node"]["_id"] for item in result["nodes"]["CL/0000151"]]
+        self.assertIn("CL/0000061", node_ids)
+        self.assertIn("CL/0000151", node_ids)
+        self.assertEqual(len(result["links"]), len(node_ids) - 1)
+
+    def test_resolve_fields(self):
+
+        self.assertIsNone(utils.resolve_fields(None))
+        self.assertIsNone(utils.resolve_fields("all"))
+        self.assertEqual(utils.resolve_fields("minimal"), ["_id", "_key", "label"])
+        self.assertEqual(
+            utils.resolve_fields("label,definition"),
+            ["_id", "_key", "label", "definition"],
+        )
+        self.assertEqual(
+            utils.resolve_fields(["_id", "Symbol"]), ["_id", "_key", "Symbol"]
+        )
+        with self.assertRaises(ValueError):
+            utils.resolve_fields([1])
+
+    def test_resolve_graph(self):
+
+        self.assertEqual(utils.resolve_graph(None).name, "ontologies")
+        self.assertEqual(utils.resolve_graph("Phenotypes").name, "phenotypes")
+        self.assertEqual(
+            utils.resolve_graph("phenotypes").db.name,
+            os.environ["ARANGO_DB_NAME_PHENOTYPES"],
+        )
+        with self.assertRaises(ValueError):
+            utils.resolve_graph("unknown")
+
+    def test_get_graph_batched(self):
+
+        args = (["CL/0000061", "CL/0000151"], 1, "ANY", ["CL"], 100, "ontologies")
+        expected = utils.get_graph(*args)
+        result = utils.get_graph_batched(*args)
+        self.assertEqual(
+            {
+                origin: {item["node"]["_id"] for item in node_list}
+                for origin, node_list in result["nodes"].items()
+            },
+            {
+                origin: {item["node"]["_id"] for item in node_list}
+                for origin, node_list in expected["nodes"].items()
+            },
+        )
+        self.assertEqual(
+            sorted(link["_id"] for link in result["links"]),
+            sorted(link["_id"] for link in expected["links"]),
+        )
+
+    def test_get_graph_no_node_ids(self):
+
+        with mock.patch.object(
+            utils.querylog, "execute", side_effect=RuntimeError("array expected")
+        ):
+            self.assertEqual(
+                utils.get_graph(None, 1, "ANY", ["CL"], 100, "ontologies"), []
+            )
+
+    def test_expand_graph(self):
+
+        args = (["CL/0000061"], 1, "ANY", ["CL"], 100, "ontologies")
+        full = utils.get_graph(*args)
+        full_node_ids = {
+            item["node"]["_id"]
+            for node_list in full["nodes"].values()
+            for item in node_list
+        }
+        known_ids = ["CL/0000061", "CL/0000151"]
+        result = utils.expand_graph(*args, known_ids=known_ids)
+        node_ids = {
+            item["node"]["_id"]
+            for node_list in result["nodes"].values()
+            for item in node_list
+        }
+        self.assertTrue(node_ids)
+        self.assertTrue(node_ids <= full_node_ids)
+        self.assertFalse(node_ids & set(known_ids))
+
+    def test_get_graph_intersection_single_origin(self):
+
+        result = utils.get_graph(
+            ["CL/0000061"], 1, "ANY", ["CL"], 100, "ontologies", "Intersection"
+        )
+        self.assertEqual(
+            [item for node_list in result["nodes"].values() for item in node_list],
+            [],
+        )
+        self.assertEqual(result["links"], [])
+
+    def test_get_graph_intersection_paths(self):
+
+        # Nodes on the paths from each origin to nodes reached by both are kept
+        result = utils.get_graph(
+            ["CL/0000061", "CL/0000151"],
+            2,
+            "ANY",
+            ["CL"],
+            100,
+            "ontologies",
+            "Intersection",
+        )
+        node_ids = {
+            item["node"]["_id"]
+            for node_list in result["nodes"].values()
+            for item in node_list
+        }
+        linked_ids = {link["_from"] for link in result["links"]} | {
+            link["_to"] for link in result["links"]
+        }
+        self.assertTrue(node_ids)
+        self.assertEqual(node_ids - linked_ids, set())
+
+    def test_get_graph_unknown_set_operation(self):
+
+        with self.assertRaises(ValueError):
+            utils.get_graph(
+                ["CL/0000061"], 1, "ANY", ["CL"], 100, "ontologies", "Complement"
+            )
+
     # TODO: Complete
     def test_get_all(self):
         pass
@@ -129,6 +312,28 @@ class UtilsTestCase(TestCase):
     def test_search_by_term(self):
         pass
 
+    def test_search_by_term_facets(self):
+
+        results = utils.search_by_term("cell", "ontologies", ["CL"], facets=True)
+        self.assertTrue(results["results"])
+        self.assertTrue(all(doc["_id"].startswith("CL/") for doc in results["results"]))
+        self.assertEqual(
+            results["facets"]["collections"], {"CL": len(results["results"])}
+        )
+        self.assertTrue(
+            set(results["facets"]["fields"]) <= set(utils.SEARCH_FACET_FIELDS)
+        )
+
+    def test_build_search_query_options(self):
+
+        # View options follow the SEARCH expression
+        query, bind_vars = utils.build_search_query("cell", collections=["CL"])
+        search = query.index("SEARCH")
+        options = query.index("OPTIONS { collections: @collections }")
+        self.assertLess(search, options)
+        self.assertLess(options, query.index("LET isExactMatch"))
+        self.assertEqual(bind_vars["collections"], ["CL"])
+
     # TODO: Complete
     def test_run_aql_query(self):
         pass
@@ -137,9 +342,31 @@ class UtilsTestCase(TestCase):
     def test_get_sunburst(self):
         pass
 
+    def test_get_phenotypes_sunburst_slices(self):
+
+        landing = utils.get_phenotypes_sunburst(None, lazy=True).data
+        full = utils.get_phenotypes_sunburst(None).data
+        organ_ids = settings.ARANGO_API_PHENOTYPES_SUNBURST["ORGAN_IDS"]
+        for lazy_root, full_root in zip(landing["children"], full["children"]):
+            self.assertEqual(lazy_root["_id"], full_root["_id"])
+            for lazy_organ, full_organ in zip(
+                lazy_root["children"], full_root["children"]
+            ):
+                self.assertIn(lazy_organ["_id"], organ_ids)
+                self.assertEqual(lazy_organ["children"], [])
+                self.assertEqual(
+                    full_organ["children"],
+                    utils.get_phenotypes_sunburst(lazy_organ["_id"]).data,
+                )
+
+        response = utils.get_phenotypes_sunburst("CL/0000061")
+        self.assertEqual(response.status_code, 404)
+
     @classmethod
     def tearDownClass(cls):
 
+        if settings.ARANGO_API_REPLAY["MODE"] == "replay":
+            return
         subprocess.run([str(SH_DIR / "stop-arangodb.sh")])
         os.environ["ARANGO_DB_HOME"] = ARANGO_DB_HOME
         subprocess.run([str(SH_DIR / "start-arangodb.sh")])
@@ -1,10 +1,15 @@
+import json
 import os
 from pathlib import Path
 import subprocess
+from unittest import mock
 
+from django.conf import settings
 from django.test import TestCase
 from django.urls import reverse
 
+from arango_api import querylog
+
 
 TESTS_DIR = Path(os.path.abspath(__file__)).parent
 SH_DIR = TESTS_DIR.parent / "sh"
@@ -16,6 +21,8 @@ class ViewsTestCase(TestCase):
     @classmethod
     def setUpClass(cls):
 
+        if settings.ARANGO_API_REPLAY["MODE"] == "replay":
+            return
         subprocess.run([str(SH_DIR / "stop-arangodb.sh")])
         os.environ["ARANGO_DB_HOME"] = str(Path(TESTS_DIR / "arangodb"))
         subprocess.run([str(SH_DIR / "start-arangodb.sh")])
@@ -74,6 +81,16 @@ class ViewsTestCase(TestCase):
             ],
         )
 
+    def test_unknown_graph(self):
+
+        response = self.client.post(
+            reverse("list_by_collection", kwargs={"coll": "CL"}),
+            {"graph": "unknown"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "Unknown graph: unknown"})
+
     def test_get_object(self):
 
         self.assertEqual(
@@ -137,6 +154,104 @@ class ViewsTestCase(TestCase):
     def test_get_graph(self):
         pass
 
+    def test_get_graph_stream(self):
+
+        response = self.client.post(
+            reverse("get_graph_stream"),
+            {
+                "node_ids": ["CL/0000061"],
+                "depth": 1,
+                "edge_direction": "ANY",
+                "allowed_collections": ["CL"],
+                "graph": "ontologies",
+            },
+            content_type="application/json",
+        )
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(records[0]["type"], "level")
+        self.assertEqual(records[0]["depth"], 0)
+        self.assertEqual(
+            records[0]["nodes"]["CL/0000061"][0]["node"]["_id"], "CL/0000061"
+        )
+        self.assertEqual(records[-1]["type"], "complete")
+        self.assertEqual(
+            records[-1]["stats"]["nodes"],
+            sum(
+                len(node_list)
+                for record in records[:-1]
+                for node_list in record["nodes"].values()
+            ),
+        )
+
+    @mock.patch("arango_api.breaker.get_breaker", mock.Mock(return_value=None))
+    def test_streamed_query_count(self):
+
+        def iter_graph_levels(node_ids, *args):
+            for depth, node_id in enumerate(node_ids):
+                document = querylog.call(
+                    "collection.get CL",
+                    lambda key: {"_id": key, "_key": key.split("/")[1]},
+                    node_id,
+                )
+                yield {
+                    "type": "level",
+                    "depth": depth,
+                    "nodes": {node_id: [{"node": document}]},
+                    "links": [],
+                }
+            yield {"type": "complete", "stats": {}}
+
+        data = {
+            "node_ids": ["CL/0000061", "CL/0000151"],
+            "depth": 1,
+            "edge_direction": "ANY",
+            "allowed_collections": ["CL"],
+            "graph": "ontologies",
+        }
+        for name in ["get_graph_stream", "export_graph"]:
+            with mock.patch(
+                "arango_api.utils.iter_graph_levels", iter_graph_levels
+            ), self.assertLogs(querylog.logger, "INFO") as logs:
+                response = self.client.post(
+                    reverse(name), data, content_type="application/json"
+                )
+                b"".join(response.streaming_content)
+            record = json.loads(logs.records[-1].getMessage().split(" ", 1)[1])
+            self.assertEqual(record["endpoint"], name)
+            self.assertEqual(record["queries"], 2)
+
+    def test_get_graph_stream_validation(self):
+
+        valid = {
+            "node_ids": ["CL/0000061"],
+            "depth": 1,
+            "edge_direction": "ANY",
+            "allowed_collections": ["CL"],
+            "node_limit": 100,
+        }
+        for data in [
+            {**valid, "depth": "one"},
+            {key: value for key, value in valid.items() if key != "depth"},
+            {**valid, "node_ids": []},
+            {**valid, "node_ids": "CL/0000061"},
+            {**valid, "node_limit": "many"},
+            {**valid, "node_limit": 0},
+            {**valid, "edge_direction": "SIDEWAYS"},
+            {**valid, "edge_direction": None},
+            {**valid, "allowed_collections": "CL"},
+            {**valid, "allowed_collections": [1]},
+        ]:
+            for name in ["get_graph_stream", "export_graph"]:
+                response = self.client.post(
+                    reverse(name), data, content_type="application/json"
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
     # TODO: Complete
     def test_get_all(self):
         pass
@@ -149,9 +264,28 @@ class ViewsTestCase(TestCase):
     def test_get_sunburst(self):
         pass
 
+    def test_get_phenotypes_sunburst_lazy_root(self):
+
+        root_id = settings.ARANGO_API_PHENOTYPES_SUNBURST["ROOT_IDS"][0]
+        response = self.client.post(
+            reverse("get_sunburst"),
+            {"parent_id": root_id, "graph": "phenotypes", "lazy": True},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        organs = response.json()
+        self.assertTrue(organs)
+        for organ in organs:
+            self.assertIn(
+                organ["_id"], settings.ARANGO_API_PHENOTYPES_SUNBURST["ORGAN_IDS"]
+            )
+            self.assertEqual(organ["_hasChildren"], bool(organ["children"]))
+
     @classmethod
     def tearDownClass(cls):
 
+        if settings.ARANGO_API_REPLAY["MODE"] == "replay":
+            return
         subprocess.run([str(SH_DIR / "stop-arangodb.sh")])
         os.environ["ARANGO_DB_HOME"] = ARANGO_DB_HOME
         subprocess.run([str(SH_DIR / "start-arangodb.sh")])
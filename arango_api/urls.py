@@ -2,22 +2,39 @@ from django.urls import path
 
 from .views import (
     list_by_collection,
+    browse_collection,
     get_object,
     get_related_edges,
     get_search_items,
     get_all,
     get_graph,
+    get_graph_stream,
+    export_graph,
+    expand_graph,
     run_aql_query,
     list_collection_names,
     get_sunburst,
     get_shortest_paths,
+    get_ancestors,
+    get_descendants,
+    get_is_descendant,
+    get_lowest_common_ancestors,
+    get_admission_stats,
+    get_query_stats,
+    submit_job,
+    get_job,
+    get_job_result,
 )
 
 urlpatterns = [
     path("collections/", list_collection_names, name="list_collection_names"),
     path("collection/<str:coll>/", list_by_collection, name="list_by_collection"),
     path("collection/<str:coll>/<str:pk>/", get_object, name="get_object"),
+    path("browse/<str:coll>/", browse_collection, name="browse_collection"),
     path("graph/", get_graph, name="get_graph"),
+    path("graph/stream/", get_graph_stream, name="get_graph_stream"),
+    path("graph/expand/", expand_graph, name="expand_graph"),
+    path("graph/export/", export_graph, name="export_graph"),
     path("shortest_paths/", get_shortest_paths, name="get_shortest_paths"),
     path(
         "edges/<str:edge_coll>/<str:dr>/<str:item_coll>/<str:pk>/",
@@ -28,4 +45,25 @@ urlpatterns = [
     path("aql/", run_aql_query, name="run_aql_query"),
     path("get_all/", get_all, name="get_all"),
     path("sunburst/", get_sunburst, name="get_sunburst"),
+    path(
+        "lineage/ancestors/<str:coll>/<str:pk>/",
+        get_ancestors,
+        name="get_ancestors",
+    ),
+    path(
+        "lineage/descendants/<str:coll>/<str:pk>/",
+        get_descendants,
+        name="get_descendants",
+    ),
+    path("lineage/is_descendant/", get_is_descendant, name="get_is_descendant"),
+    path(
+        "lineage/lca/",
+        get_lowest_common_ancestors,
+        name="get_lowest_common_ancestors",
+    ),
+    path("admission/", get_admission_stats, name="get_admission_stats"),
+    path("query_stats/", get_query_stats, name="get_query_stats"),
+    path("jobs/", submit_job, name="submit_job"),
+    path("jobs/<uuid:job_id>/", get_job, name="get_job"),
+    path("jobs/<uuid:job_id>/result/", get_job_result, name="get_job_result"),
 ]
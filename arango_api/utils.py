@@ -1,21 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
 from itertools import chain
+import logging
+import textwrap
+import time
+
+from django.conf import settings
 from rest_framework.response import Response
 from rest_framework import status
 
-from arango_api.db import (
-    db_ontologies,
-    GRAPH_NAME_ONTOLOGIES,
-    GRAPH_NAME_PHENOTYPES,
-    db_phenotypes,
-)
+from arango_api import querylog, search_index
+from arango_api.breaker import DatabaseUnavailable
+from arango_api.cache import get_or_set
+from arango_api.db import resolve_graph
+
+
+logger = logging.getLogger(__name__)
+
+# Named sets of document attributes accepted by the fields parameter
+FIELD_PRESETS = {
+    "minimal": ["label"],
+    "card": ["label", "Label", "Name", "Symbol", "Title", "Recommended_name"],
+}
+# Attributes kept by every projection
+PROJECTION_KEYS = ["_id", "_key"]
 
 
-def get_document_collections(graph):
+def resolve_fields(fields):
+    """
+    Resolves a fields parameter, either a preset name, a comma separated
+    string, or a list of attribute names, to the list of attributes to keep.
+    Returns None, meaning whole documents, if fields is empty or "all".
+    """
+    if not fields or fields == "all":
+        return None
+    if isinstance(fields, str):
+        fields = FIELD_PRESETS.get(fields) or fields.split(",")
+    if not isinstance(fields, list) or not all(
+        isinstance(field, str) and field.strip() for field in fields
+    ):
+        raise ValueError(f"Invalid fields: {fields}")
+    return list(dict.fromkeys(PROJECTION_KEYS + [field.strip() for field in fields]))
+
+
+def _projected(expression, fields):
+    """Returns expression wrapped in KEEP if fields are projected."""
+    return f"KEEP({expression}, @fields)" if fields else expression
+
+
+def _projected_path(path, fields):
+    if not fields:
+        return path
+    return (
+        f"{{ vertices: {path}.vertices[* RETURN KEEP(CURRENT, @fields)], "
+        f"edges: {path}.edges }}"
+    )
+
+
+def get_document_collections(graph=None):
     # Filter for document collections
-    if graph == "phenotypes":
-        all_collections = db_phenotypes.collections()
-    else:
-        all_collections = db_ontologies.collections()
+    db = resolve_graph(graph).db
+    all_collections = querylog.call(f"collections {db.name}", db.collections)
     collections = [
         collection
         for collection in all_collections
@@ -24,33 +69,64 @@ def get_document_collections(graph):
     return collections
 
 
-def get_all_by_collection(coll, graph):
-    if graph == "phenotypes":
-        collection = db_phenotypes.collection(coll)
-    else:
-        collection = db_ontologies.collection(coll)
+def get_all_by_collection(coll, graph, fields=None):
+    db = resolve_graph(graph).db
+    if fields:
+        return querylog.execute(
+            db,
+            "FOR doc IN @@collection RETURN KEEP(doc, @fields)",
+            bind_vars={"@collection": coll, "fields": fields},
+        )
+
+    collection = db.collection(coll)
 
     if not collection:
-        print(f"Collection '{coll}' not found.")
-    return collection.all()
+        logger.warning("Collection '%s' not found.", coll)
+    return querylog.call(
+        f"collection.all {db.name} {coll}", lambda: list(collection.all())
+    )
 
 
-def get_by_id(coll, id):
-    return db_ontologies.collection(coll).get(id)
+def get_by_id(coll, id, fields=None, graph=None):
+    db = resolve_graph(graph).db
+    if fields:
+        rows = querylog.execute(
+            db,
+            """
+            LET doc = DOCUMENT(CONCAT(@collection, "/", @key))
+            RETURN doc ? KEEP(doc, @fields) : null
+            """,
+            bind_vars={"collection": coll, "key": id, "fields": fields},
+        )
+        return rows[0]
 
+    return querylog.call(
+        f"collection.get {db.name} {coll}", db.collection(coll).get, id
+    )
 
-def get_edges_by_id(edge_coll, dr, item_coll, item_id):
-    return db_ontologies.collection(edge_coll).find({dr: f"{item_coll}/{item_id}"})
 
+def get_edges_by_id(edge_coll, dr, item_coll, item_id, graph=None):
+    db = resolve_graph(graph).db
+    return querylog.call(
+        f"collection.find {db.name} {edge_coll} {dr}",
+        lambda item: list(db.collection(edge_coll).find({dr: item})),
+        f"{item_coll}/{item_id}",
+    )
 
-def get_graph(
+
+def build_graph_query(
     node_ids,
     depth,
     edge_direction,
     allowed_collections,
     node_limit,
     graph,
+    fields=None,
 ):
+    """
+    Builds the AQL query and bind variables used by get_graph. Vertices,
+    including those in paths, are projected to fields if given.
+    """
     query = f"""
             // Create temp variable for paths for each origin node
             LET temp = FLATTEN(
@@ -64,9 +140,9 @@ def get_graph(
                     }}
                     LIMIT @node_limit
                     RETURN {{
-                      node: v,
+                      node: {_projected("v", fields)},
                       link: e,
-                      path: p,
+                      path: {_projected_path("p", fields)},
                       depth: LENGTH(p.vertices)
                     }}
                 )
@@ -109,11 +185,7 @@ def get_graph(
             }}
     """
 
-    # Use correct graph name
-    if graph == "phenotypes":
-        graph_name = GRAPH_NAME_PHENOTYPES
-    else:
-        graph_name = GRAPH_NAME_ONTOLOGIES
+    graph_name = resolve_graph(graph).graph_name
     # Depth is increased by one to find all edges that connect to final nodes
     bind_vars = {
         "node_ids": node_ids,
@@ -122,28 +194,655 @@ def get_graph(
         "allowed_collections": allowed_collections,
         "node_limit": node_limit,
     }
+    if fields:
+        bind_vars["fields"] = fields
+
+    return query, bind_vars
+
+
+# AQL filters deciding whether a node survives a set operation, given the
+# origins that reached it and the number of origins (origin_count). As in
+# the client, an intersection needs at least two origins
+SET_OPERATIONS = {
+    "Union": "true",
+    "Intersection": "origin_count > 1 AND LENGTH(origins) == origin_count",
+    "Difference": "LENGTH(origins) == 1 AND origins[0] == @node_ids[0]",
+    "Symmetric Difference": "LENGTH(origins) % 2 == 1",
+}
+
+
+def build_graph_set_operation_query(
+    node_ids,
+    depth,
+    edge_direction,
+    allowed_collections,
+    node_limit,
+    graph,
+    set_operation,
+    fields=None,
+):
+    """
+    Builds the AQL query and bind variables used by get_graph when a set
+    operation is requested. Each origin's reachable set is computed as a
+    list of ids only, with the ids on the paths to them, the set operation
+    is applied to the ids, and documents are fetched for the surviving
+    nodes, the nodes on their paths, and the edges between them.
+    """
+    if set_operation not in SET_OPERATIONS:
+        raise ValueError(f"Unknown set operation: {set_operation}")
+
+    query = f"""
+            // Collect the ids reachable from each origin node, with the ids
+            // on the paths reaching them
+            LET reached = (
+              FOR node_id IN @node_ids
+                LET paths = (
+                  FOR v, e, p IN 0..@depth {edge_direction} node_id GRAPH @graph_name
+                    OPTIONS {{
+                      vertexCollections: @allowed_collections,
+                      order: "bfs"
+                    }}
+                    LIMIT @node_limit
+                    RETURN {{ id: v._id, path: p.vertices[*]._id }}
+                )
+                FOR path IN paths
+                  COLLECT origin = node_id, id = path.id INTO pathIds = path.path
+                  RETURN {{ id: id, origin: origin, path: UNIQUE(FLATTEN(pathIds)) }}
+            )
+            LET origin_count = LENGTH(@node_ids)
+
+            // Apply the set operation to the reachable ids
+            LET survivors = (
+              FOR r IN reached
+                COLLECT id = r.id INTO group = {{ origin: r.origin, path: r.path }}
+                LET origins = group[*].origin
+                FILTER {SET_OPERATIONS[set_operation]}
+                RETURN {{
+                  id: id,
+                  origin: FIRST(origins),
+                  path: UNIQUE(FLATTEN(group[*].path))
+                }}
+            )
+
+            // Keep the nodes on the paths to surviving nodes
+            LET members = (
+              FOR s IN survivors
+                FOR id IN UNION_DISTINCT([s.id], s.path)
+                  COLLECT memberId = id INTO origins = s.origin
+                  RETURN {{ id: memberId, origin: FIRST(origins) }}
+            )
+            LET memberLookup = ZIP(members[*].id, members[*].id)
+
+            // Organize nodes in object, by an origin that reached them
+            LET nodesGrouped = MERGE(
+              FOR m IN members
+                COLLECT origin = m.origin INTO ids = m.id
+                RETURN {{
+                  [origin]: (
+                    FOR id IN ids
+                      RETURN {{ node: {_projected("DOCUMENT(id)", fields)} }}
+                  )
+                }}
+            )
+
+            // Find the edges between kept nodes
+            LET linkIds = UNIQUE(
+              FOR m IN members
+                FOR v, e IN 1..1 {edge_direction} m.id GRAPH @graph_name
+                  OPTIONS {{ vertexCollections: @allowed_collections }}
+                  FILTER HAS(memberLookup, v._id)
+                  RETURN e._id
+            )
+
+            RETURN {{
+              nodes: nodesGrouped,
+              links: (
+                FOR id IN linkIds
+                  RETURN DOCUMENT(id)
+              )
+            }}
+    """
+
+    graph_name = resolve_graph(graph).graph_name
+    bind_vars = {
+        "node_ids": list(dict.fromkeys(node_ids)),
+        "graph_name": graph_name,
+        "depth": int(depth),
+        "allowed_collections": allowed_collections,
+        "node_limit": node_limit,
+    }
+    if fields:
+        bind_vars["fields"] = fields
+
+    return query, bind_vars
+
+
+def build_graph_batch_query(
+    node_ids,
+    depth,
+    edge_direction,
+    allowed_collections,
+    node_limit,
+    graph,
+    fields=None,
+):
+    """
+    Builds the AQL query and bind variables for one batch of origins in
+    get_graph_batched. Returns one flat row list per origin, leaving grouping
+    and deduplication to Python.
+    """
+    query = f"""
+            FOR node_id IN @node_ids
+              // For each origin, collect up to @node_limit paths
+              RETURN {{
+                origin: node_id,
+                rows: (
+                  FOR v, e, p IN 0..@depth {edge_direction} node_id GRAPH @graph_name
+                    OPTIONS {{
+                      vertexCollections: @allowed_collections,
+                      order: "bfs"
+                    }}
+                    LIMIT @node_limit
+                    RETURN {{
+                      node: {_projected("v", fields)},
+                      link: e,
+                      path: {_projected_path("p", fields)},
+                      depth: LENGTH(p.vertices)
+                    }}
+                )
+              }}
+    """
+
+    graph_name = resolve_graph(graph).graph_name
+    # Depth is increased by one to find all edges that connect to final nodes
+    bind_vars = {
+        "node_ids": node_ids,
+        "graph_name": graph_name,
+        "depth": int(depth) + 1,
+        "allowed_collections": allowed_collections,
+        "node_limit": node_limit,
+    }
+    if fields:
+        bind_vars["fields"] = fields
+
+    return query, bind_vars
+
+
+def get_graph_batched(
+    node_ids,
+    depth,
+    edge_direction,
+    allowed_collections,
+    node_limit,
+    graph,
+    fields=None,
+):
+    """
+    Traversal mode for many origins. Origins are split into batches that are
+    traversed concurrently, and the rows are grouped by origin in one pass,
+    deduplicating nodes by origin and _id and links by _id. Returns the same
+    shape as get_graph, keeping the first (shortest) path to each node.
+    """
+    batch_size = settings.ARANGO_API_GRAPH_BATCH_SIZE
+    origins = list(dict.fromkeys(node_ids))
+    batches = [origins[i : i + batch_size] for i in range(0, len(origins), batch_size)]
+    db = resolve_graph(graph).db
+
+    def run_batch(batch):
+        query, bind_vars = build_graph_batch_query(
+            batch,
+            depth,
+            edge_direction,
+            allowed_collections,
+            node_limit,
+            graph,
+            fields,
+        )
+        return querylog.execute(db, query, bind_vars=bind_vars, stream=True)
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=settings.ARANGO_API_GRAPH_BATCH_WORKERS
+        ) as executor:
+            # Run each batch in a copy of this context to keep query logging
+            # attributed to the calling endpoint
+            futures = [
+                executor.submit(copy_context().run, run_batch, batch)
+                for batch in batches
+            ]
+            batch_results = [future.result() for future in futures]
+    except DatabaseUnavailable:
+        raise
+    except Exception:
+        logger.exception("Error executing batched graph query")
+        return []
+
+    # Final depth rows are only used to find edges that connect to final nodes
+    edge_depth = int(depth) + 1
+    nodes_grouped = {}
+    links = {}
+    for item in chain.from_iterable(batch_results):
+        seen = set()
+        group = nodes_grouped.setdefault(item["origin"], [])
+        for row in item["rows"]:
+            link = row["link"]
+            if link is not None:
+                links.setdefault(link["_id"], link)
+            node_id = row["node"]["_id"]
+            if row["depth"] == edge_depth or node_id in seen:
+                continue
+            seen.add(node_id)
+            group.append({"node": row["node"], "path": row["path"]})
+
+    return {"nodes": nodes_grouped, "links": list(links.values())}
+
+
+def get_graph(
+    node_ids,
+    depth,
+    edge_direction,
+    allowed_collections,
+    node_limit,
+    graph,
+    set_operation=None,
+    fields=None,
+):
+    # Invalid node_ids are left for the query to reject
+    batched = isinstance(node_ids, list) and (
+        len(node_ids) > settings.ARANGO_API_GRAPH_BATCH_SIZE
+    )
+    if not set_operation and batched:
+        return get_graph_batched(
+            node_ids,
+            depth,
+            edge_direction,
+            allowed_collections,
+            node_limit,
+            graph,
+            fields,
+        )
+
+    if set_operation:
+        query, bind_vars = build_graph_set_operation_query(
+            node_ids,
+            depth,
+            edge_direction,
+            allowed_collections,
+            node_limit,
+            graph,
+            set_operation,
+            fields,
+        )
+    else:
+        query, bind_vars = build_graph_query(
+            node_ids,
+            depth,
+            edge_direction,
+            allowed_collections,
+            node_limit,
+            graph,
+            fields,
+        )
 
     # Execute the query
     try:
-        if graph == "phenotypes":
-            cursor = db_phenotypes.aql.execute(query, bind_vars=bind_vars)
-        else:
-            cursor = db_ontologies.aql.execute(query, bind_vars=bind_vars)
+        rows = querylog.execute(resolve_graph(graph).db, query, bind_vars=bind_vars)
 
-        results = list(cursor)[
-            0
-        ]  # Collect the results - one element should be guaranteed
+        results = rows[0]  # Collect the results - one element should be guaranteed
 
-    except Exception as e:
-        print(f"Error executing query: {e}")
+    except DatabaseUnavailable:
+        raise
+    except Exception:
+        logger.exception("Error executing graph query")
         results = []
 
     return results
 
 
-def get_shortest_paths(node_ids, edge_direction):
+def build_graph_level_query(edge_direction):
+    """
+    Builds the AQL query used by iter_graph_levels to expand one BFS level.
+    Returns only ids and edges, so documents are fetched once per new node.
+    """
+    query = f"""
+            FOR item IN @frontier
+              FOR v, e IN 1..1 {edge_direction} item.id GRAPH @graph_name
+                OPTIONS {{ vertexCollections: @allowed_collections }}
+                RETURN {{ origin: item.origin, node_id: v._id, link: e }}
+    """
+    return query
+
+
+def iter_graph_levels(
+    node_ids,
+    depth,
+    edge_direction,
+    allowed_collections,
+    node_limit,
+    graph,
+):
+    """
+    Generates the get_graph traversal one BFS level at a time. Yields a
+    "level" record with the new nodes (grouped by origin) and links for each
+    depth as soon as it is computed, then a "complete" record with stats.
+    Links between final level nodes and nodes already reached are included
+    in the last level, matching the extra edge completion layer of get_graph.
+    Only ids are kept between levels, so memory does not grow with the size
+    of the documents streamed.
+    """
+    started = time.perf_counter()
+    depth = int(depth)
+    origins = list(dict.fromkeys(node_ids))
+    db = resolve_graph(graph).db
+    graph_name = resolve_graph(graph).graph_name
+    level_query = build_graph_level_query(edge_direction)
+
+    visited = {origin: {origin} for origin in origins}
+    link_ids = set()
+    stats = {"levels": 0, "nodes": 0, "links": 0}
+
+    def fetch_documents(ids):
+        rows = querylog.execute(
+            db, "FOR id IN @ids RETURN DOCUMENT(id)", bind_vars={"ids": list(ids)}
+        )
+        return {doc["_id"]: doc for doc in rows if doc}
+
+    try:
+        documents = fetch_documents(origins)
+        yield {
+            "type": "level",
+            "depth": 0,
+            "nodes": {
+                origin: [{"node": documents[origin]}]
+                for origin in origins
+                if origin in documents
+            },
+            "links": [],
+        }
+        stats["nodes"] += len(documents)
+        frontier = [{"origin": origin, "id": origin} for origin in documents]
+
+        for level in range(1, depth + 2):
+            if not frontier:
+                break
+            is_edge_completion = level == depth + 1
+            rows = querylog.execute(
+                db,
+                level_query,
+                bind_vars={
+                    "frontier": frontier,
+                    "graph_name": graph_name,
+                    "allowed_collections": allowed_collections,
+                },
+                stream=True,
+            )
+
+            new_ids = {}
+            links = []
+            for row in rows:
+                origin = row["origin"]
+                node_id = row["node_id"]
+                reached = visited[origin]
+                if node_id not in reached:
+                    if is_edge_completion or len(reached) >= node_limit:
+                        continue
+                    reached.add(node_id)
+                    new_ids.setdefault(origin, []).append(node_id)
+                link = row["link"]
+                if link["_id"] not in link_ids:
+                    link_ids.add(link["_id"])
+                    links.append(link)
+
+            documents = fetch_documents(set(chain.from_iterable(new_ids.values())))
+            yield {
+                "type": "level",
+                "depth": level,
+                "nodes": {
+                    origin: [{"node": documents[i]} for i in ids if i in documents]
+                    for origin, ids in new_ids.items()
+                },
+                "links": links,
+            }
+            stats["levels"] = level
+            stats["nodes"] += sum(len(ids) for ids in new_ids.values())
+            stats["links"] += len(links)
+            frontier = [
+                {"origin": origin, "id": node_id}
+                for origin, ids in new_ids.items()
+                for node_id in ids
+            ]
+
+    except Exception as e:
+        logger.exception("Error executing graph level query")
+        yield {"type": "error", "error": str(e)}
+        return
+
+    stats["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    yield {"type": "complete", "stats": stats}
+
+
+def build_graph_expand_query(
+    node_ids,
+    depth,
+    edge_direction,
+    allowed_collections,
+    node_limit,
+    graph,
+    known_ids,
+):
+    """
+    Builds the AQL query and bind variables used by expand_graph. Documents
+    whose ids are in known_ids are replaced by null, so only new nodes and
+    links leave the database.
+    """
+    query = f"""
+            LET known = ZIP(@known_ids, @known_ids)
+            FOR node_id IN @node_ids
+              RETURN {{
+                origin: node_id,
+                rows: (
+                  FOR v, e, p IN 1..@depth {edge_direction} node_id GRAPH @graph_name
+                    OPTIONS {{
+                      vertexCollections: @allowed_collections,
+                      order: "bfs"
+                    }}
+                    LIMIT @node_limit
+                    RETURN {{
+                      node_id: v._id,
+                      node: HAS(known, v._id) ? null : v,
+                      link: HAS(known, e._id) ? null : e,
+                      depth: LENGTH(p.edges)
+                    }}
+                )
+              }}
+    """
+
+    graph_name = resolve_graph(graph).graph_name
+    # Depth is increased by one to find all edges that connect to final nodes
+    bind_vars = {
+        "node_ids": list(dict.fromkeys(node_ids)),
+        "graph_name": graph_name,
+        "depth": int(depth) + 1,
+        "allowed_collections": allowed_collections,
+        "node_limit": node_limit,
+        "known_ids": list(known_ids or []),
+    }
+
+    return query, bind_vars
+
+
+def expand_graph(
+    node_ids,
+    depth,
+    edge_direction,
+    allowed_collections,
+    node_limit,
+    graph,
+    known_ids=None,
+    known_digest=None,
+):
+    """
+    Traverses only from the nodes being expanded and returns the nodes and
+    links the client does not already have, in the get_graph shape. What the
+    client has is given as a list of node and edge ids (known_ids), or as a
+    digest.BloomFilter (known_digest). Bloom filter false positives can hide
+    a new node or link, at the filter's false positive rate.
+    """
+    query, bind_vars = build_graph_expand_query(
+        node_ids,
+        depth,
+        edge_direction,
+        allowed_collections,
+        node_limit,
+        graph,
+        known_ids,
+    )
+    db = resolve_graph(graph).db
+    known = set(known_ids or [])
+
+    def is_known(item_id):
+        return item_id in known or (
+            known_digest is not None and item_id in known_digest
+        )
+
+    try:
+        items = querylog.execute(db, query, bind_vars=bind_vars, stream=True)
+    except DatabaseUnavailable:
+        raise
+    except Exception:
+        logger.exception("Error executing graph expand query")
+        return []
+
+    # Final depth rows are only used to find edges that connect to final nodes
+    edge_depth = int(depth) + 1
+    reached = set(node_ids)
+    nodes_grouped = {}
+    candidate_links = []
+    for item in items:
+        group = nodes_grouped.setdefault(item["origin"], [])
+        for row in item["rows"]:
+            if row["depth"] != edge_depth:
+                node = row["node"]
+                if node is not None and not is_known(node["_id"]):
+                    if node["_id"] not in reached:
+                        group.append({"node": node})
+                reached.add(row["node_id"])
+            if row["link"] is not None:
+                candidate_links.append((row["link"], row["node_id"], row["depth"]))
+
+    # Keep final depth links only when they end at a node the client has or
+    # is receiving
+    links = {}
+    for link, node_id, row_depth in candidate_links:
+        if is_known(link["_id"]):
+            continue
+        if row_depth == edge_depth and not (node_id in reached or is_known(node_id)):
+            continue
+        links.setdefault(link["_id"], link)
+
+    return {"nodes": nodes_grouped, "links": list(links.values())}
+
+
+def build_shortest_path_query(
+    start_node, target_node, edge_direction, max_paths=None, graph=None
+):
+    """
+    Builds the AQL query and bind variables for one get_shortest_paths pair.
+    With max_paths, the max_paths shortest paths are found with
+    K_SHORTEST_PATHS; otherwise all shortest paths, up to the configured
+    PATH_LIMIT.
+    """
+    config = settings.ARANGO_API_SHORTEST_PATHS
+    if max_paths:
+        paths = "K_SHORTEST_PATHS"
+        limit = min(int(max_paths), config["PATH_LIMIT"])
+    else:
+        paths = "ALL_SHORTEST_PATHS"
+        limit = config["PATH_LIMIT"]
+
+    query = f"""
+        LET paths = (
+          FOR p IN {edge_direction} {paths} @start_node TO @target_node
+            GRAPH @graph_name
+            LIMIT @path_limit
+            RETURN p
+        )
+
+        LET nodesArray = UNIQUE(
+          FOR p IN paths
+            FOR v IN p.vertices
+              RETURN v
+        )
+
+        LET linksArray = UNIQUE(
+          FOR p IN paths
+            FOR e IN p.edges
+              RETURN e
+        )
+
+        RETURN {{
+          nodes: nodesArray,
+          links: linksArray
+        }}
+    """
+
+    bind_vars = {
+        "start_node": start_node,
+        "target_node": target_node,
+        "graph_name": resolve_graph(graph).graph_name,
+        "path_limit": limit,
+    }
+
+    return query, bind_vars
+
+
+def get_shortest_path_pair(
+    start_node, target_node, edge_direction, max_paths=None, graph=None
+):
+    """
+    Returns the nodes and links on the shortest paths between two nodes,
+    cached per pair. Paths in either direction are the same pair when the
+    direction is ANY.
+    """
+    if str(edge_direction).upper() == "ANY":
+        start_node, target_node = sorted([start_node, target_node])
+    graph = resolve_graph(graph)
+
+    def load_pair():
+        query, bind_vars = build_shortest_path_query(
+            start_node, target_node, edge_direction, max_paths, graph.name
+        )
+        return querylog.execute(graph.db, query, bind_vars=bind_vars)[0]
+
+    return get_or_set(
+        "shortest_path_pair",
+        [start_node, target_node, edge_direction, max_paths, graph.name],
+        load_pair,
+        timeout=settings.ARANGO_API_SHORTEST_PATHS["CACHE_TIMEOUT"],
+    )
+
+
+def get_shortest_paths(
+    node_ids,
+    edge_direction,
+    max_paths=None,
+    graph=None,
+    progress=None,
+    raise_errors=False,
+):
+    """
+    Returns the nodes on the shortest paths between each pair of node_ids,
+    grouped by the later node of the pair, and the links on them. Pair
+    results are cached, so a selection extended by one node only queries
+    the new pairs. progress, if given, is called with the fraction of pairs
+    done before each pair. Pairs whose query fails are logged and skipped
+    unless raise_errors is set.
+    """
     combined_result = {"nodes": {}, "links": []}
+    node_ids_by_group = {}
     link_ids = set()
+    pairs = len(node_ids) * (len(node_ids) - 1) // 2
+    pairs_done = 0
 
     # Loop over each unique pair (i, j) with i < j to avoid duplicate paths.
     for i in range(len(node_ids) - 1):
@@ -151,80 +850,52 @@ def get_shortest_paths(node_ids, edge_direction):
             start_node = node_ids[i]
             target_node = node_ids[j]
 
-            query = f"""
-                LET paths = (
-                  FOR p IN {edge_direction} ALL_SHORTEST_PATHS @start_node TO @target_node
-                    GRAPH @graph_name
-                    RETURN p
-                )
-
-                LET nodesArray = UNIQUE(
-                  FOR p IN paths
-                    FOR v IN p.vertices
-                      RETURN v
-                )
-
-                LET linksArray = UNIQUE(
-                  FOR p IN paths
-                    FOR e IN p.edges
-                      RETURN e
-                )
-
-                RETURN {{
-                  nodes: {{
-                    [@target_node]: (
-                      FOR v IN nodesArray 
-                        RETURN {{ node: v }}
-                    )
-                  }},
-                  links: linksArray
-                }}
-            """
-
-            bind_vars = {
-                "start_node": start_node,
-                "target_node": target_node,
-                "graph_name": GRAPH_NAME_ONTOLOGIES,
-            }
+            if progress is not None:
+                progress(pairs_done / pairs)
+            pairs_done += 1
 
             try:
-                cursor = db_ontologies.aql.execute(query, bind_vars=bind_vars)
-                result = list(cursor)[0]
-
-                # Merge node results: result["nodes"] is like { target_node: [ { node: v }, ... ] }
-                for node_id, node_list in result["nodes"].items():
-                    if node_id not in combined_result["nodes"]:
-                        combined_result["nodes"][node_id] = node_list
-                    else:
-                        # Optionally merge node lists without duplicates
-                        existing_ids = {
-                            n["node"]["_id"] for n in combined_result["nodes"][node_id]
-                        }
-                        for node_obj in node_list:
-                            if node_obj["node"]["_id"] not in existing_ids:
-                                combined_result["nodes"][node_id].append(node_obj)
-
-                # Merge links without duplicates
-                for link in result["links"]:
-                    link_id = link.get("_id")
-                    if link_id:
-                        if link_id not in link_ids:
-                            combined_result["links"].append(link)
-                            link_ids.add(link_id)
-                    else:
-                        if link not in combined_result["links"]:
-                            combined_result["links"].append(link)
-
-            except Exception as e:
-                print(
-                    f"Error executing query for pair {start_node} to {target_node}: {e}"
+                result = get_shortest_path_pair(
+                    start_node, target_node, edge_direction, max_paths, graph
+                )
+            except DatabaseUnavailable:
+                raise
+            except Exception:
+                if raise_errors:
+                    raise
+                logger.exception(
+                    "Error executing query for pair %s to %s", start_node, target_node
                 )
+                continue
+
+            # Merge nodes without duplicates, grouped by target node
+            group = combined_result["nodes"].setdefault(target_node, [])
+            group_ids = node_ids_by_group.setdefault(target_node, set())
+            for node in result["nodes"]:
+                if node["_id"] not in group_ids:
+                    group.append({"node": node})
+                    group_ids.add(node["_id"])
+
+            # Merge links without duplicates
+            for link in result["links"]:
+                link_id = link.get("_id")
+                if link_id:
+                    if link_id not in link_ids:
+                        combined_result["links"].append(link)
+                        link_ids.add(link_id)
+                else:
+                    if link not in combined_result["links"]:
+                        combined_result["links"].append(link)
 
     return combined_result
 
 
-def get_all():
-    collections = get_document_collections()
+def get_all(graph=None, raise_errors=False):
+    """
+    Returns every document of the graph's collections. Query errors are
+    logged and return [] unless raise_errors is set.
+    """
+    collections = get_document_collections(graph)
 
     # Create the base query
     union_queries = []
@@ -242,10 +913,14 @@ def get_all():
 
     # Execute the query
     try:
-        cursor = db_ontologies.aql.execute(final_query)
-        results = list(cursor)  # Collect the results
-    except Exception as e:
-        print(f"Error executing query: {e}")
+        # Collect the results
+        results = querylog.execute(resolve_graph(graph).db, final_query)
+    except DatabaseUnavailable:
+        raise
+    except Exception:
+        if raise_errors:
+            raise
+        logger.exception("Error executing get_all query")
         results = []
 
     flat_results = list(chain.from_iterable(results))
@@ -253,8 +928,76 @@ def get_all():
     return flat_results
 
 
-def search_by_term(search_term, db):
-    db_name_lower = db.lower()
+# Fields counted in the matched field facet of search results
+SEARCH_FACET_FIELDS = [
+    "label",
+    "definition",
+    "Label",
+    "Name",
+    "Trade_names",
+    "Recommended_name",
+    "Author",
+    "Title",
+    "Symbol",
+    "Markers",
+    "PMID",
+    "PMCID",
+    "_key",
+]
+
+
+def build_search_query(search_term, collections=None, facets=False, fields=None):
+    """
+    Builds the AQL query and bind variables used by search_by_term. Only
+    documents in collections are searched, if given. With facets, the query
+    returns the documents together with hit counts per collection and per
+    field containing the search term, counted from the same search.
+    Documents are projected to fields if given.
+    """
+    bind_vars = {"search_term": search_term}
+    if fields:
+        bind_vars["fields"] = fields
+
+    view_options = ""
+    if collections:
+        view_options = "OPTIONS { collections: @collections }"
+        bind_vars["collections"] = list(collections)
+
+    matched_fields = ""
+    result = _projected("doc", fields)
+    facet_counts = ""
+    final_return = "sortedDocs"
+    if facets:
+        matched_fields = """
+                    LET matched_fields = (
+                        FOR field IN @facet_fields
+                            FILTER IS_STRING(doc[field])
+                                AND CONTAINS(LOWER(doc[field]), lower_search_term)
+                            RETURN field
+                    )"""
+        result = f"{{ doc: {result}, matched_fields }}"
+        facet_counts = """
+            LET collectionCounts = (
+                FOR item IN sortedDocs
+                    COLLECT collection_name = PARSE_IDENTIFIER(item.doc._id).collection
+                        WITH COUNT INTO hits
+                    RETURN { [collection_name]: hits }
+            )
+            LET fieldCounts = (
+                FOR item IN sortedDocs
+                    FOR field IN item.matched_fields
+                        COLLECT matched_field = field WITH COUNT INTO hits
+                        RETURN { [matched_field]: hits }
+            )
+"""
+        final_return = """{
+                results: sortedDocs[*].doc,
+                facets: {
+                    collections: MERGE(collectionCounts),
+                    fields: MERGE(fieldCounts)
+                }
+            }"""
+        bind_vars["facet_fields"] = SEARCH_FACET_FIELDS
 
     query = f"""
             LET lower_search_term = LOWER(@search_term)
@@ -292,6 +1035,7 @@ def search_by_term(search_term, db):
                           BOOST(LEVENSHTEIN_MATCH(doc.Markers, lower_search_term, 3), 1.0) OR
                           BOOST(LEVENSHTEIN_MATCH(doc._key, lower_search_term, 1), 1.0)
                         , "text_en_no_stem")
+                    {view_options}
 
                     // Exact match, sorted first
                     LET isExactMatch = (
@@ -302,200 +1046,349 @@ def search_by_term(search_term, db):
                         (HAS(doc, 'PMID') AND IS_STRING(doc.PMID) AND LOWER(doc.PMID) == lower_search_term) OR
                         (HAS(doc, '_key') AND IS_STRING(doc._key) AND doc._key == @search_term)
                     )
-                    SORT isExactMatch DESC, BM25(doc) DESC
-                    RETURN doc
+                    SORT isExactMatch DESC, BM25(doc) DESC{matched_fields}
+                    RETURN {result}
             )
-
-            RETURN sortedDocs
+{facet_counts}
+            RETURN {final_return}
             """
 
-    bind_vars = {"search_term": search_term}
-    try:
-        # db selection
-        db_connection = (
-            db_phenotypes if db_name_lower == "phenotypes" else db_ontologies
-        )
-        cursor = db_connection.aql.execute(query, bind_vars=bind_vars)
-        results = cursor.next()
+    return query, bind_vars
 
-    except StopIteration:
-        print("Query executed successfully but returned no results.")
-        results = {}
-    except Exception as e:
-        import traceback
 
-        print(f"Error executing query: {e}")
-        traceback.print_exc()
-        results = {}
+def count_search_facets(docs, search_term):
+    """
+    Counts docs per collection and per field containing search_term, as
+    the facets of build_search_query do.
+    """
+    lower_search_term = search_term.lower()
+    collection_counts = {}
+    field_counts = {}
+    for doc in docs:
+        collection = doc["_id"].split("/", 1)[0]
+        collection_counts[collection] = collection_counts.get(collection, 0) + 1
+        for field in SEARCH_FACET_FIELDS:
+            value = doc.get(field)
+            if isinstance(value, str) and lower_search_term in value.lower():
+                field_counts[field] = field_counts.get(field, 0) + 1
+    return {"collections": collection_counts, "fields": field_counts}
+
+
+def search_by_index(search_term, db, collections=None, facets=False, fields=None):
+    """
+    Searches the local SQLite index and fetches the matching documents in
+    one query, projected to fields if given. Returns None if the index can't
+    serve the search.
+    """
+    graph = resolve_graph(db)
+    if not search_index.is_available():
+        logger.warning("Search index not built, falling back to ArangoSearch")
+        return None
+    ids = search_index.search(search_term, graph.name, collections)
+    if ids is None:
+        return None
+
+    bind_vars = {"ids": ids}
+    fetched_fields = fields
+    if fields:
+        # Facets are counted from the documents before projection
+        if facets:
+            fetched_fields = list(dict.fromkeys(fields + SEARCH_FACET_FIELDS))
+        bind_vars["fields"] = fetched_fields
+    docs = querylog.execute(
+        graph.db,
+        f"""
+        FOR id IN @ids
+            LET doc = DOCUMENT(id)
+            FILTER doc != null
+            RETURN {_projected("doc", fetched_fields)}
+        """,
+        bind_vars=bind_vars,
+    )
+    if not facets:
+        return docs
+
+    search_facets = count_search_facets(docs, search_term)
+    if fields:
+        docs = [{field: doc[field] for field in fields if field in doc} for doc in docs]
+    return {"results": docs, "facets": search_facets}
 
-    return results
 
+def search_by_term(search_term, db, collections=None, facets=False, fields=None):
+    graph = resolve_graph(db)
 
-def run_aql_query(query):
+    if settings.ARANGO_API_SEARCH["BACKEND"] == "sqlite":
+        try:
+            results = search_by_index(
+                search_term, graph.name, collections, facets, fields
+            )
+        except DatabaseUnavailable:
+            raise
+        except Exception:
+            logger.exception("Error searching the search index")
+            results = None
+        if results is not None:
+            return results
+
+    query, bind_vars = build_search_query(search_term, collections, facets, fields)
+    # Query errors are raised, so a broken query isn't reported as no results
+    rows = querylog.execute(graph.db, query, bind_vars=bind_vars)
+    if not rows:
+        logger.warning("Search query executed successfully but returned no results.")
+        return {}
+    return rows[0]
+
+
+def run_aql_query(query, graph=None):
     # Execute the query
     try:
-        cursor = db_ontologies.aql.execute(query)
-        results = list(cursor)[
+        results = querylog.execute(resolve_graph(graph).db, query)[
             0
         ]  # Collect the results - one element should be guaranteed
-    except Exception as e:
-        print(f"Error executing query: {e}")
+    except DatabaseUnavailable:
+        raise
+    except Exception:
+        logger.exception("Error executing AQL query")
         results = []
 
     return results
 
 
-def get_phenotypes_sunburst(ignored_parent_id):
+def _phenotypes_path_subquery(level, parent, path):
+    """
+    Returns an AQL subquery for the children of the document in the AQL
+    variable parent, following path from level on. Each level rule gives
+    the traversal direction, the vertex collections to keep, and optionally
+    the edge collections to follow and the parent collections it applies to.
     """
-    API endpoint for fetching the *entire* phenotype sunburst structure
-    in one query, starting from NCBITaxon roots and traversing the specific path:
-    NCBITaxon -> UBERON (filtered) -> CL -> GS -> (MONDO or (PR -> CHEMBL)).
-    Uses hardcoded collection names and inline traversal options.
+    rule = path[level]
+    node = f"n{level}"
+    edge = f"e{level}"
+    lines = ["("]
+    if rule.get("parents"):
+        lines.append(
+            f"    FILTER PARSE_IDENTIFIER({parent}._id).collection IN @parents_{level}"
+        )
+    lines += [
+        f"    FOR {node}, {edge} IN 1..1 {rule['direction']} {parent}._id "
+        "GRAPH @graph_name",
+        "        OPTIONS { edgeCollections: @edge_collections }",
+        f"        FILTER PARSE_IDENTIFIER({node}._id).collection IN @collections_{level}",
+    ]
+    if rule.get("edge_collections"):
+        lines.append(
+            f"        FILTER PARSE_IDENTIFIER({edge}._id).collection IN @edges_{level}"
+        )
+    if level + 1 < len(path):
+        children = _phenotypes_path_subquery(level + 1, node, path)
+        lines.append(
+            f"        LET children_{level} = "
+            + textwrap.indent(children, " " * 8).lstrip()
+        )
+    else:
+        lines.append(f"        LET children_{level} = []")
+    lines += [
+        f"        RETURN MERGE({node}, {{",
+        "            value: 1,",
+        f"            _hasChildren: COUNT(children_{level}) > 0,",
+        f"            children: children_{level}",
+        "        })",
+        ")",
+    ]
+    return "\n".join(lines)
+
+
+def _phenotypes_path_bind_vars(path):
+    bind_vars = {}
+    for level, rule in enumerate(path):
+        bind_vars[f"collections_{level}"] = rule["collections"]
+        if rule.get("edge_collections"):
+            bind_vars[f"edges_{level}"] = rule["edge_collections"]
+        if rule.get("parents"):
+            bind_vars[f"parents_{level}"] = rule["parents"]
+    return bind_vars
+
 
-    NOTE: This ignores the parent_id and always loads the full structure.
-          It may be slow or memory-intensive on larger datasets.
+# Id of the artificial root above the phenotype sunburst roots
+PHENOTYPES_SUNBURST_ROOT_ID = "root_phenotypes_full"
+
+
+def build_phenotypes_sunburst_query():
+    """
+    Builds the AQL query and bind variables for the phenotype sunburst
+    landing view: the configured roots, each with the configured organs it
+    is connected to. Organs are returned without children, which are loaded
+    per organ by build_phenotypes_sunburst_slice_query.
     """
-    db = db_phenotypes
-    graph_name = GRAPH_NAME_PHENOTYPES
+    config = settings.ARANGO_API_PHENOTYPES_SUNBURST
+    first_rule = config["PATH"][0]
 
-    initial_root_ids = ["NCBITaxon/9606"]
-    uberon_terms = [
-        "UBERON/0002048",  # lung
-        "UBERON/0000966",  # retina
-        "UBERON/0000955",  # brain
-    ]
-    # Artificial root ID for the response
-    graph_root_id = "root_phenotypes_full"
-
-    # Collection and Edge Names
-    EDGE_NC_UB = "UBERON-NCBITaxon"
-    EDGE_UB_CL = "UBERON-CL"
-    EDGE_CL_UB = "CL-UBERON"
-    EDGE_CL_GS = "CL-GS"
-    EDGE_GS_MO = "GS-MONDO"
-    EDGE_GS_PR = "GS-PR"
-    EDGE_PR_CH = "CHEMBL-PR"
-
-    VC_NCBITAXON = "NCBITaxon"
-    VC_UBERON = "UBERON"
-    VC_CL = "CL"
-    VC_GS = "GS"
-    VC_MONDO = "MONDO"
-    VC_CHEMBL = "CHEMBL"
-    VC_PR = "PR"
-
-    # Construct the edge collection list string for AQL
-    allowed_edges_aql_string = (
-        f'["{EDGE_NC_UB}", "{EDGE_UB_CL}", "{EDGE_CL_UB}", "{EDGE_CL_GS}", '
-        f'"{EDGE_GS_MO}", "{EDGE_GS_PR}", "{EDGE_PR_CH}"]'
+    query = f"""
+            LET root_nodes = (
+                FOR root_id IN @root_ids
+                    LET root_node = DOCUMENT(root_id)
+                    FILTER root_node != null
+
+                    LET organ_nodes = (
+                        FOR organ_node, organ_edge IN 1..1 {config["ROOT_DIRECTION"]} root_node._id GRAPH @graph_name
+                            OPTIONS {{ edgeCollections: @edge_collections }}
+                            FILTER organ_node._id IN @organ_ids
+                            LET first_child = (
+                                FOR child IN 1..1 {first_rule["direction"]} organ_node._id GRAPH @graph_name
+                                    OPTIONS {{ edgeCollections: @edge_collections }}
+                                    FILTER PARSE_IDENTIFIER(child._id).collection IN @organ_child_collections
+                                    LIMIT 1
+                                    RETURN 1
+                            )
+                            RETURN MERGE(organ_node, {{
+                                value: 1,
+                                _hasChildren: COUNT(first_child) > 0,
+                                children: []
+                            }})
+                    )
+
+                    RETURN MERGE(root_node, {{
+                        value: 1,
+                        _hasChildren: COUNT(organ_nodes) > 0,
+                        children: organ_nodes
+                    }})
+            )
+
+            // Create the final top-level root object
+            RETURN {{
+                _id: @graph_root_id,
+                label: "NLM Cell Knowledge Network",
+                _hasChildren: COUNT(root_nodes) > 0,
+                children: root_nodes
+            }}
+            """
+
+    bind_vars = {
+        "graph_name": resolve_graph("phenotypes").graph_name,
+        "edge_collections": config["EDGE_COLLECTIONS"],
+        "root_ids": config["ROOT_IDS"],
+        "organ_ids": config["ORGAN_IDS"],
+        "organ_child_collections": first_rule["collections"],
+        "graph_root_id": PHENOTYPES_SUNBURST_ROOT_ID,
+    }
+
+    return query, bind_vars
+
+
+def build_phenotypes_sunburst_slice_query(organ_id):
+    """
+    Builds the AQL query and bind variables for the children of one organ
+    in the phenotype sunburst, following the configured path rules to the
+    leaves.
+    """
+    config = settings.ARANGO_API_PHENOTYPES_SUNBURST
+    path = config["PATH"]
+    children = textwrap.indent(
+        _phenotypes_path_subquery(0, "organ_node", path), " " * 12
+    ).lstrip()
+
+    query = f"""
+            LET organ_node = DOCUMENT(@organ_id)
+            FILTER organ_node != null
+            RETURN {children}
+            """
+
+    bind_vars = {
+        "graph_name": resolve_graph("phenotypes").graph_name,
+        "edge_collections": config["EDGE_COLLECTIONS"],
+        "organ_id": organ_id,
+        **_phenotypes_path_bind_vars(path),
+    }
+
+    return query, bind_vars
+
+
+def get_phenotypes_sunburst_slice(organ_id):
+    """
+    Returns the children of one organ, cached per organ so that organs can
+    be invalidated independently. Returns None if the organ doesn't exist.
+    """
+
+    def load_slice():
+        query, bind_vars = build_phenotypes_sunburst_slice_query(organ_id)
+        rows = querylog.execute(
+            resolve_graph("phenotypes").db, query, bind_vars=bind_vars
+        )
+        return rows[0] if rows else None
+
+    return get_or_set(
+        "phenotypes_sunburst_slice",
+        [organ_id],
+        load_slice,
+        cache_if=lambda children: children is not None,
     )
 
+
+def _load_organ_slices(root_nodes):
+    """Sets the children of the organs of root_nodes from their slices."""
+    for root_node in root_nodes:
+        for organ_node in root_node["children"]:
+            children = get_phenotypes_sunburst_slice(organ_node["_id"])
+            organ_node["children"] = children or []
+            organ_node["_hasChildren"] = bool(children)
+
+
+def get_phenotypes_sunburst(parent_id, lazy=False):
+    """
+    API endpoint for the phenotype sunburst, following the configured path
+    from the configured roots and organs, for example:
+    NCBITaxon -> UBERON (organs) -> CL -> GS -> (MONDO or (PR -> CHEMBL)).
+
+    Without parent_id, returns the landing view of roots and organs, with
+    each organ's children loaded from its cached slice, unless lazy is set.
+    With an organ as parent_id, returns that organ's children. With a root,
+    or the artificial root above them, as parent_id, returns its children
+    with the organs' children loaded, as the client loads the children of
+    a node whose children have unloaded children.
+    """
+    db = resolve_graph("phenotypes").db
+
     if db is None:
         return Response(
             {"error": "Database connection not available."},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-    # AQL Query with hardcoded names and inline options
-    query_full_structure = f"""
-                LET ncbi_level_nodes = (
-                    FOR ncbi_id IN @initial_root_ids
-                        LET ncbi_node = DOCUMENT(ncbi_id)
-                        FILTER ncbi_node != null AND IS_SAME_COLLECTION("{VC_NCBITAXON}", ncbi_node)
-
-                        LET uberon_level_nodes = (
-                            FOR uberon_node, edge1 IN 1..1 INBOUND ncbi_node._id GRAPH @graph_name
-                                OPTIONS {{ edgeCollections: {allowed_edges_aql_string} }}
-                                FILTER IS_SAME_COLLECTION("{VC_UBERON}", uberon_node)
-                                FILTER uberon_node._id IN @uberon_terms
-
-                                LET cl_level_nodes = (
-                                    FOR cl_node, edge2 IN 1..1 INBOUND uberon_node._id GRAPH @graph_name
-                                        OPTIONS {{ edgeCollections: {allowed_edges_aql_string} }}
-                                        FILTER IS_SAME_COLLECTION("{VC_CL}", cl_node)
-
-                                        LET gs_level_nodes = (
-                                            FOR gs_node, edge3 IN 1..1 OUTBOUND cl_node._id GRAPH @graph_name
-                                                OPTIONS {{ edgeCollections: {allowed_edges_aql_string} }}
-                                                FILTER IS_SAME_COLLECTION("{VC_GS}", gs_node)
-
-                                                LET gs_children_processed = (
-                                                    FOR gs_child_node, edge_gs_to_child IN 1..1 OUTBOUND gs_node._id GRAPH @graph_name
-                                                        OPTIONS {{ edgeCollections: {allowed_edges_aql_string} }}
-                                                        FILTER IS_SAME_COLLECTION("{VC_MONDO}", gs_child_node) OR 
-                                                               IS_SAME_COLLECTION("{VC_PR}", gs_child_node)
-
-                                                        LET processed_node_details = (
-                                                            IS_SAME_COLLECTION("{VC_MONDO}", gs_child_node)
-                                                            ? // gs_child_node is MONDO
-                                                                // MERGE MONDO node data (as leaf in this path)
-                                                                MERGE(gs_child_node, {{ value: 1, _hasChildren: false, children: [] }})
-                                                            : // gs_child_node is PR
-                                                                (
-                                                                    NOOPT((
-                                                                        LET pr_node_intermediate = gs_child_node // This is the PR node
-                                                                        LET chembl_children_of_pr = (
-                                                                            FOR chembl_node, edge_pr_to_chembl IN 1..1 INBOUND pr_node_intermediate._id GRAPH @graph_name
-                                                                                OPTIONS {{ edgeCollections: {allowed_edges_aql_string} }}
-                                                                                FILTER IS_SAME_COLLECTION("{VC_CHEMBL}", chembl_node)
-                                                                                AND IS_SAME_COLLECTION("{EDGE_PR_CH}", edge_pr_to_chembl)
-                                                                            // MERGE CHEMBL node data
-                                                                            RETURN MERGE(chembl_node, {{ value: 1, _hasChildren: false, children: [] }})
-                                                                        ) // End CHEMBL children of PR nodes
-                                                                        // MERGE PR node data
-                                                                        RETURN MERGE(pr_node_intermediate, {{ 
-                                                                            value: 1, 
-                                                                            _hasChildren: COUNT(chembl_children_of_pr) > 0, 
-                                                                            children: chembl_children_of_pr 
-                                                                        }})
-                                                                    ))
-                                                                )[0] // Get the single document from the subquery's result array
-                                                        )
-                                                        RETURN processed_node_details
-                                                ) // End gs_children_processed nodes
-
-                                                // MERGE GS node data
-                                                RETURN MERGE(gs_node, {{ value: 1, _hasChildren: COUNT(gs_children_processed) > 0, children: gs_children_processed }})
-                                        ) // End GS nodes
-
-                                        // MERGE CL node data
-                                        RETURN MERGE(cl_node, {{ value: 1, _hasChildren: COUNT(gs_level_nodes) > 0, children: gs_level_nodes }})
-                                ) // End CL nodes
-
-                                // MERGE UBERON node data
-                                RETURN MERGE(uberon_node, {{ value: 1, _hasChildren: COUNT(cl_level_nodes) > 0, children: cl_level_nodes }})
-                        ) // End UBERON nodes
-
-                        // MERGE NCBITaxon node data
-                        RETURN MERGE(ncbi_node, {{ value: 1, _hasChildren: COUNT(uberon_level_nodes) > 0, children: uberon_level_nodes }})
-                ) // End NCBITaxon nodes
-
-                // Create the final top-level root object
-                LET root_node = {{
-                    _id: @graph_root_id,
-                    label: "NLM Cell Knowledge Network", 
-                    _hasChildren: COUNT(ncbi_level_nodes) > 0,
-                    children: ncbi_level_nodes
-                }}
-
-                RETURN root_node
-            """
-
-    bind_vars = {
-        "graph_name": graph_name,
-        "initial_root_ids": initial_root_ids,
-        "uberon_terms": uberon_terms,
-        "graph_root_id": graph_root_id,
-    }
+    config = settings.ARANGO_API_PHENOTYPES_SUNBURST
+    parent_ids = [
+        *config["ORGAN_IDS"],
+        *config["ROOT_IDS"],
+        PHENOTYPES_SUNBURST_ROOT_ID,
+    ]
+    if parent_id is not None and parent_id not in parent_ids:
+        return Response(
+            data={"error": f"Not a phenotype sunburst organ: {parent_id}"},
+            status=status.HTTP_404_NOT_FOUND,
+            content_type="application/json",
+        )
 
     try:
-        cursor = db.aql.execute(query_full_structure, bind_vars=bind_vars, stream=False)
-        result_list = list(cursor)
+        if parent_id in config["ORGAN_IDS"]:
+            children = get_phenotypes_sunburst_slice(parent_id)
+            return Response(
+                data=children or [],
+                status=status.HTTP_200_OK,
+                content_type="application/json",
+            )
+
+        query, bind_vars = build_phenotypes_sunburst_query()
+        result_list = querylog.execute(db, query, bind_vars=bind_vars, stream=False)
 
         if not result_list:
-            print("WARN: Full structure query returned no results.")
+            logger.warning("Phenotype sunburst query returned no results.")
+            if parent_id is not None:
+                return Response(
+                    data=[],
+                    status=status.HTTP_200_OK,
+                    content_type="application/json",
+                )
             empty_root = {
-                "_id": graph_root_id,
+                "_id": bind_vars["graph_root_id"],
                 "label": "Phenotype Associations - No Data",
                 "_hasChildren": False,
                 "children": [],
@@ -507,17 +1400,38 @@ def get_phenotypes_sunburst(ignored_parent_id):
                 content_type="application/json",
             )
 
-        full_structure = result_list[0]
+        landing = result_list[0]
+        if parent_id is not None:
+            root_nodes = [
+                root_node
+                for root_node in landing["children"]
+                if parent_id in (PHENOTYPES_SUNBURST_ROOT_ID, root_node["_id"])
+            ]
+            _load_organ_slices(root_nodes)
+            if parent_id == PHENOTYPES_SUNBURST_ROOT_ID:
+                children = root_nodes
+            else:
+                children = root_nodes[0]["children"] if root_nodes else []
+            return Response(
+                data=children,
+                status=status.HTTP_200_OK,
+                content_type="application/json",
+            )
+
+        if not lazy:
+            _load_organ_slices(landing["children"])
         # Return the Response object directly
         return Response(
-            data=full_structure,
+            data=landing,
             status=status.HTTP_200_OK,
             content_type="application/json",
         )
 
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
-        print(f"ERROR: AQL Execution failed for full structure load: {e}")
-        error_content = {"error": "Failed to fetch full phenotype structure."}
+        logger.exception("AQL Execution failed for phenotype sunburst")
+        error_content = {"error": "Failed to fetch phenotype structure."}
         if hasattr(e, "response") and hasattr(e.response, "text"):
             error_content["db_error"] = e.response.text
         return Response(
@@ -527,13 +1441,121 @@ def get_phenotypes_sunburst(ignored_parent_id):
         )
 
 
+def build_sunburst_children_query(parent_id, graph_name, label_filter):
+    """Builds the AQL query and bind variables for a sunburst children load."""
+    # AQL Query: Fetches C nodes and their G children
+    query_children_grandchildren = """
+        LET start_node_id = @parent_id // P
+
+        // Find direct children (Level N+1, Nodes C)
+        FOR child_node, edge1 IN 1..1 INBOUND start_node_id GRAPH @graph_name
+            FILTER edge1.label == @label_filter
+
+            // For each child_node (C), find its children (Level N+2, Nodes G)
+            LET grandchildren = (
+                FOR grandchild_node, edge2 IN 1..1 INBOUND child_node._id GRAPH @graph_name
+                    FILTER edge2.label == @label_filter
+
+                    // Check if grandchild (G) has children (Level N+3)
+                    LET grandchild_has_children = COUNT(
+                        FOR great_grandchild, edge3 IN 1..1 INBOUND grandchild_node._id GRAPH @graph_name
+                            FILTER edge3.label == @label_filter
+                            LIMIT 1 RETURN 1
+                    ) > 0
+
+                    RETURN { // Format grandchild (G)
+                        _id: grandchild_node._id,
+                        label: grandchild_node.label || grandchild_node.name || grandchild_node._key,
+                        value: 1,
+                        _hasChildren: grandchild_has_children,
+                        children: null // Level N+3 not loaded here
+                    }
+            ) // Collect grandchildren (G) into an array for this child (C)
+
+            // Check if the child_node (C) itself has children (G) loaded above
+            LET child_has_children = COUNT(grandchildren) > 0
+
+            RETURN { // Format child (C)
+                _id: child_node._id,
+                label: child_node.label || child_node.name || child_node._key,
+                value: 1,
+                _hasChildren: child_has_children, // Does C have children G?
+                children: grandchildren // Attach the array of grandchildren (G)
+            }
+    """
+    bind_vars = {
+        "parent_id": parent_id,
+        "graph_name": graph_name,
+        "label_filter": label_filter,
+    }
+
+    return query_children_grandchildren, bind_vars
+
+
+def build_sunburst_root_query(node_id, graph_name, label_filter):
+    """Builds the AQL query and bind variables for one sunburst root node."""
+    # AQL Query: Fetches L0 node and its direct L1 children
+    query_initial = """
+        LET start_node_id = @node_id // This is L0
+
+        // Get the L0 node details
+        LET start_node_doc = DOCUMENT(start_node_id)
+        FILTER start_node_doc != null // Ensure L0 exists
+
+        // Check if L0 has children (L1)
+        LET start_node_has_children = COUNT(
+            FOR c1, e1 IN 1..1 INBOUND start_node_id GRAPH @graph_name
+                FILTER e1.label == @label_filter
+                LIMIT 1 RETURN 1
+        ) > 0
+
+        // Get L1 children
+        LET children_level1 = (
+            FOR child1_node, edge1 IN 1..1 INBOUND start_node_id GRAPH @graph_name
+                FILTER edge1.label == @label_filter
+
+                // Check if each L1 child has children (L2)
+                LET child1_has_children = COUNT(
+                    FOR c2, e2 IN 1..1 INBOUND child1_node._id GRAPH @graph_name
+                        FILTER e2.label == @label_filter
+                        LIMIT 1 RETURN 1
+                ) > 0
+
+                RETURN { // Format Level 1 node
+                    _id: child1_node._id,
+                    label: child1_node.label || child1_node.name || child1_node._key,
+                    value: 1,
+                    _hasChildren: child1_has_children, // Does L1 have L2 children?
+                    children: null // L2 not loaded here
+                }
+        ) // Collect L1 children into an array
+
+        // Return the formatted L0 node with its L1 children attached
+        RETURN { // Format Level 0 node
+            _id: start_node_doc._id,
+            label: start_node_doc.label || start_node_doc.name || start_node_doc._key,
+            value: 1, 
+            _hasChildren: start_node_has_children, 
+            children: children_level1 
+        }
+    """
+    bind_vars = {
+        "node_id": node_id,
+        "graph_name": graph_name,
+        "label_filter": label_filter,
+    }
+
+    return query_initial, bind_vars
+
+
 def get_ontologies_sunburst(parent_id):
     """
     API endpoint for fetching sunburst data, supporting initial load (L0+L1)
     and loading children + grandchildren (L N+1, L N+2) on demand.
     """
-    db = db_ontologies
-    graph_name = GRAPH_NAME_ONTOLOGIES
+    graph = resolve_graph("ontologies")
+    db = graph.db
+    graph_name = graph.graph_name
     label_filter = "subClassOf"
     initial_root_ids = [
         "CL/0000000",
@@ -552,58 +1574,19 @@ def get_ontologies_sunburst(parent_id):
         )
 
     if parent_id:
-        # AQL Query: Fetches C nodes and their G children
-        query_children_grandchildren = """
-            LET start_node_id = @parent_id // P
-
-            // Find direct children (Level N+1, Nodes C)
-            FOR child_node, edge1 IN 1..1 INBOUND start_node_id GRAPH @graph_name
-                FILTER edge1.label == @label_filter
-
-                // For each child_node (C), find its children (Level N+2, Nodes G)
-                LET grandchildren = (
-                    FOR grandchild_node, edge2 IN 1..1 INBOUND child_node._id GRAPH @graph_name
-                        FILTER edge2.label == @label_filter
-
-                        // Check if grandchild (G) has children (Level N+3)
-                        LET grandchild_has_children = COUNT(
-                            FOR great_grandchild, edge3 IN 1..1 INBOUND grandchild_node._id GRAPH @graph_name
-                                FILTER edge3.label == @label_filter
-                                LIMIT 1 RETURN 1
-                        ) > 0
-
-                        RETURN { // Format grandchild (G)
-                            _id: grandchild_node._id,
-                            label: grandchild_node.label || grandchild_node.name || grandchild_node._key,
-                            value: 1,
-                            _hasChildren: grandchild_has_children,
-                            children: null // Level N+3 not loaded here
-                        }
-                ) // Collect grandchildren (G) into an array for this child (C)
-
-                // Check if the child_node (C) itself has children (G) loaded above
-                LET child_has_children = COUNT(grandchildren) > 0
-
-                RETURN { // Format child (C)
-                    _id: child_node._id,
-                    label: child_node.label || child_node.name || child_node._key,
-                    value: 1,
-                    _hasChildren: child_has_children, // Does C have children G?
-                    children: grandchildren // Attach the array of grandchildren (G)
-                }
-        """
-        bind_vars = {
-            "parent_id": parent_id,
-            "graph_name": graph_name,
-            "label_filter": label_filter,
-        }
+        query_children_grandchildren, bind_vars = build_sunburst_children_query(
+            parent_id, graph_name, label_filter
+        )
 
         try:
-            cursor = db.aql.execute(query_children_grandchildren, bind_vars=bind_vars)
-            results = list(cursor)
+            results = querylog.execute(
+                db, query_children_grandchildren, bind_vars=bind_vars
+            )
 
             return Response(results, status=status.HTTP_200_OK)
 
+        except DatabaseUnavailable:
+            raise
         except Exception as e:
             return Response(
                 {
@@ -620,67 +1603,23 @@ def get_ontologies_sunburst(parent_id):
         # Loop through predefined starting nodes
         for node_id in initial_root_ids:
 
-            # AQL Query: Fetches L0 node and its direct L1 children
-            query_initial = """
-                LET start_node_id = @node_id // This is L0
-
-                // Get the L0 node details
-                LET start_node_doc = DOCUMENT(start_node_id)
-                FILTER start_node_doc != null // Ensure L0 exists
-
-                // Check if L0 has children (L1)
-                LET start_node_has_children = COUNT(
-                    FOR c1, e1 IN 1..1 INBOUND start_node_id GRAPH @graph_name
-                        FILTER e1.label == @label_filter
-                        LIMIT 1 RETURN 1
-                ) > 0
-
-                // Get L1 children
-                LET children_level1 = (
-                    FOR child1_node, edge1 IN 1..1 INBOUND start_node_id GRAPH @graph_name
-                        FILTER edge1.label == @label_filter
-
-                        // Check if each L1 child has children (L2)
-                        LET child1_has_children = COUNT(
-                            FOR c2, e2 IN 1..1 INBOUND child1_node._id GRAPH @graph_name
-                                FILTER e2.label == @label_filter
-                                LIMIT 1 RETURN 1
-                        ) > 0
-
-                        RETURN { // Format Level 1 node
-                            _id: child1_node._id,
-                            label: child1_node.label || child1_node.name || child1_node._key,
-                            value: 1,
-                            _hasChildren: child1_has_children, // Does L1 have L2 children?
-                            children: null // L2 not loaded here
-                        }
-                ) // Collect L1 children into an array
-
-                // Return the formatted L0 node with its L1 children attached
-                RETURN { // Format Level 0 node
-                    _id: start_node_doc._id,
-                    label: start_node_doc.label || start_node_doc.name || start_node_doc._key,
-                    value: 1, 
-                    _hasChildren: start_node_has_children, 
-                    children: children_level1 
-                }
-            """
-            bind_vars = {
-                "node_id": node_id,
-                "graph_name": graph_name,
-                "label_filter": label_filter,
-            }
+            query_initial, bind_vars = build_sunburst_root_query(
+                node_id, graph_name, label_filter
+            )
 
             try:
-                cursor = db.aql.execute(query_initial, bind_vars=bind_vars)
                 # Expect only one result document per initial node_id
-                node_data_list = list(cursor)
+                node_data_list = querylog.execute(
+                    db, query_initial, bind_vars=bind_vars
+                )
                 if node_data_list:
                     node_data = node_data_list[0]
                     initial_nodes_with_children.append(node_data)
 
-            except Exception as e:
-                print(f"ERROR: AQL Execution failed for initial node {node_id}: {e}")
+            except DatabaseUnavailable:
+                raise
+            except Exception:
+                logger.exception("AQL Execution failed for initial node %s", node_id)
 
         # Create the final top-level root node structure
         graph_root = {
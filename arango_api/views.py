@@ -1,32 +1,142 @@
-from django.http import JsonResponse, HttpResponseNotFound
-from rest_framework.decorators import api_view
+import json
 
-from arango_api import utils
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    JsonResponse,
+    HttpResponseNotFound,
+    StreamingHttpResponse,
+)
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+
+from arango_api import browse, export, jobs, layout, lineage, querylog, utils
+from arango_api.admission import admission_controlled, get_controller
+from arango_api.breaker import DatabaseUnavailable
+from arango_api.cache import get_or_set
+from arango_api.coalesce import coalesce
+from arango_api.db import resolve_graph
+from arango_api.digest import BloomFilter
+from arango_api.models import Job
+from arango_api.rendering import FastJsonResponse, RawJSON, dumps, json_response
+
+
+def get_fields(request):
+    """
+    Returns the attributes to project documents to, from the fields
+    parameter of the request body or query string. Raises ValueError.
+    """
+    fields = request.data.get("fields") or request.query_params.get("fields")
+    return utils.resolve_fields(fields)
+
+
+def get_graph_name(request, key="graph"):
+    """
+    Returns the name of the registered graph selected by the key parameter
+    of the request body or query string, or of the default graph if it is
+    missing. Raises ValueError.
+    """
+    graph = request.data.get(key) or request.query_params.get(key)
+    return resolve_graph(graph).name
+
+
+EDGE_DIRECTIONS = ["INBOUND", "OUTBOUND", "ANY"]
+
+
+def check_traversal(node_ids, depth, edge_direction, allowed_collections, node_limit):
+    """
+    Returns the depth and node limit of a traversal from node_ids as
+    integers, for the streamed endpoints, which can't report errors once
+    started. Raises ValueError.
+    """
+    if (
+        not isinstance(node_ids, list)
+        or not node_ids
+        or not all(isinstance(node_id, str) for node_id in node_ids)
+    ):
+        raise ValueError("node_ids must be a non-empty list of ids")
+    try:
+        depth = int(depth)
+    except (TypeError, ValueError):
+        raise ValueError("depth must be an integer")
+    if depth < 0:
+        raise ValueError("depth must not be negative")
+    if str(edge_direction).upper() not in EDGE_DIRECTIONS:
+        raise ValueError(f"edge_direction must be one of {', '.join(EDGE_DIRECTIONS)}")
+    if not isinstance(allowed_collections, list) or not all(
+        isinstance(collection, str) for collection in allowed_collections
+    ):
+        raise ValueError("allowed_collections must be a list of collection names")
+    try:
+        node_limit = int(node_limit)
+    except (TypeError, ValueError):
+        raise ValueError("node_limit must be an integer")
+    if node_limit < 1:
+        raise ValueError("node_limit must be positive")
+    return depth, node_limit
 
 
 @api_view(["POST"])
 def list_collection_names(request):
-    graph = request.data.get("graph")
-    objects = utils.get_document_collections(graph)
-    collection_names = [collection["name"] for collection in objects]
+    try:
+        graph = get_graph_name(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    def load_collection_names():
+        objects = utils.get_document_collections(graph)
+        return [collection["name"] for collection in objects]
+
+    collection_names = get_or_set(
+        "list_collection_names", [graph], load_collection_names
+    )
     return JsonResponse(collection_names, safe=False)
 
 
 @api_view(["POST"])
 def list_by_collection(request, coll):
-    graph = request.data.get("graph")
-    objects = utils.get_all_by_collection(coll, graph)
-    return JsonResponse(list(objects), safe=False)
+    try:
+        graph = get_graph_name(request)
+        fields = get_fields(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    objects = utils.get_all_by_collection(coll, graph, fields)
+    return json_response(list(objects))
+
+
+@api_view(["POST"])
+def browse_collection(request, coll):
+    try:
+        graph = get_graph_name(request)
+        fields = get_fields(request)
+        page = browse.get_page(
+            coll,
+            graph,
+            request.data.get("filter", ""),
+            request.data.get("offset", 0),
+            request.data.get("limit"),
+            fields,
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return FastJsonResponse(page)
 
 
 @api_view(["GET", "PUT", "DELETE"])
 def get_object(request, coll, pk):
     try:
-        item = utils.get_by_id(coll, pk)
+        graph = get_graph_name(request)
+        fields = get_fields(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    try:
+        item = utils.get_by_id(coll, pk, fields, graph)
         if item:
-            return JsonResponse(item, safe=False)
+            return FastJsonResponse(item)
         else:
             return HttpResponseNotFound("Object not found")
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
@@ -34,62 +144,231 @@ def get_object(request, coll, pk):
 @api_view(["GET"])
 def get_related_edges(request, edge_coll, dr, item_coll, pk):
     # TODO: Document arguments
-    edges = utils.get_edges_by_id(edge_coll, dr, item_coll, pk)
+    try:
+        graph = get_graph_name(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    edges = utils.get_edges_by_id(edge_coll, dr, item_coll, pk, graph)
     return JsonResponse(list(edges), safe=False)
 
 
 @api_view(["POST"])
 def get_search_items(request):
-    graph = request.data.get("db")
     search_term = request.data.get("search_term")
-    search_results = utils.search_by_term(search_term, graph)
-    return JsonResponse(search_results, safe=False)
+    collections = request.data.get("collections")
+    facets = request.data.get("facets", False)
+    try:
+        graph = get_graph_name(request, "db")
+        fields = get_fields(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    try:
+        search_results = utils.search_by_term(
+            search_term, graph, collections, facets, fields
+        )
+    except DatabaseUnavailable:
+        raise
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+    return FastJsonResponse(search_results)
 
 
 @api_view(["POST"])
+@admission_controlled("get_graph")
 def get_graph(request):
     node_ids = request.data.get("node_ids")
     depth = request.data.get("depth")
     edge_direction = request.data.get("edge_direction")
     allowed_collections = request.data.get("allowed_collections")
     node_limit = request.data.get("node_limit", 100)
-    graph = request.data.get("graph")
+    set_operation = request.data.get("set_operation")
+    with_layout = request.data.get("layout", False)
+
+    try:
+        graph = get_graph_name(request)
+        fields = get_fields(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    params = [
+        node_ids,
+        depth,
+        edge_direction,
+        allowed_collections,
+        node_limit,
+        graph,
+        set_operation,
+        fields,
+    ]
+    try:
+        search_results = coalesce("get_graph", params, lambda: utils.get_graph(*params))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if with_layout and isinstance(search_results, dict) and "nodes" in search_results:
+        # Results may be shared with coalesced requests, so aren't modified
+        search_results = {**search_results, "layout": layout.get_layout(search_results)}
+    return FastJsonResponse(search_results)
+
+
+@api_view(["POST"])
+@admission_controlled("get_graph_stream")
+def get_graph_stream(request):
+    node_ids = request.data.get("node_ids")
+    depth = request.data.get("depth")
+    edge_direction = request.data.get("edge_direction")
+    allowed_collections = request.data.get("allowed_collections")
+    node_limit = request.data.get("node_limit", 100)
+    stream_format = request.data.get("format", "ndjson")
+    try:
+        graph = get_graph_name(request)
+        depth, node_limit = check_traversal(
+            node_ids, depth, edge_direction, allowed_collections, node_limit
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-    search_results = utils.get_graph(
+    records = utils.iter_graph_levels(
         node_ids, depth, edge_direction, allowed_collections, node_limit, graph
     )
-    return JsonResponse(search_results, safe=False)
+    if stream_format == "sse":
+        chunks = (
+            f"event: {record['type']}\ndata: {json.dumps(record)}\n\n"
+            for record in records
+        )
+        content_type = "text/event-stream"
+    else:
+        chunks = (json.dumps(record) + "\n" for record in records)
+        content_type = "application/x-ndjson"
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 @api_view(["POST"])
-def get_shortest_paths(request):
+@admission_controlled("export_graph")
+def export_graph(request):
     node_ids = request.data.get("node_ids")
+    depth = request.data.get("depth")
     edge_direction = request.data.get("edge_direction")
+    allowed_collections = request.data.get("allowed_collections")
+    node_limit = request.data.get("node_limit", 100)
+    export_format = request.data.get("format", "graphml")
+    table = request.data.get("table", "nodes")
+    try:
+        graph = get_graph_name(request)
+        depth, node_limit = check_traversal(
+            node_ids, depth, edge_direction, allowed_collections, node_limit
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if export_format not in export.FORMATS:
+        return JsonResponse({"error": f"Unknown format: {export_format}"}, status=400)
+    if table not in export.TABLES:
+        return JsonResponse({"error": f"Unknown table: {table}"}, status=400)
+    if not export.is_available(export_format):
+        return JsonResponse(
+            {"error": f"{export_format} export requires pyarrow"}, status=501
+        )
 
-    search_results = utils.get_shortest_paths(
+    levels = utils.iter_graph_levels(
+        node_ids, depth, edge_direction, allowed_collections, node_limit, graph
+    )
+    content_type, extension = export.FORMATS[export_format]
+    filename = "graph" if export_format == "graphml" else f"graph-{table}"
+    response = StreamingHttpResponse(
+        export.iter_export(levels, export_format, table), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{extension}"'
+    return response
+
+
+@api_view(["POST"])
+@admission_controlled("expand_graph")
+def expand_graph(request):
+    node_ids = request.data.get("node_ids")
+    depth = request.data.get("depth", 1)
+    edge_direction = request.data.get("edge_direction")
+    allowed_collections = request.data.get("allowed_collections")
+    node_limit = request.data.get("node_limit", 100)
+    known_ids = request.data.get("known_ids")
+    known_digest = request.data.get("known_digest")
+
+    try:
+        graph = get_graph_name(request)
+        if known_digest is not None:
+            known_digest = BloomFilter.from_json(known_digest)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    search_results = utils.expand_graph(
         node_ids,
+        depth,
         edge_direction,
+        allowed_collections,
+        node_limit,
+        graph,
+        known_ids,
+        known_digest,
     )
-    return JsonResponse(search_results, safe=False)
+    return FastJsonResponse(search_results)
+
+
+@api_view(["POST"])
+@admission_controlled("get_shortest_paths")
+def get_shortest_paths(request):
+    node_ids = request.data.get("node_ids")
+    edge_direction = request.data.get("edge_direction")
+    max_paths = request.data.get("max_paths")
+    try:
+        graph = get_graph_name(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    if max_paths is not None:
+        try:
+            max_paths = int(max_paths)
+            if max_paths < 1:
+                raise ValueError
+        except (TypeError, ValueError):
+            return JsonResponse(
+                {"error": "max_paths must be a positive integer"}, status=400
+            )
+
+    search_results = utils.get_shortest_paths(
+        node_ids, edge_direction, max_paths, graph
+    )
+    return FastJsonResponse(search_results)
 
 
 @api_view(["GET"])
+@admission_controlled("get_all")
 def get_all(request):
-    search_results = utils.get_all()
-    return JsonResponse(search_results, safe=False)
+    try:
+        graph = get_graph_name(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    search_results = utils.get_all(graph)
+    return json_response(search_results)
 
 
 @api_view(["POST"])
+@admission_controlled("run_aql_query")
 def run_aql_query(request):
     # Extract the AQL query from the request body
     query = request.data.get("query")
     if not query:
         return JsonResponse({"error": "No query provided"}, status=400)
+    try:
+        graph = get_graph_name(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
     # Run the AQL query
     try:
-        search_results = utils.run_aql_query(query)
-        return JsonResponse(search_results, safe=False)
+        search_results = utils.run_aql_query(query, graph)
+        return json_response(search_results)
+    except DatabaseUnavailable:
+        raise
     except Exception as e:
         ##TODO: Handle errors
         return JsonResponse({"error": str(e)}, status=500)
@@ -98,9 +377,128 @@ def run_aql_query(request):
 @api_view(["POST"])
 def get_sunburst(request):
     parent_id = request.data.get("parent_id", None)
-    graph = request.data.get("graph")
+    lazy = bool(request.data.get("lazy", False))
+    try:
+        graph = get_graph_name(request)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
 
-    if graph == "phenotypes":
-        return utils.get_phenotypes_sunburst(parent_id)
-    else:
-        return utils.get_ontologies_sunburst(parent_id)
+    def load_sunburst():
+        if graph == "phenotypes":
+            response = utils.get_phenotypes_sunburst(parent_id, lazy)
+        else:
+            response = utils.get_ontologies_sunburst(parent_id)
+        # Cached as encoded JSON, so cache hits are sent without encoding
+        return {"body": dumps(response.data).decode(), "status": response.status_code}
+
+    payload = get_or_set(
+        "get_sunburst",
+        [parent_id, graph, lazy],
+        load_sunburst,
+        cache_if=lambda payload: payload["status"] == 200,
+    )
+    return FastJsonResponse(RawJSON(payload["body"]), status=payload["status"])
+
+
+def lineage_response(lookup):
+    """
+    Returns a response with the result of lookup on the lineage index, 503
+    if the index hasn't been built, or 404 for a node not in it.
+    """
+    index = lineage.get_index()
+    if index is None:
+        return JsonResponse({"error": "Lineage index not built"}, status=503)
+    try:
+        return FastJsonResponse(lookup(index))
+    except KeyError as e:
+        return JsonResponse({"error": e.args[0]}, status=404)
+
+
+@api_view(["GET"])
+def get_ancestors(request, coll, pk):
+    return lineage_response(lambda index: index.get_ancestors(f"{coll}/{pk}"))
+
+
+@api_view(["GET"])
+def get_descendants(request, coll, pk):
+    return lineage_response(lambda index: index.get_descendants(f"{coll}/{pk}"))
+
+
+@api_view(["POST"])
+def get_is_descendant(request):
+    node_id = request.data.get("node_id")
+    ancestor_id = request.data.get("ancestor_id")
+    return lineage_response(
+        lambda index: {"is_descendant": index.is_descendant(node_id, ancestor_id)}
+    )
+
+
+@api_view(["POST"])
+def get_lowest_common_ancestors(request):
+    node_ids = request.data.get("node_ids") or []
+    return lineage_response(lambda index: index.get_lowest_common_ancestors(node_ids))
+
+
+@api_view(["GET"])
+def get_admission_stats(request):
+    return JsonResponse(get_controller().stats())
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def get_query_stats(request):
+    try:
+        top_n = int(
+            request.query_params.get("top", settings.ARANGO_API_QUERY_LOG["TOP_N"])
+        )
+        if top_n < 1:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({"error": "top must be a positive integer"}, status=400)
+    return JsonResponse(querylog.query_stats.top(top_n), safe=False)
+
+
+@api_view(["POST"])
+def submit_job(request):
+    kind = request.data.get("kind")
+    params = request.data.get("params") or {}
+    if not isinstance(params, dict):
+        return JsonResponse({"error": "params must be an object"}, status=400)
+    try:
+        job = jobs.submit(kind, params)
+    except jobs.TooManyJobs as e:
+        response = JsonResponse({"error": str(e)}, status=429)
+        response["Retry-After"] = str(settings.ARANGO_API_JOBS["RETRY_AFTER"])
+        return response
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse(jobs.describe(job), status=202)
+
+
+@api_view(["GET"])
+def get_job(request, job_id):
+    try:
+        job = Job.objects.get(id=job_id)
+    except Job.DoesNotExist:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    return JsonResponse(jobs.describe(job))
+
+
+@api_view(["GET"])
+def get_job_result(request, job_id):
+    try:
+        job = Job.objects.get(id=job_id)
+    except Job.DoesNotExist:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    if job.status != Job.Status.SUCCEEDED:
+        return JsonResponse({"error": f"Job is {job.status}"}, status=409)
+    try:
+        fp = open(jobs.result_path(job.id), "rb")
+    except FileNotFoundError:
+        return JsonResponse({"error": "Job result not found"}, status=404)
+    return FileResponse(
+        fp,
+        as_attachment=True,
+        filename=f"{job.kind}-{job.id}.json",
+        content_type="application/json",
+    )
@@ -0,0 +1,146 @@
+"""
+Cache warm-up from a declarative manifest of endpoints and parameters.
+Entries are requested with limited concurrency and an overall time limit,
+either in-process by calling the views directly, which fills this
+worker's caches, or against a running server, which makes the same
+manifest usable as a smoke-performance check.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.urls import resolve
+import requests
+
+from arango_api.dataversion import tracker
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_manifest(path=None):
+    """
+    Loads a list of entries of the form {"name", "method", "path", "data",
+    "max_ms"}, where data and max_ms are optional.
+    """
+    with open(path or settings.ARANGO_API_WARMUP["MANIFEST"]) as fp:
+        return json.load(fp)
+
+
+def _in_process_host():
+    """Returns a host name the in-process requests will be allowed to use."""
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*":
+            return host.lstrip(".")
+    return "localhost"
+
+
+def _request_in_process(entry):
+    """
+    Calls the entry's view with a request built by RequestFactory. Unlike
+    the test client, this doesn't touch the request signals shared with
+    the requests this worker is serving.
+    """
+    from django.test import RequestFactory
+
+    factory = RequestFactory(SERVER_NAME=_in_process_host())
+    if entry.get("method", "GET").upper() == "POST":
+        request = factory.post(
+            entry["path"], entry.get("data", {}), content_type="application/json"
+        )
+    else:
+        request = factory.get(entry["path"], entry.get("data", {}))
+    match = resolve(urlsplit(entry["path"]).path)
+    response = match.func(request, *match.args, **match.kwargs)
+    if hasattr(response, "render"):
+        response.render()
+    if response.streaming:
+        b"".join(response.streaming_content)
+    response.close()
+    return response.status_code
+
+
+def _request_remote(entry, base_url, timeout):
+    url = base_url.rstrip("/") + entry["path"]
+    if entry.get("method", "GET").upper() == "POST":
+        response = requests.post(url, json=entry.get("data", {}), timeout=timeout)
+    else:
+        response = requests.get(url, params=entry.get("data", {}), timeout=timeout)
+    return response.status_code
+
+
+def run_warmup(manifest, base_url=None, concurrency=None, timeout=None):
+    """
+    Requests every manifest entry and returns a report with one record per
+    entry: its status code, duration, and whether it succeeded within its
+    max_ms. Entries not started before the time limit are reported skipped.
+    """
+    config = settings.ARANGO_API_WARMUP
+    concurrency = concurrency or config["CONCURRENCY"]
+    timeout = timeout or config["TIMEOUT"]
+    deadline = time.monotonic() + timeout
+
+    def warm(entry):
+        record = {"name": entry["name"], "path": entry["path"]}
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return {**record, "status": None, "ms": None, "ok": False, "skipped": True}
+
+        started = time.perf_counter()
+        try:
+            if base_url:
+                status = _request_remote(entry, base_url, remaining)
+            else:
+                status = _request_in_process(entry)
+            error = None
+        except Exception as e:
+            status = None
+            error = str(e)
+        ms = round((time.perf_counter() - started) * 1000, 1)
+
+        ok = status is not None and status < 400
+        if ok and entry.get("max_ms") is not None:
+            ok = ms <= entry["max_ms"]
+        record.update({"status": status, "ms": ms, "ok": ok, "skipped": False})
+        if error:
+            record["error"] = error
+        return record
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        report = list(executor.map(warm, manifest))
+
+    for record in report:
+        logger.info("Warm-up %s", json.dumps(record))
+    return report
+
+
+def start_background_warmup():
+    """
+    Starts warm-up of this worker in a daemon thread if it is enabled in
+    ARANGO_API_WARMUP, once the data version is known if it is polled.
+    Called once the WSGI or ASGI application is ready.
+    """
+    config = settings.ARANGO_API_WARMUP
+    if not config["ENABLED"]:
+        return None
+
+    def warm():
+        # Results are cached under the data version, so warming before it is
+        # first polled would fill entries no request reads
+        if settings.ARANGO_API_DATA_VERSION["ENABLED"]:
+            if tracker.wait(config["TIMEOUT"]) is None:
+                logger.warning("Warm-up skipped, the data version isn't known")
+                return
+        try:
+            run_warmup(load_manifest())
+        except Exception:
+            logger.exception("Warm-up failed")
+
+    thread = threading.Thread(target=warm, name="arango-api-warmup", daemon=True)
+    thread.start()
+    return thread
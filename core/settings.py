@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -54,6 +55,10 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "arango_api.middleware.QueryLogMiddleware",
+    "arango_api.middleware.TraceRecordMiddleware",
+    "arango_api.middleware.DataVersionMiddleware",
+    "arango_api.middleware.CircuitBreakerMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -139,3 +144,260 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
 CORS_ALLOW_ALL_ORIGINS = True
+
+
+# --- Arango API settings ---
+
+# Graphs served by the API, selected by the graph (or db) request parameter,
+# ARANGO_API_DEFAULT_GRAPH when it is missing. Each graph has its own
+# connection pool of up to POOL_SIZE connections per host, to HOSTS
+# (cluster coordinators or replicas, used in turn), with requests timing out
+# after TIMEOUT seconds. DATABASE, GRAPH and HOSTS default to the
+# ARANGO_DB_NAME_<NAME>, GRAPH_NAME_<NAME> and ARANGO_DB_HOST environment
+# variables
+ARANGO_API_GRAPHS = {
+    "ontologies": {"POOL_SIZE": 10, "TIMEOUT": 60},
+    "phenotypes": {"POOL_SIZE": 10, "TIMEOUT": 60},
+}
+ARANGO_API_DEFAULT_GRAPH = "ontologies"
+
+# Origins per traversal query, and concurrent traversal queries, used by
+# get_graph when more origins are requested than fit in one batch
+ARANGO_API_GRAPH_BATCH_SIZE = 50
+ARANGO_API_GRAPH_BATCH_WORKERS = 4
+
+# Admission control for expensive endpoints, per worker process. A request
+# costs base + per_depth * depth + per_node * nodes + per_pair * pairs slots
+# (at least 1, at most CAPACITY), and endpoints may cap concurrent requests
+ARANGO_API_ADMISSION = {
+    "CAPACITY": 16,
+    "MAX_QUEUE": 32,
+    "QUEUE_TIMEOUT": 10,
+    "RETRY_AFTER": 5,
+    "ENDPOINTS": {
+        "get_graph": {"base": 1, "per_depth": 1, "per_node": 0.1},
+        "get_graph_stream": {"base": 1, "per_depth": 1, "per_node": 0.1},
+        "export_graph": {"base": 2, "per_depth": 1, "per_node": 0.1},
+        "expand_graph": {"base": 1, "per_depth": 1, "per_node": 0.1},
+        "get_shortest_paths": {"base": 1, "per_pair": 0.5},
+        "get_all": {"base": 8, "max_concurrent": 1},
+        "run_aql_query": {"base": 4, "max_concurrent": 4},
+    },
+}
+
+# Coalescing of identical concurrent graph and sunburst requests. Requests
+# are always coalesced within a process; with CROSS_PROCESS they are also
+# coalesced across processes through lock and result files in DIRECTORY
+ARANGO_API_COALESCE = {
+    "CROSS_PROCESS": False,
+    "DIRECTORY": BASE_DIR / "coalesce",
+    "LOCK_TIMEOUT": 60,
+    "RESULT_TTL": 60,
+}
+
+# Cache of arango_api results. The default local-memory cache is private to
+# each worker process; set ARANGO_API_CACHE_BACKEND and
+# ARANGO_API_CACHE_LOCATION to a shared cache, for example
+# django.core.cache.backends.redis.RedisCache and redis://127.0.0.1:6379, so
+# workers share results and management commands can invalidate them
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get(
+            "ARANGO_API_CACHE_BACKEND",
+            "django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": os.environ.get("ARANGO_API_CACHE_LOCATION", ""),
+    }
+}
+
+# Seconds that cached sunburst, collection and predefined query responses
+# are kept, and seconds more that they are served stale while refreshed
+ARANGO_API_CACHE_TIMEOUT = 60 * 60
+ARANGO_API_CACHE_STALE_TIMEOUT = 24 * 60 * 60
+
+# Circuit breaker around database calls. It opens when at least MIN_CALLS of
+# the last WINDOW calls were made and FAILURE_RATE of them failed or took at
+# least SLOW_MS, and lets a trial call through after OPEN_SECONDS
+ARANGO_API_CIRCUIT_BREAKER = {
+    "ENABLED": True,
+    "WINDOW": 20,
+    "MIN_CALLS": 10,
+    "FAILURE_RATE": 0.5,
+    "SLOW_MS": 10000,
+    "OPEN_SECONDS": 15,
+}
+
+# Data version of the graph databases, a fingerprint of their collection
+# counts and revisions polled every INTERVAL seconds by each worker. Cached
+# results are keyed by it, and the lineage index is rebuilt when it changes
+ARANGO_API_DATA_VERSION = {
+    "ENABLED": True,
+    "INTERVAL": 60,
+}
+
+# Background cache warm-up of each worker from a manifest of requests, with
+# at most CONCURRENCY requests at a time and TIMEOUT seconds overall
+ARANGO_API_WARMUP = {
+    "ENABLED": False,
+    "MANIFEST": BASE_DIR / "arango_api" / "warmup.json",
+    "CONCURRENCY": 2,
+    "TIMEOUT": 120,
+}
+
+# Phenotype sunburst structure. The landing view shows ROOT_IDS and the
+# ORGAN_IDS connected to them (ROOT_DIRECTION from the root), and each
+# organ's children are loaded and cached separately, following one PATH rule
+# per level: the traversal direction, the vertex collections to keep, and
+# optionally the edge collections to follow and the parent collections the
+# rule applies to
+ARANGO_API_PHENOTYPES_SUNBURST = {
+    "ROOT_IDS": ["NCBITaxon/9606"],
+    "ROOT_DIRECTION": "INBOUND",
+    "ORGAN_IDS": [
+        "UBERON/0002048",  # lung
+        "UBERON/0000966",  # retina
+        "UBERON/0000955",  # brain
+    ],
+    "EDGE_COLLECTIONS": [
+        "UBERON-NCBITaxon",
+        "UBERON-CL",
+        "CL-UBERON",
+        "CL-GS",
+        "GS-MONDO",
+        "GS-PR",
+        "CHEMBL-PR",
+    ],
+    "PATH": [
+        {"direction": "INBOUND", "collections": ["CL"]},
+        {"direction": "OUTBOUND", "collections": ["GS"]},
+        {"direction": "OUTBOUND", "collections": ["MONDO", "PR"]},
+        {
+            "direction": "INBOUND",
+            "collections": ["CHEMBL"],
+            "edge_collections": ["CHEMBL-PR"],
+            "parents": ["PR"],
+        },
+    ],
+}
+
+# JSON rendering of responses. List results of at least STREAM_MIN_ITEMS
+# items are streamed, encoded CHUNK_ITEMS items at a time
+ARANGO_API_RENDERING = {
+    "STREAM_MIN_ITEMS": 5000,
+    "CHUNK_ITEMS": 500,
+}
+
+# Server-side collection browsing, with label attributes from the React
+# client's collections map, and pages of PAGE_SIZE documents by default
+ARANGO_API_BROWSE = {
+    "COLLECTIONS_MAP": BASE_DIR / "react" / "src" / "assets" / "collectionsMap.json",
+    "PAGE_SIZE": 100,
+    "MAX_PAGE_SIZE": 1000,
+}
+
+# subClassOf closure index for the lineage endpoints, built from edges with
+# label LABEL by the build_lineage_index command, and rebuilt by one worker
+# at a time when the data version changes, others waiting up to
+# REBUILD_TIMEOUT seconds for it
+ARANGO_API_LINEAGE = {
+    "PATH": BASE_DIR / "lineage.json.gz",
+    "LABEL": "subClassOf",
+    "REBUILD_TIMEOUT": 600,
+}
+
+# Subgraph export, written in record batches of at most BATCH_ROWS rows
+ARANGO_API_EXPORT = {
+    "BATCH_ROWS": 10000,
+}
+
+# Server-side graph layout for get_graph with layout=true, for graphs of
+# MIN_NODES to MAX_NODES nodes, scaled to edges of about EDGE_LENGTH pixels.
+# Graphs of MIN_NODES nodes get ITERATIONS iterations, larger graphs more, in
+# proportion to the square root of their size. Graphs of up to
+# EXACT_MAX_NODES nodes get exact repulsion, larger graphs repulsion from
+# SAMPLE_SIZE random nodes per node. Layouts are cached by subgraph
+ARANGO_API_LAYOUT = {
+    "MIN_NODES": 50,
+    "MAX_NODES": 1000,
+    "ITERATIONS": 50,
+    "EXACT_MAX_NODES": 250,
+    "SAMPLE_SIZE": 64,
+    "EDGE_LENGTH": 175,
+    "CACHE_TIMEOUT": 24 * 60 * 60,
+}
+
+# Background jobs, run by WORKERS threads per worker process. At most
+# MAX_PENDING jobs are queued or running, results of more than
+# MAX_RESULT_BYTES fail the job, and finished jobs are deleted with their
+# results in DIRECTORY after RESULT_TTL seconds. Jobs unfinished after
+# MAX_RUNTIME seconds are failed
+ARANGO_API_JOBS = {
+    "WORKERS": 2,
+    "MAX_PENDING": 20,
+    "RETRY_AFTER": 30,
+    "DIRECTORY": BASE_DIR / "jobs",
+    "MAX_RESULT_BYTES": 512 * 1024 * 1024,
+    "RESULT_TTL": 24 * 60 * 60,
+    "MAX_RUNTIME": 6 * 60 * 60,
+}
+
+# Shortest paths. Each pair finds at most PATH_LIMIT paths, and pair
+# results are cached for CACHE_TIMEOUT seconds (None for the default
+# ARANGO_API_CACHE_TIMEOUT). Cache keys include the data version, so a long
+# timeout never returns paths from data replaced since
+ARANGO_API_SHORTEST_PATHS = {
+    "PATH_LIMIT": 1000,
+    "CACHE_TIMEOUT": 24 * 60 * 60,
+}
+
+# Search backend, "arangosearch" for the ArangoSearch view, or "sqlite" for
+# the local index at SQLITE_PATH built by the build_search_index command,
+# which returns at most LIMIT documents
+ARANGO_API_SEARCH = {
+    "BACKEND": "arangosearch",
+    "SQLITE_PATH": BASE_DIR / "search.sqlite3",
+    "LIMIT": 1000,
+}
+
+# Record and replay of database calls. With MODE "record", results of the
+# calls made are written to fixture files in DIRECTORY; with MODE "replay",
+# calls are answered from them without a database, after LATENCY_MS
+# milliseconds (or the recorded duration, if "recorded")
+ARANGO_API_REPLAY = {
+    "MODE": os.environ.get("ARANGO_API_REPLAY_MODE") or None,
+    "DIRECTORY": os.environ.get(
+        "ARANGO_API_REPLAY_DIRECTORY",
+        BASE_DIR / "arango_api" / "tests" / "fixtures" / "replay",
+    ),
+    "LATENCY_MS": None,
+}
+
+# Logging of database calls. Calls slower than SLOW_MS (or the endpoint's
+# ENDPOINT_SLOW_MS) are logged as slow queries at SLOW_SAMPLE_RATE, other
+# calls at SAMPLE_RATE. TOP_N is the default size of the slowest query
+# fingerprints report
+ARANGO_API_QUERY_LOG = {
+    "SLOW_MS": 1000,
+    "ENDPOINT_SLOW_MS": {
+        "get_object": 200,
+        "get_search_items": 500,
+    },
+    "SLOW_SAMPLE_RATE": 1.0,
+    "SAMPLE_RATE": 0.01,
+    "TOP_N": 20,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "arango_api": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
+# NDJSON file to record arango_api requests to, for replay by the loadtest
+# command, or None to not record
+ARANGO_API_LOADTEST_TRACE = None
@@ -14,3 +14,14 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 
 application = get_wsgi_application()
+
+# Poll the data version in the background, if enabled
+from arango_api.dataversion import start_polling  # noqa: E402
+
+start_polling()
+
+# Warm this worker's caches in the background once the version is known, if
+# enabled
+from arango_api.warmup import start_background_warmup  # noqa: E402
+
+start_background_warmup()
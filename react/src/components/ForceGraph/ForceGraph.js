@@ -340,6 +340,9 @@ const ForceGraph = ({
           allowed_collections: allowedCollections,
           node_limit: nodeLimit,
           graph: graphType,
+          // Collapsing on start leaves few nodes to simulate, so the
+          // server's layout only pays off for fully expanded graphs
+          layout: !collapseOnStart,
         }),
       });
 
@@ -531,6 +534,17 @@ const ForceGraph = ({
       });
     }
 
+    // Start the simulation from the server's layout, when there is one
+    if (data.layout) {
+      filteredNodes.forEach((node) => {
+        const position = data.layout[node._id];
+        if (position && node.x === undefined) {
+          node.x = position.x;
+          node.y = position.y;
+        }
+      });
+    }
+
     return {
       nodes: filteredNodes,
       links: filteredLinks,
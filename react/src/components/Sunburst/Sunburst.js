@@ -40,7 +40,11 @@ const Sunburst = ({ addSelectedItem }) => {
         const response = await fetch(fetchUrl, {
           method: "POST",
           headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ parent_id: parentId, graph: graphType }),
+          body: JSON.stringify({
+            parent_id: parentId,
+            graph: graphType,
+            lazy: true,
+          }),
         });
         if (!response.ok) {
           const err = await response.text();